@@ -30,7 +30,13 @@ from collections.abc import AsyncIterator
 # Add the shared library to the path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from shared import ChatMessage, MessageRole, ToolCall, get_provider
+from shared import (
+    ChatMessage,
+    MessageRole,
+    ToolCall,
+    close_pooled_clients,
+    get_provider,
+)
 from shared.llm_base import LLMProvider
 from shared.llm_exceptions import LLMException
 from shared.mcp_client import MCPClient, MCPServerConfig, MCPToolError
@@ -222,15 +228,20 @@ class StreamingChatAgent:
                 tool_calls=tool_calls_in_chunk,
             ))
 
-            # Execute each tool call via MCP
+            # Execute the round's tool calls concurrently. The MCP client
+            # pipelines them over its persistent session and matches each
+            # response to its request by JSON-RPC id.
             for tool_call in tool_calls_in_chunk:
                 yield ChatEvent('tool_executing', {
                     'tool': tool_call.name,
                     'id': tool_call.id,
                 })
 
-                result = await self._execute_tool(tool_call)
+            results = await asyncio.gather(
+                *(self._execute_tool(tc) for tc in tool_calls_in_chunk)
+            )
 
+            for tool_call, result in zip(tool_calls_in_chunk, results):
                 yield ChatEvent('tool_result', {
                     'tool': tool_call.name,
                     'id': tool_call.id,
@@ -507,9 +518,14 @@ async def main() -> None:
 
     agent = await create_agent(config)
 
-    await demo_streaming(agent)
-    await demo_non_streaming(agent)
-    await demo_sse_format(agent)
+    try:
+        await demo_streaming(agent)
+        await demo_non_streaming(agent)
+        await demo_sse_format(agent)
+    finally:
+        if agent.mcp_client:
+            await agent.mcp_client.aclose()
+        await close_pooled_clients()
 
 
 if __name__ == '__main__':
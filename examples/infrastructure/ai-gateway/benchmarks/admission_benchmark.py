@@ -0,0 +1,154 @@
+"""
+Benchmark for weighted fair admission under saturation.
+
+Runs AIGateway in-process against FakeProvider behind a FIFO
+concurrency cap, standing in for an upstream that only serves so many
+requests at once. Free and standard keys flood it with closed-loop
+clients while a few enterprise clients keep steady traffic. Each run
+reports per-tier throughput and latency percentiles: once with
+admission control off (every tier waits in the upstream's FIFO), and
+once with it on and max_concurrency matched to the upstream cap.
+Enterprise p95 should stay close to the provider's own latency with
+admission on; free and standard absorb the queueing.
+
+Usage:
+    python benchmarks/admission_benchmark.py --duration 10 --capacity 16
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gateway import AIGateway  # noqa: E402
+from providers.base import CompletionRequest, CompletionResponse, Message, MessageRole  # noqa: E402
+from providers.fake import FakeProvider  # noqa: E402
+
+GATEWAY_DIR = Path(__file__).resolve().parent.parent
+KEYS = {
+    "free": "Bearer sk-demo-free-001",
+    "standard": "Bearer sk-demo-standard-001",
+    "enterprise": "Bearer sk-demo-enterprise-001",
+}
+
+
+class CappedProvider(FakeProvider):
+    """FakeProvider that serves at most `capacity` calls at once, FIFO."""
+
+    def __init__(self, capacity: int, latency_ms: float) -> None:
+        super().__init__(latency_ms=latency_ms, jitter_ms=latency_ms / 10)
+        self._slots = asyncio.Semaphore(capacity)
+
+    async def complete(self, request: CompletionRequest) -> CompletionResponse:
+        async with self._slots:
+            return await super().complete(request)
+
+
+def _write_config(path: str, admission: bool, capacity: int) -> None:
+    """config.yaml with quotas out of the way, caches off, admission on or off."""
+    with open(GATEWAY_DIR / "config.yaml") as f:
+        config = yaml.safe_load(f)
+    tiers = config["rate_limits"]["tiers"]
+    weights = {tier: limits["requests_per_minute"] for tier, limits in tiers.items()}
+    for tier in tiers:
+        tiers[tier] = {"requests_per_minute": 10**9, "tokens_per_minute": 10**12}
+    middleware = config["middleware"]
+    middleware["logger"]["level"] = "WARNING"
+    middleware["response_cache"]["enabled"] = False
+    middleware["semantic_cache"]["enabled"] = False
+    middleware["coalescing"]["enabled"] = False
+    # Keep the configured weights: with unlimited quotas the derived
+    # requests_per_minute weights would all be equal
+    admission_tiers = middleware["admission"].setdefault("tiers", {})
+    for tier, weight in weights.items():
+        admission_tiers.setdefault(tier, {})["weight"] = weight
+        admission_tiers[tier]["max_wait_seconds"] = 60
+        admission_tiers[tier]["max_queue"] = 10_000
+    middleware["admission"].update(enabled=admission, max_concurrency=capacity)
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+
+
+async def _client(gateway: AIGateway, tier: str, deadline: float,
+                  latencies: dict[str, list[float]], errors: dict[str, int]) -> None:
+    i = 0
+    while time.monotonic() < deadline:
+        messages = [Message(role=MessageRole.USER, content=f"{tier} request {id(latencies)}-{i}")]
+        start = time.perf_counter()
+        try:
+            await gateway.complete(KEYS[tier], messages, model="fake-model", max_tokens=32)
+        except Exception:
+            errors[tier] += 1
+        else:
+            latencies[tier].append(time.perf_counter() - start)
+        i += 1
+
+
+async def _run(config: str, clients: dict[str, int], capacity: int,
+               latency_ms: float, duration: float) -> tuple[dict, dict]:
+    gateway = AIGateway(
+        config_path=config,
+        providers={"fake": CappedProvider(capacity, latency_ms)},
+    )
+    latencies: dict[str, list[float]] = {tier: [] for tier in clients}
+    errors = {tier: 0 for tier in clients}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        _client(gateway, tier, deadline, latencies, errors)
+        for tier, n in clients.items() for _ in range(n)
+    ))
+    await gateway.close()
+    return latencies, errors
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Weighted fair admission benchmark")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--capacity", type=int, default=16, help="upstream concurrent calls")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake provider latency")
+    parser.add_argument("--free", type=int, default=64, help="free-tier clients")
+    parser.add_argument("--standard", type=int, default=64, help="standard-tier clients")
+    parser.add_argument("--enterprise", type=int, default=8, help="enterprise-tier clients")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    clients = {"free": args.free, "standard": args.standard, "enterprise": args.enterprise}
+    print(f"clients {clients}, upstream capacity {args.capacity}, "
+          f"fake provider {args.latency_ms:g}ms, {args.duration:g}s per run\n")
+    print(f"{'admission':>9} {'tier':>10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "config.yaml")
+        for admission in (False, True):
+            _write_config(config, admission, args.capacity)
+            latencies, errors = asyncio.run(
+                _run(config, clients, args.capacity, args.latency_ms, args.duration)
+            )
+            for tier in clients:
+                lats = latencies[tier]
+                print(
+                    f"{'on' if admission else 'off':>9} {tier:>10} {len(lats) / args.duration:>8.0f} "
+                    f"{_percentile(lats, 0.50) * 1000:>8.1f} "
+                    f"{_percentile(lats, 0.95) * 1000:>8.1f} "
+                    f"{_percentile(lats, 0.99) * 1000:>8.1f} "
+                    f"{errors[tier]:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark for the columnar cost ledger.
+
+Writes a month of synthetic request costs into a CostLedger on disk,
+reopens it (sealed days come back via mmap), and times the finance-style
+queries: one key's monthly spend, one model's weekly spend, a
+group-by over every key, and re-pricing the whole month from
+config.yaml. Also reports bytes per row against the same
+rows held as RequestCost dataclasses.
+
+Usage:
+    python benchmarks/cost_ledger_benchmark.py --rows 1000000 --days 30
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from middleware import cost_ledger  # noqa: E402
+from middleware.cost_ledger import CostLedger  # noqa: E402
+from middleware.cost_tracker import RequestCost  # noqa: E402
+from middleware.pricing import load_pricing  # noqa: E402
+
+MODELS = list(load_pricing().per_1k_tokens())
+
+
+def _timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    result = fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if isinstance(result, dict):
+        summary = f"{len(result)} groups"
+    else:
+        summary = f"{result.requests} requests, ${result.cost:,.2f}"
+    print(f"  {label:<28} {elapsed_ms:>9.1f} ms   ({summary})")
+
+
+def _dataclass_bytes_per_row(sample: int = 10_000) -> float:
+    tracemalloc.start()
+    rows = [
+        RequestCost(MODELS[i % len(MODELS)], 500, 200, 0.001, 0.002, 0.003, time.time(), f"key-{i % 1000:04d}")
+        for i in range(sample)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return size / sample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cost ledger benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    key_ids = [f"key-{i:04d}" for i in range(args.keys)]
+    now = time.time()
+    start_ts = now - args.days * cost_ledger.SECONDS_PER_DAY
+    step = (now - start_ts) / args.rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = CostLedger(directory=directory)
+        t0 = time.perf_counter()
+        for i in range(args.rows):
+            ledger.append(
+                rng.choice(key_ids),
+                rng.choice(MODELS),
+                rng.randint(100, 4000),
+                rng.randint(50, 1000),
+                rng.random() * 0.05,
+                timestamp=start_ts + i * step,
+            )
+        ledger.close()
+        write_s = time.perf_counter() - t0
+        disk_bytes = sum(p.stat().st_size for p in Path(directory).rglob("*.bin"))
+
+        ledger = CostLedger(directory=directory)
+        print(f"{args.rows} rows over {args.days} days, {args.keys} keys "
+              f"(numpy: {'yes' if cost_ledger.np is not None else 'no'})\n")
+        print(f"  append                       {write_s / args.rows * 1e9:>9.0f} ns/row")
+        print(f"  ledger on disk               {disk_bytes / args.rows:>9.1f} bytes/row")
+        print(f"  ledger heap (today only)     {ledger.nbytes / 1e6:>9.1f} MB")
+        print(f"  RequestCost dataclasses      {_dataclass_bytes_per_row():>9.1f} bytes/row\n")
+
+        week_ago = now - 7 * cost_ledger.SECONDS_PER_DAY
+        _timed("one key, whole range", lambda: ledger.sum(key_id=key_ids[7]))
+        _timed("one model, last 7 days", lambda: ledger.sum(model=MODELS[0], start=week_ago))
+        _timed("total, last 7 days", lambda: ledger.sum(start=week_ago))
+        _timed("group by key, whole range", lambda: ledger.sum_by("key"))
+        _timed("group by model, last 7 days", lambda: ledger.sum_by("model", start=week_ago))
+        pricing = load_pricing()
+        _timed("reprice by model, whole range", lambda: ledger.reprice(pricing))
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
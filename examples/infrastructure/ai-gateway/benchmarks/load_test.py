@@ -0,0 +1,211 @@
+"""
+Load test for the multi-process gateway server.
+
+Starts server.py with the in-process FakeProvider (no API keys, no
+network) at each worker count, drives it with keep-alive HTTP clients
+spread over several client processes, and reports requests/sec and
+latency percentiles per worker count. Afterwards it checks that rate
+limits still hold across workers: a standard-tier key (60 requests/min)
+hammered through every worker must get exactly 60 requests through.
+
+Usage:
+    python benchmarks/load_test.py --workers 1,2,4 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+GATEWAY_DIR = Path(__file__).resolve().parent.parent
+LOAD_KEY = "sk-demo-enterprise-001"
+LIMIT_KEY = "sk-demo-standard-001"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_config(path: str) -> int:
+    """Copy config.yaml with the load-test key's tier effectively unlimited."""
+    with open(GATEWAY_DIR / "config.yaml") as f:
+        config = yaml.safe_load(f)
+    tiers = config["rate_limits"]["tiers"]
+    tiers["enterprise"] = {"requests_per_minute": 10**9, "tokens_per_minute": 10**12}
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+    return tiers["standard"]["requests_per_minute"]
+
+
+# ---- Raw keep-alive HTTP client -------------------------------------------
+
+async def _post(reader, writer, path: str, key: str, payload: dict) -> int:
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nhost: localhost\r\nauthorization: Bearer {key}\r\n"
+        f"content-type: application/json\r\ncontent-length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def _connection(port: int, key: str, deadline: float, max_requests: int,
+                      latencies: list, statuses: dict, tag: str) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    try:
+        while time.monotonic() < deadline and i < max_requests:
+            payload = {
+                "model": "fake-model",
+                # Unique content: measure the provider path, not the cache
+                "messages": [{"role": "user", "content": f"load test {tag}-{i}"}],
+                "max_tokens": 32,
+            }
+            start = time.perf_counter()
+            status = await _post(reader, writer, "/v1/chat/completions", key, payload)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            i += 1
+    finally:
+        writer.close()
+
+
+def _client_process(args: tuple) -> tuple[list[float], dict[int, int]]:
+    port, key, connections, duration, max_requests, tag = args
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    async def run() -> None:
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(
+            _connection(port, key, deadline, max_requests, latencies, statuses, f"{tag}.{c}")
+            for c in range(connections)
+        ))
+
+    asyncio.run(run())
+    return latencies, statuses
+
+
+def _drive(pool, port: int, key: str, client_procs: int, concurrency: int,
+           duration: float, max_requests: int = 10**9) -> tuple[list[float], dict[int, int], float]:
+    per_proc = max(1, concurrency // client_procs)
+    jobs = [(port, key, per_proc, duration, max_requests, f"{os.getpid()}.{p}.{time.time_ns()}")
+            for p in range(client_procs)]
+    start = time.perf_counter()
+    results = pool.map(_client_process, jobs)
+    elapsed = time.perf_counter() - start
+    latencies = sorted(lat for lats, _ in results for lat in lats)
+    statuses: dict[int, int] = {}
+    for _, counts in results:
+        for status, n in counts.items():
+            statuses[status] = statuses.get(status, 0) + n
+    return latencies, statuses, elapsed
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# ---- Server lifecycle ------------------------------------------------------
+
+def _start_server(config: str, port: int, workers: int, latency_ms: float) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "server.py", "--config", config, "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers),
+         "--fake-provider", "--fake-latency-ms", str(latency_ms)],
+        cwd=GATEWAY_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as s:
+                s.sendall(b"GET /health HTTP/1.1\r\nhost: localhost\r\nconnection: close\r\n\r\n")
+                if s.recv(12).startswith(b"HTTP/1.1 200"):
+                    return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Server did not start")
+
+
+def _stop_server(proc: subprocess.Popen) -> None:
+    proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Multi-process gateway load test")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=64, help="open connections")
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake provider latency")
+    args = parser.parse_args()
+
+    worker_counts = [int(w) for w in args.workers.split(",")]
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "config.yaml")
+        limit = _write_config(config)
+
+        print(f"{args.concurrency} connections from {args.client_procs} client processes, "
+              f"{args.duration:g}s per run, fake provider {args.latency_ms:g}ms\n")
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'non-200':>8}   limit check")
+
+        with multiprocessing.Pool(args.client_procs) as pool:
+            for workers in worker_counts:
+                port = _free_port()
+                server = _start_server(config, port, workers, args.latency_ms)
+                try:
+                    _drive(pool, port, LOAD_KEY, args.client_procs, args.concurrency, 1.0)  # warm up
+                    latencies, statuses, elapsed = _drive(
+                        pool, port, LOAD_KEY, args.client_procs, args.concurrency, args.duration
+                    )
+                    # Rate-limit check: 2.5x the limit, spread over every worker
+                    _, limit_statuses, _ = _drive(
+                        pool, port, LIMIT_KEY, args.client_procs, args.client_procs * 5,
+                        args.duration, max_requests=max(1, int(limit * 2.5) // (args.client_procs * 5)),
+                    )
+                finally:
+                    _stop_server(server)
+
+                ok = statuses.get(200, 0)
+                allowed = limit_statuses.get(200, 0)
+                verdict = "ok" if allowed == limit else "MISMATCH"
+                print(
+                    f"{workers:>7} {ok / elapsed:>9.0f} "
+                    f"{_percentile(latencies, 0.50) * 1000:>8.1f} "
+                    f"{_percentile(latencies, 0.95) * 1000:>8.1f} "
+                    f"{_percentile(latencies, 0.99) * 1000:>8.1f} "
+                    f"{sum(statuses.values()) - ok:>8}   "
+                    f"{allowed}/{limit} allowed ({verdict})"
+                )
+
+
+if __name__ == "__main__":
+    main()
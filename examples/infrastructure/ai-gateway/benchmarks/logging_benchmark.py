@@ -0,0 +1,109 @@
+"""
+Benchmark for the gateway's request logging overhead.
+
+Measures what AIGateway.complete pays on the event loop thread for its
+log_request + log_response calls, with the synchronous logging path and
+with the AsyncLogSink, against two outputs:
+
+- a fast stream (discards writes)
+- a slow stream that sleeps on every write, standing in for stdout
+  backpressure from a slow log shipper
+
+The synchronous path pays for the slow stream on every request; the
+sink path should stay flat and report sampled/dropped lines instead.
+
+Usage:
+    python benchmarks/logging_benchmark.py --requests 50000
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from middleware.logger import AsyncLogSink, GatewayLogger  # noqa: E402
+
+
+class NullStream(io.TextIOBase):
+    def write(self, s: str) -> int:
+        return len(s)
+
+
+class SlowStream(NullStream):
+    """Every write blocks, like a full stdout pipe."""
+
+    def __init__(self, delay: float) -> None:
+        self._delay = delay
+
+    def write(self, s: str) -> int:
+        time.sleep(self._delay)
+        return len(s)
+
+
+def _reset_logger(stream: io.TextIOBase | None) -> None:
+    """Point the shared 'ai_gateway' logger at a fresh handler."""
+    logger = logging.getLogger("ai_gateway")
+    logger.handlers.clear()
+    if stream is not None:
+        handler = logging.StreamHandler(stream)
+        from middleware.logger import StructuredFormatter
+        handler.setFormatter(StructuredFormatter())
+        logger.addHandler(handler)
+
+
+def run(label: str, gw_logger: GatewayLogger, requests: int) -> None:
+    start = time.perf_counter_ns()
+    for i in range(requests):
+        request_id = f"req-{i:08d}"
+        gw_logger.log_request(request_id=request_id, key_id="key-std-001", model="gpt-4o-mini")
+        gw_logger.log_response(
+            request_id=request_id,
+            provider="openrouter",
+            model="gpt-4o-mini",
+            input_tokens=512,
+            output_tokens=128,
+            latency_ms=843.2,
+            cost_usd=0.000154,
+        )
+    elapsed = time.perf_counter_ns() - start
+    per_request_us = elapsed / requests / 1000
+    gw_logger.close()
+    stats = gw_logger.stats()
+    extra = (
+        f"written={stats['written']} sampled_out={stats['sampled_out']} dropped={stats['dropped']}"
+        if stats else ""
+    )
+    print(f"  {label:<26} {per_request_us:>9.2f} us/request   {extra}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gateway logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--slow-write-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    slow_requests = max(1, args.requests // 20)
+    print(f"log_request + log_response per request ({args.requests} requests; "
+          f"{slow_requests} against the slow stream, {args.slow_write_ms}ms per write)\n")
+
+    _reset_logger(NullStream())
+    run("sync, fast stream", GatewayLogger(synchronous=True), args.requests)
+    _reset_logger(None)
+    run("sink, fast stream", GatewayLogger(sink=AsyncLogSink(NullStream())), args.requests)
+
+    _reset_logger(SlowStream(args.slow_write_ms / 1000))
+    run("sync, slow stream", GatewayLogger(synchronous=True), slow_requests)
+    _reset_logger(None)
+    run(
+        "sink, slow stream",
+        GatewayLogger(sink=AsyncLogSink(SlowStream(args.slow_write_ms / 1000), capacity=1000)),
+        slow_requests,
+    )
+
+
+if __name__ == "__main__":
+    main()
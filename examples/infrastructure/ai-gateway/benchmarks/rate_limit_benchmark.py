@@ -0,0 +1,97 @@
+"""
+Microbenchmark for the gateway rate limiter.
+
+Drives many distinct API keys through acheck_request / arecord_tokens
+(the two calls AIGateway.complete makes per request) and reports the
+cost per operation and the resident memory held by the limiter, for
+both the exact sliding-log mode and the approximate sliding-counter mode.
+
+Usage:
+    python benchmarks/rate_limit_benchmark.py --keys 100000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import gc
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from middleware.rate_limit import (  # noqa: E402
+    SLIDING_COUNTER,
+    SLIDING_LOG,
+    RateLimitConfig,
+    RateLimiter,
+)
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc, falls back to peak)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+async def run(mode: str, keys: int, rounds: int) -> None:
+    # Generous limits: the benchmark measures bookkeeping, not rejections
+    limits = {"bench": RateLimitConfig(requests_per_minute=10**9, tokens_per_minute=10**12)}
+    limiter = RateLimiter(tier_limits=limits, mode=mode)
+    key_ids = [f"key-{i:06d}" for i in range(keys)]
+
+    gc.collect()
+    rss_before = _rss_mb()
+    ops = 0
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for key_id in key_ids:
+            await limiter.acheck_request(key_id, tier="bench")
+            await limiter.arecord_tokens(key_id, 1500)
+            ops += 2
+    elapsed = time.perf_counter_ns() - start
+    rss_after = _rss_mb()
+
+    # One hot key: per-op cost must stay flat as its window fills up
+    hot_ops = keys * rounds
+    hot_start = time.perf_counter_ns()
+    for _ in range(hot_ops // 2):
+        await limiter.acheck_request("hot-key", tier="bench")
+        await limiter.arecord_tokens("hot-key", 1500)
+    hot_elapsed = time.perf_counter_ns() - hot_start
+
+    print(
+        f"{mode:<16} {elapsed / ops:>10.0f} {hot_elapsed / hot_ops:>12.0f} "
+        f"{rss_after - rss_before:>10.1f} {limiter.backend.tracked_keys:>10}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rate limiter microbenchmark")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--mode", choices=[SLIDING_LOG, SLIDING_COUNTER])
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run(args.mode, args.keys, args.rounds))
+        return
+
+    print(f"{args.keys} keys x {args.rounds} rounds (acheck_request + arecord_tokens)\n")
+    print(f"{'mode':<16} {'ns/op':>10} {'hot ns/op':>12} {'RSS +MB':>10} {'keys':>10}")
+    # One process per mode so freed memory doesn't skew the RSS column
+    for mode in (SLIDING_LOG, SLIDING_COUNTER):
+        subprocess.run(
+            [sys.executable, __file__, "--mode", mode,
+             "--keys", str(args.keys), "--rounds", str(args.rounds)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
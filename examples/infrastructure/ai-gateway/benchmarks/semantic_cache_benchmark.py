@@ -0,0 +1,83 @@
+"""
+Benchmark for the semantic cache index.
+
+Fills one namespace with synthetic FAQ-style prompts, then times
+lookups for paraphrased (hit) and unrelated (miss) queries. Run it with
+and without NumPy installed to see the vectorized and pure-Python paths.
+
+Usage:
+    python benchmarks/semantic_cache_benchmark.py --entries 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from middleware import semantic_cache  # noqa: E402
+from middleware.semantic_cache import SemanticCache  # noqa: E402
+from providers.base import (  # noqa: E402
+    CompletionRequest,
+    CompletionResponse,
+    Message,
+    MessageRole,
+    Usage,
+)
+
+VERBS = ["reset", "change", "update", "delete", "export", "share", "rename", "restore"]
+NOUNS = ["password", "email", "invoice", "workspace", "api key", "profile", "report", "team"]
+TOPICS = [f"topic{i}" for i in range(2000)]
+
+
+def _request(text: str) -> CompletionRequest:
+    return CompletionRequest(
+        messages=[
+            Message(role=MessageRole.SYSTEM, content="You are a support assistant."),
+            Message(role=MessageRole.USER, content=text),
+        ],
+        model="gpt-4o-mini",
+        temperature=0.0,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Semantic cache benchmark")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    cache = SemanticCache(threshold=0.9, max_entries=args.entries)
+    response = CompletionResponse(
+        content="Go to Settings.", model="gpt-4o-mini", provider="bench",
+        usage=Usage(40, 10, 50), latency_ms=900.0,
+    )
+
+    prompts = []
+    start = time.perf_counter()
+    for i in range(args.entries):
+        text = f"How do I {rng.choice(VERBS)} my {rng.choice(NOUNS)} for {rng.choice(TOPICS)} case {i}?"
+        prompts.append(text)
+        cache.store(_request(text), response)
+    fill_s = time.perf_counter() - start
+
+    paraphrases = [p.lower().rstrip("?") for p in rng.sample(prompts, args.queries)]
+    unrelated = [f"What is the weather like in city {i} today?" for i in range(args.queries)]
+
+    print(f"{args.entries} entries, numpy: {'yes' if semantic_cache.np is not None else 'no'}")
+    print(f"  store                {fill_s / args.entries * 1e6:>9.1f} us/entry")
+    for label, queries in (("paraphrase lookup", paraphrases), ("unrelated lookup", unrelated)):
+        hits = 0
+        start = time.perf_counter()
+        for text in queries:
+            found, _ = cache.lookup(_request(text))
+            hits += found is not None
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<20} {elapsed / len(queries) * 1e3:>9.3f} ms/lookup   hits={hits}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
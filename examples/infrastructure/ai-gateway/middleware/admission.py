@@ -0,0 +1,247 @@
+"""
+Weighted fair admission for provider calls.
+
+RateLimiter caps each key over a minute; it says nothing about who goes
+first when the gateway is saturated right now. AdmissionScheduler caps
+provider calls in flight at max_concurrency. Past that, callers queue
+per tier and each freed slot goes to the next tier in weighted fair
+order, so under contention a tier's share of slots is proportional to
+its weight. The gateway defaults each weight to the tier's
+requests_per_minute (free 10, standard 60, enterprise 300): enterprise
+requests barely queue while free and standard absorb the backpressure.
+
+- Fairness: start-time fair queuing. Each tier has a virtual time that
+  advances by 1/weight per admission, and the backlogged tier with the
+  lowest virtual time goes next. A tier returning from idle starts at
+  the current virtual time, so idling doesn't bank credit.
+- Deadlines: every waiter has a deadline (its tier's max_wait_seconds,
+  or a tighter per-call timeout). Within a tier the earliest deadline
+  goes first, and a waiter whose deadline has passed is failed with
+  QueueTimeout instead of being handed a slot it can no longer use.
+- Depth: each tier queues at most max_queue waiters; past that,
+  acquire() fails fast with QueueFull.
+
+Both errors subclass RateLimitExceeded and carry retry_after_seconds.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from middleware.rate_limit import RateLimitExceeded
+
+
+class QueueFull(RateLimitExceeded):
+    """The tier's admission queue is at max_queue."""
+
+
+class QueueTimeout(RateLimitExceeded):
+    """A request waited max_wait_seconds without getting a provider slot."""
+
+
+@dataclass(frozen=True)
+class TierQueueConfig:
+    """Admission settings for one tier."""
+    weight: float = 1.0
+    max_queue: int = 256
+    max_wait_seconds: float = 10.0
+
+
+class _Waiter:
+    __slots__ = ("enqueued", "deadline", "seq", "future")
+
+    def __init__(self, enqueued: float, deadline: float, seq: int, future: asyncio.Future) -> None:
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.seq = seq
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+
+class _TierQueue:
+    __slots__ = (
+        "config", "heap", "waiting", "vtime",
+        "admitted", "rejected", "expired", "waits",
+    )
+
+    def __init__(self, config: TierQueueConfig, window: int) -> None:
+        self.config = config
+        self.heap: list[_Waiter] = []
+        self.waiting = 0  # live waiters; the heap may also hold abandoned ones
+        self.vtime = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.waits: deque[float] = deque(maxlen=window)
+
+
+class AdmissionScheduler:
+    """
+    Caps concurrent provider calls; queues the overflow fairly per tier.
+
+    Usage:
+        scheduler = AdmissionScheduler(
+            max_concurrency=64,
+            tiers={"free": TierQueueConfig(weight=10), "enterprise": TierQueueConfig(weight=300)},
+        )
+        async with scheduler.slot("enterprise") as waited_seconds:
+            response = await provider.complete(request)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        tiers: dict[str, TierQueueConfig] | None = None,
+        window: int = 1024,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self._max_concurrency = max_concurrency
+        self._configs = tiers or {}
+        self._window = window
+        self._tiers: dict[str, _TierQueue] = {}
+        self._in_flight = 0
+        self._queued = 0
+        self._vtime = 0.0
+        self._seq = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get(self, tier: str) -> _TierQueue:
+        queue = self._tiers.get(tier)
+        if queue is None:
+            # Unknown tiers queue like free, as with RateLimiter
+            config = self._configs.get(tier) or self._configs.get("free") or TierQueueConfig()
+            queue = self._tiers[tier] = _TierQueue(config, self._window)
+        return queue
+
+    def _admit(self, queue: _TierQueue, waited: float) -> None:
+        # Start tag: the later of the tier's own virtual time and the
+        # system's, so a tier back from idle can't claim a burst of slots
+        start = max(queue.vtime, self._vtime)
+        self._vtime = start
+        queue.vtime = start + 1.0 / queue.config.weight
+        queue.admitted += 1
+        queue.waits.append(waited)
+        self._in_flight += 1
+
+    async def acquire(self, tier: str, timeout: float | None = None) -> float:
+        """
+        Take a provider slot for a request from `tier`.
+
+        Returns the seconds spent queued (0.0 when a slot was free).
+        Raises QueueFull when the tier's queue is at max_queue, and
+        QueueTimeout when no slot came within the tier's max_wait_seconds
+        (or `timeout`, if shorter). Pair every successful acquire() with
+        one release().
+        """
+        queue = self._get(tier)
+        if self._in_flight < self._max_concurrency and self._queued == 0:
+            self._admit(queue, 0.0)
+            return 0.0
+
+        config = queue.config
+        if queue.waiting >= config.max_queue:
+            queue.rejected += 1
+            raise QueueFull(
+                f"Admission queue full for tier '{tier}' ({config.max_queue} waiting)",
+                retry_after_seconds=config.max_wait_seconds,
+            )
+
+        max_wait = config.max_wait_seconds if timeout is None else min(timeout, config.max_wait_seconds)
+        start = time.monotonic()
+        waiter = _Waiter(start, start + max_wait, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(queue.heap, waiter)
+        queue.waiting += 1
+        self._queued += 1
+        try:
+            await asyncio.wait_for(waiter.future, max_wait)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the future; _dispatch will drop it
+            queue.waiting -= 1
+            self._queued -= 1
+            queue.expired += 1
+            raise QueueTimeout(
+                f"No provider slot for tier '{tier}' within {max_wait:g}s",
+                retry_after_seconds=max_wait,
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                queue.waiting -= 1
+                self._queued -= 1
+            elif waiter.future.exception() is None:
+                # Granted a slot just as the caller went away: pass it on
+                self.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        """Return a slot taken by acquire() and admit the next waiter."""
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._in_flight < self._max_concurrency and self._queued:
+            queue = min(
+                (q for q in self._tiers.values() if q.waiting),
+                key=lambda q: max(q.vtime, self._vtime),
+            )
+            waiter = self._pop(queue, now)
+            if waiter is not None:
+                self._admit(queue, now - waiter.enqueued)
+                waiter.future.set_result(None)
+
+    def _pop(self, queue: _TierQueue, now: float) -> _Waiter | None:
+        """Next live waiter in deadline order, expiring any already late."""
+        while queue.heap:
+            waiter = heapq.heappop(queue.heap)
+            if waiter.future.done():
+                continue  # timed out or cancelled; already uncounted
+            queue.waiting -= 1
+            self._queued -= 1
+            if waiter.deadline <= now:
+                queue.expired += 1
+                waiter.future.set_exception(QueueTimeout(
+                    "Deadline passed while queued for a provider slot",
+                    retry_after_seconds=queue.config.max_wait_seconds,
+                ))
+                continue
+            return waiter
+        return None
+
+    @asynccontextmanager
+    async def slot(self, tier: str, timeout: float | None = None) -> AsyncIterator[float]:
+        """acquire()/release() as a context manager; yields seconds queued."""
+        waited = await self.acquire(tier, timeout)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, object]:
+        """In-flight count, plus queue depth, outcomes and wait times per tier."""
+        tiers = {}
+        for name, queue in self._tiers.items():
+            waits = sorted(queue.waits)
+            tiers[name] = {
+                "weight": queue.config.weight,
+                "queued": queue.waiting,
+                "admitted": queue.admitted,
+                "rejected": queue.rejected,
+                "expired": queue.expired,
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0.0,
+            }
+        return {"in_flight": self._in_flight, "max_concurrency": self._max_concurrency, "tiers": tiers}
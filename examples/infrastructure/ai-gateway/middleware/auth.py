@@ -9,23 +9,46 @@ The book's gateway pattern (Chapter 4) uses the x-authorized-tools
 header with signed JWTs for tool-level access control. This simplified
 example demonstrates the same pattern with API key authentication.
 
+Keys live behind a KeyStore, indexed by the SHA-256 digest of the key
+(the same digest hash_key_for_logging truncates), so raw keys are never
+stored. Once keys sit in a database, a store lookup per completion
+would add a round trip to every request, so AuthMiddleware keeps:
+
+- a TTL cache of immutable AuthContext objects, one per key, shared by
+  every request that presents that key
+- a bounded negative cache of unknown and deactivated keys, so a client
+  retrying a bad key (or a flood of them) is answered without the store
+- single-flight store lookups, so a burst of first requests for one
+  key makes one round trip
+
+Stores push invalidations (subscribe()), so deactivating a key takes
+effect on the next request rather than after the TTL.
+
 Reference: Chapter 4 - The AI Tool Gateway Pattern
 """
 
+import asyncio
 import hashlib
-import hmac
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AuthContext:
-    """Carries identity information through the middleware chain."""
+    """Carries identity information through the middleware chain.
+
+    Immutable: one instance is cached per key and shared by every
+    request that presents it.
+    """
     api_key_id: str
     tier: str = "free"
-    scopes: list[str] = field(default_factory=lambda: ["completions"])
-    metadata: dict[str, Any] = field(default_factory=dict)
+    scopes: frozenset[str] = frozenset({"completions"})
+    metadata: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
 
 
 # ---- In-memory key store (replace with a database in production) ----------
@@ -52,6 +75,11 @@ _API_KEYS: dict[str, dict[str, Any]] = {
 }
 
 
+def key_digest(api_key: str) -> str:
+    """SHA-256 hex digest of an API key: the key store's index."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
 class AuthenticationError(Exception):
     """Raised when authentication fails."""
 
@@ -60,24 +88,115 @@ class AuthorizationError(Exception):
     """Raised when a valid key lacks the required scope."""
 
 
+class KeyStore(ABC):
+    """
+    Storage for API key records, indexed by key_digest().
+
+    A record is a dict with "id", "tier", "scopes" and "active" (the
+    shape of _API_KEYS values). Stores call every subscribed callback
+    with a key's digest when that key is added, changed or deactivated,
+    so caches in front of them drop it immediately.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: list[Callable[[str], None]] = []
+
+    @abstractmethod
+    async def lookup(self, digest: str) -> dict[str, Any] | None:
+        """Return the record for a key digest, or None if unknown."""
+        ...
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(digest)` whenever a key's record changes."""
+        self._subscribers.append(callback)
+
+    def _notify(self, digest: str) -> None:
+        for callback in self._subscribers:
+            callback(digest)
+
+
+class InMemoryKeyStore(KeyStore):
+    """
+    Process-local key store. Raw keys are hashed on the way in.
+
+    Usage:
+        store = InMemoryKeyStore({"sk-live-abc": {"id": "key-1", "tier": "standard",
+                                                  "scopes": ["completions"], "active": True}})
+        store.deactivate("key-1")  # AuthMiddleware rejects it from the next request
+    """
+
+    def __init__(self, keys: dict[str, dict[str, Any]] | None = None) -> None:
+        super().__init__()
+        self._records: dict[str, dict[str, Any]] = {}
+        self._digests: dict[str, str] = {}  # key id -> digest
+        for api_key, record in (keys or {}).items():
+            self.put(api_key, record)
+
+    async def lookup(self, digest: str) -> dict[str, Any] | None:
+        return self._records.get(digest)
+
+    def put(self, api_key: str, record: dict[str, Any]) -> None:
+        """Add or replace a key."""
+        digest = key_digest(api_key)
+        self._records[digest] = dict(record)
+        self._digests[record["id"]] = digest
+        self._notify(digest)
+
+    def deactivate(self, key_id: str) -> bool:
+        """Deactivate a key by id; False if there is no such key."""
+        digest = self._digests.get(key_id)
+        if digest is None:
+            return False
+        self._records[digest] = {**self._records[digest], "active": False}
+        self._notify(digest)
+        return True
+
+
 class AuthMiddleware:
     """
     Authenticate incoming requests by API key.
 
     In production, replace the in-memory store with your identity
-    provider (Auth0, Supabase Auth, etc.). The interface stays the
-    same --- validate credentials, return an AuthContext.
+    provider (Auth0, Supabase Auth, etc.) behind a KeyStore. The
+    interface stays the same --- validate credentials, return an
+    AuthContext.
 
     Usage:
         auth = AuthMiddleware()
-        ctx = auth.authenticate("Bearer sk-demo-standard-001")
+        ctx = await auth.authenticate("Bearer sk-demo-standard-001")
         auth.require_scope(ctx, "streaming")
     """
 
-    def __init__(self, keys: dict[str, dict[str, Any]] | None = None) -> None:
-        self._keys = keys or _API_KEYS
+    def __init__(
+        self,
+        keys: dict[str, dict[str, Any]] | None = None,
+        store: KeyStore | None = None,
+        cache_ttl_seconds: float = 60.0,
+        negative_ttl_seconds: float = 30.0,
+        max_cache_entries: int = 100_000,
+        max_negative_entries: int = 100_000,
+    ) -> None:
+        self._store = store or InMemoryKeyStore(keys or _API_KEYS)
+        self._store.subscribe(self.invalidate)
+        self._cache_ttl = cache_ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._max_cache = max_cache_entries
+        self._max_negative = max_negative_entries
+        # digest -> (expires_at, context); least recently used evicted
+        # first, so memory stays bounded however many keys authenticate
+        self._cache: OrderedDict[str, tuple[float, AuthContext]] = OrderedDict()
+        # digest -> (expires_at, error message); oldest evicted first, so a
+        # flood of distinct bad keys can't grow it without bound
+        self._negative: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped by invalidate(): a lookup that raced an invalidation
+        # returns its answer but doesn't cache it
+        self._epoch = 0
+        self._hits = 0
+        self._negative_hits = 0
+        self._store_lookups = 0
 
-    def authenticate(self, authorization_header: str) -> AuthContext:
+    async def authenticate(self, authorization_header: str) -> AuthContext:
         """
         Validate the Authorization header and return an AuthContext.
 
@@ -90,19 +209,72 @@ class AuthMiddleware:
         if len(parts) != 2 or parts[0] != "Bearer":
             raise AuthenticationError("Authorization header must use Bearer scheme")
 
-        api_key = parts[1]
-        key_data = self._keys.get(api_key)
+        digest = key_digest(parts[1])
+        now = time.monotonic()
+
+        cached = self._cache.get(digest)
+        if cached is not None:
+            if cached[0] > now:
+                self._cache.move_to_end(digest)
+                self._hits += 1
+                return cached[1]
+            del self._cache[digest]
+
+        rejected = self._negative.get(digest)
+        if rejected is not None:
+            if rejected[0] > now:
+                self._negative_hits += 1
+                raise AuthenticationError(rejected[1])
+            del self._negative[digest]
 
-        if key_data is None:
-            raise AuthenticationError("Invalid API key")
-        if not key_data.get("active", False):
-            raise AuthenticationError("API key is deactivated")
+        pending = self._inflight.get(digest)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(digest))
+            self._inflight[digest] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        # Shielded: one caller going away mustn't cancel the others' lookup
+        return await asyncio.shield(pending)
 
-        return AuthContext(
+    async def _load(self, digest: str) -> AuthContext:
+        """Look a key up in the store and cache the outcome."""
+        epoch = self._epoch
+        self._store_lookups += 1
+        key_data = await self._store.lookup(digest)
+
+        if key_data is None or not key_data.get("active", False):
+            message = "Invalid API key" if key_data is None else "API key is deactivated"
+            if epoch == self._epoch:
+                self._negative[digest] = (time.monotonic() + self._negative_ttl, message)
+                if len(self._negative) > self._max_negative:
+                    self._negative.popitem(last=False)
+            raise AuthenticationError(message)
+
+        ctx = AuthContext(
             api_key_id=key_data["id"],
             tier=key_data.get("tier", "free"),
-            scopes=key_data.get("scopes", ["completions"]),
+            scopes=frozenset(key_data.get("scopes", ["completions"])),
         )
+        if epoch == self._epoch:
+            self._cache[digest] = (time.monotonic() + self._cache_ttl, ctx)
+            if len(self._cache) > self._max_cache:
+                self._cache.popitem(last=False)
+        return ctx
+
+    def invalidate(self, digest: str) -> None:
+        """Drop a key from both caches (stores call this on changes)."""
+        self._epoch += 1
+        self._cache.pop(digest, None)
+        self._negative.pop(digest, None)
+
+    def stats(self) -> dict[str, int]:
+        """Cache hits, negative-cache hits, store lookups and cache sizes."""
+        return {
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "store_lookups": self._store_lookups,
+            "cached": len(self._cache),
+            "negative_cached": len(self._negative),
+        }
 
     @staticmethod
     def require_scope(ctx: AuthContext, scope: str) -> None:
@@ -118,6 +290,7 @@ class AuthMiddleware:
         Return a safe hash of the key for structured logs.
 
         Never log raw API keys. This produces a deterministic but
-        irreversible identifier for correlation.
+        irreversible identifier for correlation --- a prefix of the
+        key store's index digest.
         """
-        return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+        return key_digest(api_key)[:12]
@@ -0,0 +1,543 @@
+"""
+Columnar cost ledger for the AI Gateway.
+
+Keeping every request as a RequestCost dataclass costs a few hundred
+bytes per row --- hundreds of MB at a few million requests a day. The
+ledger stores the same facts as typed columns instead:
+
+    timestamp (f64) | key (u32) | model (u32) | input (u32) | output (u32) | cost (f64)
+
+32 bytes per row. Key and model strings are interned to integer ids.
+Rows are grouped into one segment per UTC day; with a directory, each
+segment is a folder of column files, appended to on flush() and read
+back through mmap, so a month of history costs page cache rather than
+heap. Rows that arrive out of timestamp order (a clock stepping back,
+a back-fill) go to a small late segment kept sorted on its own, so
+every segment stays binary-searchable. Range queries binary-search the
+timestamp column and aggregate whole column slices --- with NumPy when it is installed, otherwise with
+array/memoryview and C-level builtins.
+
+Usage:
+    ledger = CostLedger(directory="cost-ledger")
+    tracker = CostTracker(ledger=ledger)
+    ...
+    totals = ledger.sum(key_id="key-std-001", start=month_start)
+    by_model = ledger.sum_by("model", start=month_start)
+    repriced = ledger.reprice(load_pricing("config.yaml"), start=month_start)
+
+Reference: Chapter 4 - The Infrastructure Stack (Day 1 requirements)
+"""
+
+import calendar
+import contextlib
+import json
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import compress
+
+from .pricing import PricingTable
+
+try:
+    import numpy as np
+except ImportError:  # optional: queries fall back to array/memoryview
+    np = None
+
+
+SECONDS_PER_DAY = 86400
+
+# Column name -> array typecode (native byte order)
+COLUMNS: dict[str, str] = {
+    "timestamp": "d",
+    "key": "I",
+    "model": "I",
+    "input_tokens": "I",
+    "output_tokens": "I",
+    "cost": "d",
+}
+
+GROUP_COLUMNS = ("key", "model")
+
+# Directory (and day) of the segment holding out-of-order rows
+LATE_SEGMENT = "late"
+LATE_DAY = -1
+
+
+@dataclass
+class LedgerTotals:
+    """Aggregated usage for a ledger query."""
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+
+class _Segment:
+    """One UTC day of rows, column by column."""
+
+    def __init__(self, day: int, path: str | None = None) -> None:
+        self.day = day
+        self.path = path
+        # In-memory rows: the whole segment for the active day, or rows
+        # not yet flushed. Sealed on-disk segments use _maps instead.
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.flushed = 0
+        self._maps: list[mmap.mmap] = []
+        self._views: dict[str, memoryview] | None = None
+
+    def __len__(self) -> int:
+        if self._views is not None:
+            return len(self._views["timestamp"])
+        return len(self.columns["timestamp"])
+
+    @classmethod
+    def load(cls, day: int, path: str, writable: bool) -> "_Segment":
+        """Open an existing segment: into memory if active, else via mmap."""
+        segment = cls(day, path)
+        if writable:
+            for name, column in segment.columns.items():
+                file_path = os.path.join(path, f"{name}.bin")
+                with open(file_path, "rb") as f:
+                    column.frombytes(f.read())
+            # A crash mid-flush can leave columns of unequal length
+            rows = min(len(c) for c in segment.columns.values())
+            for column in segment.columns.values():
+                del column[rows:]
+            segment.flushed = rows
+            return segment
+
+        views: dict[str, memoryview] = {}
+        for name, code in COLUMNS.items():
+            file_path = os.path.join(path, f"{name}.bin")
+            if os.path.getsize(file_path) == 0:
+                views[name] = memoryview(array(code))
+                continue
+            with open(file_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            segment._maps.append(mapped)
+            views[name] = memoryview(mapped).cast(code)
+        rows = min(len(v) for v in views.values())
+        segment._views = {name: view[:rows] for name, view in views.items()}
+        return segment
+
+    def column(self, name: str):
+        """A buffer-protocol view of a column (array or mmap-backed memoryview)."""
+        if self._views is not None:
+            return self._views[name]
+        return self.columns[name]
+
+    def append(
+        self, timestamp: float, key: int, model: int,
+        input_tokens: int, output_tokens: int, cost: float,
+    ) -> None:
+        cols = self.columns
+        cols["timestamp"].append(timestamp)
+        cols["key"].append(key)
+        cols["model"].append(model)
+        cols["input_tokens"].append(input_tokens)
+        cols["output_tokens"].append(output_tokens)
+        cols["cost"].append(cost)
+
+    def insert(
+        self, timestamp: float, key: int, model: int,
+        input_tokens: int, output_tokens: int, cost: float,
+    ) -> None:
+        """Insert a row in timestamp order; rewrite() persists it."""
+        cols = self.columns
+        i = bisect_right(cols["timestamp"], timestamp)
+        cols["timestamp"].insert(i, timestamp)
+        cols["key"].insert(i, key)
+        cols["model"].insert(i, model)
+        cols["input_tokens"].insert(i, input_tokens)
+        cols["output_tokens"].insert(i, output_tokens)
+        cols["cost"].insert(i, cost)
+
+    def drop_before(self, timestamp: float) -> int:
+        """Delete rows older than `timestamp`; returns how many."""
+        cols = self.columns
+        n = bisect_left(cols["timestamp"], timestamp)
+        if n:
+            for column in cols.values():
+                del column[:n]
+        return n
+
+    def rewrite(self) -> None:
+        """Replace the column files with the in-memory rows."""
+        if self.path is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for name, column in self.columns.items():
+            file_path = os.path.join(self.path, f"{name}.bin")
+            with open(file_path + ".tmp", "wb") as f:
+                f.write(memoryview(column))
+            os.replace(file_path + ".tmp", file_path)
+        self.flushed = len(self)
+
+    def flush(self) -> None:
+        """Append unflushed rows to the column files."""
+        if self.path is None or self.flushed == len(self):
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for name, column in self.columns.items():
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                f.write(memoryview(column)[self.flushed:])
+        self.flushed = len(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Heap bytes held by in-memory columns (mmap pages not counted)."""
+        if self._views is not None:
+            return 0
+        return sum(c.itemsize * len(c) for c in self.columns.values())
+
+    def close(self) -> None:
+        if self._views is not None:
+            for view in self._views.values():
+                view.release()
+            self._views = None
+        for mapped in self._maps:
+            # NumPy arrays from an earlier query may still reference the map
+            with contextlib.suppress(BufferError):
+                mapped.close()
+        self._maps.clear()
+
+
+class CostLedger:
+    """
+    Append-only, columnar record of every request's cost.
+
+    Appends go to the active (today's) segment in memory; flush() writes
+    them to disk, and happens automatically every `flush_every` rows and
+    on day rotation. Without a directory the ledger is memory-only, and
+    `retention_days` bounds how many days are kept.
+
+    Rows normally arrive in timestamp order (they are recorded as
+    requests complete), which is what makes range lookups a binary
+    search. A row older than the last one appended goes to the late
+    segment instead: kept sorted by insertion, rewritten whole on
+    flush(), and searched by every range query along with the days.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        flush_every: int = 4096,
+        retention_days: int | None = None,
+    ) -> None:
+        self._directory = directory
+        self._flush_every = flush_every
+        self._retention_days = retention_days
+        self._segments: dict[int, _Segment] = {}
+        self._active: _Segment | None = None
+        self._late = _Segment(LATE_DAY, self._segment_path(LATE_DAY))
+        # Late-segment rows inserted or dropped since the last rewrite
+        self._late_changes = 0
+        self._names: dict[str, list[str]] = {col: [] for col in GROUP_COLUMNS}
+        self._ids: dict[str, dict[str, int]] = {col: {} for col in GROUP_COLUMNS}
+        self._ids_dirty = False
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    # ---- Persistence -------------------------------------------------------
+
+    def _ids_path(self) -> str:
+        return os.path.join(self._directory, "ids.json")
+
+    def _segment_path(self, day: int) -> str | None:
+        if self._directory is None:
+            return None
+        if day == LATE_DAY:
+            return os.path.join(self._directory, LATE_SEGMENT)
+        name = time.strftime("%Y-%m-%d", time.gmtime(day * SECONDS_PER_DAY))
+        return os.path.join(self._directory, name)
+
+    def _load(self) -> None:
+        if os.path.exists(self._ids_path()):
+            with open(self._ids_path()) as f:
+                self._names = json.load(f)
+            self._ids = {
+                col: {name: i for i, name in enumerate(names)}
+                for col, names in self._names.items()
+            }
+        today = int(time.time() // SECONDS_PER_DAY)
+        for entry in sorted(os.listdir(self._directory)):
+            path = os.path.join(self._directory, entry)
+            if not os.path.isdir(path):
+                continue
+            if entry == LATE_SEGMENT:
+                self._late = _Segment.load(LATE_DAY, path, writable=True)
+                continue
+            day = calendar.timegm(time.strptime(entry, "%Y-%m-%d")) // SECONDS_PER_DAY
+            segment = _Segment.load(day, path, writable=(day == today))
+            self._segments[day] = segment
+            if day == today:
+                self._active = segment
+
+    def _save_ids(self) -> None:
+        if self._directory is None or not self._ids_dirty:
+            return
+        tmp = self._ids_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._names, f)
+        os.replace(tmp, self._ids_path())
+        self._ids_dirty = False
+
+    # ---- Writes ------------------------------------------------------------
+
+    def _intern(self, column: str, name: str) -> int:
+        ids = self._ids[column]
+        ident = ids.get(name)
+        if ident is None:
+            ident = ids[name] = len(self._names[column])
+            self._names[column].append(name)
+            self._ids_dirty = True
+        return ident
+
+    def _rotate(self, day: int) -> _Segment:
+        """Seal the active segment and start a new one for `day`."""
+        if self._active is not None:
+            self._active.flush()
+            self._save_ids()
+            if self._active.path is not None and os.path.isdir(self._active.path):
+                # Sealed segments are served from mmap, not the heap
+                old_day = self._active.day
+                self._active.close()
+                self._segments[old_day] = _Segment.load(old_day, self._active.path, writable=False)
+        self._active = self._segments[day] = _Segment(day, self._segment_path(day))
+        if self._retention_days is not None:
+            for old in [d for d in self._segments if d <= day - self._retention_days]:
+                self._segments.pop(old).close()
+            horizon = (day - self._retention_days + 1) * SECONDS_PER_DAY
+            self._late_changes += self._late.drop_before(horizon)
+        return self._active
+
+    def append(
+        self,
+        key_id: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost: float,
+        timestamp: float | None = None,
+    ) -> None:
+        """Append one request's cost (out-of-order rows go to the late segment)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        day = int(timestamp // SECONDS_PER_DAY)
+        segment = self._active
+        row = (
+            timestamp,
+            self._intern("key", key_id),
+            self._intern("model", model),
+            input_tokens,
+            output_tokens,
+            cost,
+        )
+        if segment is None:
+            # No active day yet: a day already on disk is sealed
+            late = bool(self._segments) and day <= max(self._segments)
+        else:
+            late = day < segment.day or (
+                len(segment) > 0 and timestamp < segment.columns["timestamp"][-1]
+            )
+        if late:
+            self._late.insert(*row)
+            self._late_changes += 1
+            if self._late_changes >= self._flush_every:
+                self.flush()
+            return
+        if segment is None or day > segment.day:
+            segment = self._rotate(day)
+        segment.append(*row)
+        if len(segment) - segment.flushed >= self._flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write unflushed rows and new interned names to disk."""
+        if self._active is not None:
+            self._active.flush()
+        if self._late_changes:
+            self._late.rewrite()
+            self._late_changes = 0
+        self._save_ids()
+
+    def close(self) -> None:
+        self.flush()
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+        self._active = None
+        self._late.close()
+
+    # ---- Queries -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return sum(len(s) for s in self._segments.values()) + len(self._late)
+
+    @property
+    def nbytes(self) -> int:
+        """Heap bytes held by in-memory segments."""
+        return sum(s.nbytes for s in self._segments.values()) + self._late.nbytes
+
+    def _slices(self, start: float | None, end: float | None):
+        """Yield (segment, lo, hi) row ranges covering [start, end)."""
+        first_day = None if start is None else int(start // SECONDS_PER_DAY)
+        last_day = None if end is None else int(end // SECONDS_PER_DAY)
+        days = [
+            self._segments[day] for day in sorted(self._segments)
+            if not (first_day is not None and day < first_day)
+            and not (last_day is not None and day > last_day)
+        ]
+        for segment in (*days, self._late):
+            timestamps = segment.column("timestamp")
+            lo = 0 if start is None else bisect_left(timestamps, start)
+            hi = len(segment) if end is None else bisect_left(timestamps, end)
+            if lo < hi:
+                yield segment, lo, hi
+
+    def _filter_id(self, column: str, name: str | None) -> int | None:
+        """Interned id for a filter value; -1 if the name was never seen."""
+        if name is None:
+            return None
+        return self._ids[column].get(name, -1)
+
+    def sum(
+        self,
+        key_id: str | None = None,
+        model: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> LedgerTotals:
+        """Total usage matching the filters, over [start, end)."""
+        key = self._filter_id("key", key_id)
+        model_id = self._filter_id("model", model)
+        totals = LedgerTotals()
+        if key == -1 or model_id == -1:
+            return totals
+
+        for segment, lo, hi in self._slices(start, end):
+            cols = {name: segment.column(name)[lo:hi] for name in COLUMNS}
+            if np is not None:
+                arrays = {name: np.frombuffer(col, dtype=COLUMNS[name]) for name, col in cols.items()}
+                mask = np.ones(hi - lo, dtype=bool)
+                if key is not None:
+                    mask &= arrays["key"] == key
+                if model_id is not None:
+                    mask &= arrays["model"] == model_id
+                totals.requests += int(mask.sum())
+                totals.input_tokens += int(arrays["input_tokens"][mask].sum(dtype=np.int64))
+                totals.output_tokens += int(arrays["output_tokens"][mask].sum(dtype=np.int64))
+                totals.cost += float(arrays["cost"][mask].sum())
+                continue
+
+            if key is None and model_id is None:
+                totals.requests += hi - lo
+                totals.input_tokens += sum(cols["input_tokens"])
+                totals.output_tokens += sum(cols["output_tokens"])
+                totals.cost += sum(cols["cost"])
+                continue
+            if key is not None and model_id is not None:
+                mask = [k == key and m == model_id for k, m in zip(cols["key"], cols["model"])]
+            elif key is not None:
+                mask = [k == key for k in cols["key"]]
+            else:
+                mask = [m == model_id for m in cols["model"]]
+            totals.requests += sum(mask)
+            totals.input_tokens += sum(compress(cols["input_tokens"], mask))
+            totals.output_tokens += sum(compress(cols["output_tokens"], mask))
+            totals.cost += sum(compress(cols["cost"], mask))
+        return totals
+
+    def sum_by(
+        self,
+        group: str,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> dict[str, LedgerTotals]:
+        """Usage over [start, end) grouped by "key" or "model"."""
+        if group not in GROUP_COLUMNS:
+            raise ValueError(f"group must be one of {GROUP_COLUMNS}, got {group!r}")
+        return self._sum_by(group, start, end)
+
+    def reprice(
+        self,
+        pricing: PricingTable,
+        start: float | None = None,
+        end: float | None = None,
+        group: str = "model",
+    ) -> dict[str, LedgerTotals]:
+        """
+        Like sum_by(), but each row is costed with `pricing` instead of
+        the price recorded at the time.
+
+        For checking a price change against history, or back-filling
+        rows recorded while a model had no price. Rows are costed a
+        column slice at a time with PricingTable.price_batch(); the
+        ledger itself is not modified.
+        """
+        if group not in GROUP_COLUMNS:
+            raise ValueError(f"group must be one of {GROUP_COLUMNS}, got {group!r}")
+        return self._sum_by(group, start, end, pricing)
+
+    def _sum_by(
+        self,
+        group: str,
+        start: float | None,
+        end: float | None,
+        pricing: PricingTable | None = None,
+    ) -> dict[str, LedgerTotals]:
+        names = self._names[group]
+        # Ledger model ids -> pricing table ids
+        remap = pricing.ids_for(self._names["model"]) if pricing is not None else None
+        requests = [0] * len(names)
+        input_tokens = [0] * len(names)
+        output_tokens = [0] * len(names)
+        cost = [0.0] * len(names)
+
+        for segment, lo, hi in self._slices(start, end):
+            ids = segment.column(group)[lo:hi]
+            row_costs = segment.column("cost")[lo:hi]
+            if np is not None:
+                ids = np.frombuffer(ids, dtype=COLUMNS[group])
+                n = len(names)
+                inputs = np.frombuffer(segment.column("input_tokens")[lo:hi], dtype="I")
+                outputs = np.frombuffer(segment.column("output_tokens")[lo:hi], dtype="I")
+                if pricing is not None:
+                    models = np.frombuffer(segment.column("model")[lo:hi], dtype=COLUMNS["model"])
+                    row_costs = pricing.price_batch(np.frombuffer(remap, dtype="I")[models], inputs, outputs)
+                counts = np.bincount(ids, minlength=n)
+                ins = np.bincount(ids, weights=inputs, minlength=n)
+                outs = np.bincount(ids, weights=outputs, minlength=n)
+                costs = np.bincount(ids, weights=np.frombuffer(row_costs, dtype="d"), minlength=n)
+                for i in np.flatnonzero(counts):
+                    requests[i] += int(counts[i])
+                    input_tokens[i] += int(ins[i])
+                    output_tokens[i] += int(outs[i])
+                    cost[i] += float(costs[i])
+                continue
+
+            if pricing is not None:
+                row_costs = pricing.price_batch(
+                    [remap[m] for m in segment.column("model")[lo:hi]],
+                    segment.column("input_tokens")[lo:hi],
+                    segment.column("output_tokens")[lo:hi],
+                )
+            for i, inp, out, c in zip(
+                ids,
+                segment.column("input_tokens")[lo:hi],
+                segment.column("output_tokens")[lo:hi],
+                row_costs,
+            ):
+                requests[i] += 1
+                input_tokens[i] += inp
+                output_tokens[i] += out
+                cost[i] += c
+
+        return {
+            name: LedgerTotals(requests[i], input_tokens[i], output_tokens[i], cost[i])
+            for i, name in enumerate(names)
+            if requests[i]
+        }
@@ -9,19 +9,24 @@ usage and you miss optimization opportunities that compound over time.
 Reference: Chapter 4 - The Infrastructure Stack (Day 1 requirements)
 """
 
+import json
+import logging
 import time
-from dataclasses import dataclass, field
-
-
-# Per-1K-token pricing --- mirrors config.yaml. In production, load
-# these from config or a pricing API so updates don't require code changes.
-DEFAULT_PRICING: dict[str, dict[str, float]] = {
-    "gpt-4o":                     {"input": 0.0025,  "output": 0.01},
-    "gpt-4o-mini":                {"input": 0.00015, "output": 0.0006},
-    "o3-mini":                    {"input": 0.0011,  "output": 0.0044},
-    "claude-opus-4-5-20251101":   {"input": 0.015,   "output": 0.075},
-    "claude-sonnet-4-20250514":   {"input": 0.003,   "output": 0.015},
-    "claude-haiku-3-5-20241022":  {"input": 0.0008,  "output": 0.004},
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field, replace
+
+from .cost_ledger import CostLedger
+from .pricing import DEFAULT_PRICING, PricingTable, load_pricing  # noqa: F401
+from .shared_memory import SharedCostTable, SharedTableFull
+
+logger = logging.getLogger("ai_gateway.cost_tracker")
+
+# Rollup granularities (seconds) and how many buckets of each to keep
+ROLLUP_RETENTION: dict[str, tuple[int, int]] = {
+    "minute": (60, 180),       # last 3 hours
+    "hour":   (3600, 72),      # last 3 days
+    "day":    (86400, 400),    # last ~13 months
 }
 
 
@@ -35,6 +40,9 @@ class RequestCost:
     output_cost: float
     total_cost: float
     timestamp: float = field(default_factory=time.time)
+    key_id: str = ""
+    cached: bool = False
+    cost_saved: float = 0.0
 
 
 @dataclass
@@ -46,6 +54,17 @@ class KeyUsageSummary:
     total_output_tokens: int = 0
     total_cost: float = 0.0
     costs_by_model: dict[str, float] = field(default_factory=dict)
+    cache_hits: int = 0
+    cost_saved: float = 0.0
+
+
+@dataclass(slots=True)
+class _Rollup:
+    """Usage aggregated over one time bucket."""
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
 
 
 class CostTracker:
@@ -56,6 +75,29 @@ class CostTracker:
     based on token counts and model pricing. This data feeds dashboards,
     alerts, and budget controls.
 
+    record() updates running aggregates, so reads never rescan history:
+    - per-key KeyUsageSummary (including per-model costs): O(1) reads
+    - minute/hour/day rollups per key and overall: "spend in the last
+      hour" sums at most a few dozen buckets, however many requests ran
+
+    Raw RequestCost records are optional. Keep the most recent ones in a
+    bounded ring buffer (max_records), append every record to a
+    JSON-lines file (spill_path), and/or write them to a columnar
+    CostLedger (ledger) for compact storage and fast range queries.
+
+    Prices come from a compiled PricingTable: by default the
+    cost_per_1k_tokens block of the gateway's config.yaml (DEFAULT_PRICING
+    if it has none). Any model -> prices mapping is compiled into one.
+    set_pricing() swaps in a new table without a restart.
+
+    In a multi-process server, pass a SharedCostTable (shared): record()
+    also adds to it, and get_summary(), get_all_summaries(), total_spend()
+    and total_saved() then report across all workers. Rollups, recent
+    records and the ledger stay per process. If the shared table has no
+    row left for a new (key, model) pair, that request is kept in this
+    process's own aggregates only and counted in shared_dropped; the
+    request itself never fails over it.
+
     Usage:
         tracker = CostTracker()
         cost = tracker.record(
@@ -68,23 +110,53 @@ class CostTracker:
 
         summary = tracker.get_summary("key-std-001")
         print(f"Total spend: ${summary.total_cost:.4f}")
+        print(f"Last hour:   ${tracker.spend_since(3600):.4f}")
     """
 
     def __init__(
         self,
-        pricing: dict[str, dict[str, float]] | None = None,
+        pricing: PricingTable | Mapping[str, Mapping[str, float]] | None = None,
+        max_records: int = 10_000,
+        spill_path: str | None = None,
+        ledger: CostLedger | None = None,
+        shared: SharedCostTable | None = None,
     ) -> None:
-        self._pricing = pricing or DEFAULT_PRICING
-        self._records: dict[str, list[RequestCost]] = {}
-
-    def _cost_for_tokens(
-        self, model: str, input_tokens: int, output_tokens: int
-    ) -> tuple[float, float]:
-        """Calculate input and output cost for a given model and token count."""
-        prices = self._pricing.get(model, {"input": 0.0, "output": 0.0})
-        input_cost = (input_tokens / 1000) * prices["input"]
-        output_cost = (output_tokens / 1000) * prices["output"]
-        return input_cost, output_cost
+        if isinstance(pricing, PricingTable):
+            self._pricing = pricing
+        elif pricing:
+            self._pricing = PricingTable(pricing)
+        else:
+            self._pricing = load_pricing()
+        self._summaries: dict[str, KeyUsageSummary] = {}
+        self._total_cost = 0.0
+        self._total_saved = 0.0
+        # Most recent raw records; 0 disables the ring buffer
+        self._recent: deque[RequestCost] | None = (
+            deque(maxlen=max_records) if max_records > 0 else None
+        )
+        self._spill = open(spill_path, "a", encoding="utf-8") if spill_path else None
+        self._ledger = ledger
+        self._shared = shared
+        self.shared_dropped = 0
+        # granularity -> key_id (None = all keys) -> bucket index -> rollup
+        self._rollups: dict[str, dict[str | None, dict[int, _Rollup]]] = {
+            name: {} for name in ROLLUP_RETENTION
+        }
+
+    @property
+    def pricing(self) -> PricingTable:
+        """The pricing table in use."""
+        return self._pricing
+
+    def set_pricing(self, pricing: PricingTable) -> None:
+        """
+        Price future requests with a new table.
+
+        A single reference swap: a record() in progress finishes with
+        the table it started with. Costs already recorded keep their
+        old prices (use CostLedger.reprice() to re-cost history).
+        """
+        self._pricing = pricing
 
     def record(
         self,
@@ -92,6 +164,7 @@ class CostTracker:
         model: str,
         input_tokens: int,
         output_tokens: int,
+        cached: bool = False,
     ) -> RequestCost:
         """
         Record a completed request and return its cost breakdown.
@@ -99,46 +172,203 @@ class CostTracker:
         Call this from the gateway after every successful completion,
         regardless of provider. The cost tracker doesn't care which
         provider served the request --- only which model and how many tokens.
+
+        For a response served without its own provider call (a cache
+        hit, or a coalesced duplicate of an in-flight request), pass its
+        token counts with cached=True: the request is counted at zero
+        cost and what it would have cost is added to cost_saved.
         """
-        input_cost, output_cost = self._cost_for_tokens(
-            model, input_tokens, output_tokens
-        )
+        input_cost, output_cost = self._pricing.cost(model, input_tokens, output_tokens)
+
+        if cached:
+            cost = RequestCost(
+                model=model,
+                input_tokens=0,
+                output_tokens=0,
+                input_cost=0.0,
+                output_cost=0.0,
+                total_cost=0.0,
+                key_id=key_id,
+                cached=True,
+                cost_saved=input_cost + output_cost,
+            )
+        else:
+            cost = RequestCost(
+                model=model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                input_cost=input_cost,
+                output_cost=output_cost,
+                total_cost=input_cost + output_cost,
+                key_id=key_id,
+            )
+        input_tokens, output_tokens = cost.input_tokens, cost.output_tokens
 
-        cost = RequestCost(
-            model=model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            input_cost=input_cost,
-            output_cost=output_cost,
-            total_cost=input_cost + output_cost,
+        summary = self._summaries.get(key_id)
+        if summary is None:
+            summary = self._summaries[key_id] = KeyUsageSummary(key_id=key_id)
+        summary.total_requests += 1
+        summary.total_input_tokens += input_tokens
+        summary.total_output_tokens += output_tokens
+        summary.total_cost += cost.total_cost
+        summary.costs_by_model[model] = (
+            summary.costs_by_model.get(model, 0.0) + cost.total_cost
         )
+        if cached:
+            summary.cache_hits += 1
+            summary.cost_saved += cost.cost_saved
+            self._total_saved += cost.cost_saved
+        self._total_cost += cost.total_cost
 
-        if key_id not in self._records:
-            self._records[key_id] = []
-        self._records[key_id].append(cost)
+        self._add_to_rollups(key_id, cost)
+
+        if self._recent is not None:
+            self._recent.append(cost)
+        if self._spill is not None:
+            self._spill.write(json.dumps(asdict(cost)) + "\n")
+        if self._ledger is not None:
+            self._ledger.append(
+                key_id, model, input_tokens, output_tokens,
+                cost.total_cost, cost.timestamp,
+            )
+        if self._shared is not None:
+            try:
+                self._shared.add(
+                    key_id, model, input_tokens, output_tokens,
+                    cost.total_cost, cached, cost.cost_saved,
+                )
+            except SharedTableFull:
+                # The provider is already paid: don't fail the request
+                if not self.shared_dropped:
+                    logger.warning(
+                        "Shared cost table full; new (key, model) pairs are "
+                        "tracked per worker only (raise gateway.shared_cost_rows)"
+                    )
+                self.shared_dropped += 1
 
         return cost
 
+    def _add_to_rollups(self, key_id: str, cost: RequestCost) -> None:
+        for name, (seconds, retention) in ROLLUP_RETENTION.items():
+            bucket = int(cost.timestamp // seconds)
+            by_key = self._rollups[name]
+            for owner in (key_id, None):
+                buckets = by_key.get(owner)
+                if buckets is None:
+                    buckets = by_key[owner] = {}
+                rollup = buckets.get(bucket)
+                if rollup is None:
+                    rollup = buckets[bucket] = _Rollup()
+                    # Buckets are created in time order: oldest is first
+                    while len(buckets) > retention:
+                        del buckets[next(iter(buckets))]
+                rollup.requests += 1
+                rollup.input_tokens += cost.input_tokens
+                rollup.output_tokens += cost.output_tokens
+                rollup.cost += cost.total_cost
+
+    def _shared_summaries(self, only_key: str | None = None) -> dict[str, KeyUsageSummary]:
+        """Build summaries from the shared table (all workers)."""
+        summaries: dict[str, KeyUsageSummary] = {}
+        for key_id, model, values in self._shared.rows():
+            if only_key is not None and key_id != only_key:
+                continue
+            requests, input_tokens, output_tokens, cost, hits, saved = values
+            summary = summaries.get(key_id)
+            if summary is None:
+                summary = summaries[key_id] = KeyUsageSummary(key_id=key_id)
+            summary.total_requests += requests
+            summary.total_input_tokens += input_tokens
+            summary.total_output_tokens += output_tokens
+            summary.total_cost += cost
+            summary.costs_by_model[model] = cost
+            summary.cache_hits += hits
+            summary.cost_saved += saved
+        return summaries
+
     def get_summary(self, key_id: str) -> KeyUsageSummary:
         """Aggregate cost data for a single key."""
-        records = self._records.get(key_id, [])
-        summary = KeyUsageSummary(key_id=key_id)
-
-        for rec in records:
-            summary.total_requests += 1
-            summary.total_input_tokens += rec.input_tokens
-            summary.total_output_tokens += rec.output_tokens
-            summary.total_cost += rec.total_cost
-            summary.costs_by_model[rec.model] = (
-                summary.costs_by_model.get(rec.model, 0.0) + rec.total_cost
-            )
-
-        return summary
+        if self._shared is not None:
+            return self._shared_summaries(key_id).get(key_id) or KeyUsageSummary(key_id=key_id)
+        summary = self._summaries.get(key_id)
+        if summary is None:
+            return KeyUsageSummary(key_id=key_id)
+        return replace(summary, costs_by_model=dict(summary.costs_by_model))
 
     def get_all_summaries(self) -> list[KeyUsageSummary]:
         """Return usage summaries for every tracked key."""
-        return [self.get_summary(key_id) for key_id in self._records]
+        if self._shared is not None:
+            return list(self._shared_summaries().values())
+        return [self.get_summary(key_id) for key_id in self._summaries]
 
     def total_spend(self) -> float:
         """Total spend across all keys --- the number your CFO cares about."""
-        return sum(s.total_cost for s in self.get_all_summaries())
+        if self._shared is not None:
+            return sum(values[3] for _, _, values in self._shared.rows())
+        return self._total_cost
+
+    def total_saved(self) -> float:
+        """Spend avoided by serving responses from cache."""
+        if self._shared is not None:
+            return sum(values[5] for _, _, values in self._shared.rows())
+        return self._total_saved
+
+    def _granularity_for(self, seconds: float) -> str:
+        """Finest rollup whose retention covers the requested span."""
+        for name, (bucket_seconds, retention) in ROLLUP_RETENTION.items():
+            if seconds <= bucket_seconds * (retention - 1):
+                return name
+        return "day"
+
+    def spend_since(self, seconds: float, key_id: str | None = None) -> float:
+        """
+        Spend over the last `seconds`, for one key or all keys.
+
+        Sums rollup buckets, so the cost is O(buckets) rather than
+        O(requests). The oldest bucket is counted whole, so the span is
+        rounded out to the bucket size (a minute for spans up to a few
+        hours, an hour up to a few days, a day beyond that).
+        """
+        name = self._granularity_for(seconds)
+        bucket_seconds = ROLLUP_RETENTION[name][0]
+        first_bucket = int((time.time() - seconds) // bucket_seconds)
+        buckets = self._rollups[name].get(key_id, {})
+        return sum(r.cost for b, r in buckets.items() if b >= first_bucket)
+
+    def get_rollups(
+        self, granularity: str = "hour", key_id: str | None = None
+    ) -> list[dict[str, float | int]]:
+        """Return time-bucketed usage for dashboards, oldest first."""
+        bucket_seconds = ROLLUP_RETENTION[granularity][0]
+        buckets = self._rollups[granularity].get(key_id, {})
+        return [
+            {
+                "bucket_start": bucket * bucket_seconds,
+                "requests": rollup.requests,
+                "input_tokens": rollup.input_tokens,
+                "output_tokens": rollup.output_tokens,
+                "cost": rollup.cost,
+            }
+            for bucket, rollup in buckets.items()
+        ]
+
+    def recent_records(self, key_id: str | None = None) -> list[RequestCost]:
+        """Return raw records still in the ring buffer, oldest first."""
+        if self._recent is None:
+            return []
+        if key_id is None:
+            return list(self._recent)
+        return [rec for rec in self._recent if rec.key_id == key_id]
+
+    @property
+    def ledger(self) -> CostLedger | None:
+        """The columnar ledger, for range and group-by queries."""
+        return self._ledger
+
+    def close(self) -> None:
+        """Flush and close the spill file and ledger, if any."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if self._ledger is not None:
+            self._ledger.close()
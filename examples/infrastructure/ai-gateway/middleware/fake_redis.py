@@ -0,0 +1,194 @@
+"""
+In-process stand-in for a Redis server.
+
+Speaks enough RESP over a real localhost socket to exercise
+RedisBackend end to end --- pipelining, EVALSHA/NOSCRIPT, hash
+counters, key expiry --- without installing or running Redis. It cannot
+execute Lua; instead each script the gateway ships is registered with
+an equivalent Python function, keyed by the script's SHA1.
+
+Usage:
+    server = FakeRedisServer()
+    host, port = await server.start()
+    limiter = RateLimiter(backend=RedisBackend(host=host, port=port))
+    ...
+    await server.stop()
+
+Two RateLimiters pointed at the same FakeRedisServer behave like two
+gateway replicas sharing one quota.
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .redis_backend import CHECK_AND_INCREMENT_SCRIPT, RedisError, read_reply
+
+ScriptHandler = Callable[["FakeRedisServer", list[str], list[str]], Any]
+
+
+def _check_and_increment(
+    server: "FakeRedisServer", keys: list[str], argv: list[str]
+) -> list[int]:
+    """Python equivalent of CHECK_AND_INCREMENT_SCRIPT."""
+    cur = server.hmget(keys[0], ["r", "t"])
+    prev = server.hmget(keys[1], ["r", "t"])
+    weight = float(argv[2])
+    reserve = int(argv[4])
+    requests = int(prev[0] or 0) * weight + int(cur[0] or 0)
+    tokens = int(prev[1] or 0) * weight + int(cur[1] or 0)
+    if requests >= float(argv[0]):
+        return [1, math.floor(requests), math.floor(tokens)]
+    if tokens >= float(argv[1]) or tokens + reserve > float(argv[1]):
+        return [2, math.floor(requests), math.floor(tokens)]
+    server.hincrby(keys[0], "r", 1)
+    if reserve > 0:
+        server.hincrby(keys[0], "t", reserve)
+    server.expire(keys[0], int(argv[3]))
+    return [0, math.floor(requests) + 1, math.floor(tokens + reserve)]
+
+
+# Scripts the fake server knows how to "run"
+SCRIPT_EMULATIONS: dict[str, ScriptHandler] = {
+    CHECK_AND_INCREMENT_SCRIPT: _check_and_increment,
+}
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(v) for v in value)
+    if value == "OK" or value == "PONG":
+        return b"+%s\r\n" % value.encode()
+    data = value if isinstance(value, bytes) else str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class FakeRedisServer:
+    """A localhost RESP server with hash, expiry and script support."""
+
+    def __init__(self) -> None:
+        self._hashes: dict[str, dict[str, int]] = {}
+        self._expires: dict[str, float] = {}
+        self._scripts: dict[str, ScriptHandler] = {}
+        self._server: asyncio.AbstractServer | None = None
+        self._handlers: set[asyncio.Task] = set()
+        self.commands_processed = 0
+        self.connections = 0
+
+    # ---- Lifecycle ---------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Close connections still open so handlers don't outlive the loop
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    # ---- Data operations ---------------------------------------------------
+
+    def _live_hash(self, key: str) -> dict[str, int] | None:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._hashes.pop(key, None)
+            self._expires.pop(key, None)
+        return self._hashes.get(key)
+
+    def hmget(self, key: str, fields: list[str]) -> list[int | None]:
+        values = self._live_hash(key) or {}
+        return [values.get(f) for f in fields]
+
+    def hincrby(self, key: str, field: str, amount: int) -> int:
+        values = self._live_hash(key)
+        if values is None:
+            values = self._hashes[key] = {}
+        values[field] = values.get(field, 0) + amount
+        return values[field]
+
+    def expire(self, key: str, seconds: int) -> int:
+        if self._live_hash(key) is None:
+            return 0
+        self._expires[key] = time.monotonic() + seconds
+        return 1
+
+    # ---- Command dispatch --------------------------------------------------
+
+    def _run_script(self, sha: str, args: list[str]) -> Any:
+        handler = self._scripts.get(sha)
+        if handler is None:
+            return RedisError("NOSCRIPT No matching script. Please use EVAL.")
+        numkeys = int(args[0])
+        return handler(self, args[1:1 + numkeys], args[1 + numkeys:])
+
+    def _load_script(self, source: str) -> Any:
+        handler = SCRIPT_EMULATIONS.get(source)
+        if handler is None:
+            return RedisError("ERR fake server has no emulation for this script")
+        sha = hashlib.sha1(source.encode()).hexdigest()
+        self._scripts[sha] = handler
+        return sha
+
+    def execute(self, args: list[str]) -> Any:
+        """Run one decoded command and return its reply value."""
+        self.commands_processed += 1
+        name = args[0].upper()
+        if name == "PING":
+            return "PONG"
+        if name == "HMGET":
+            return self.hmget(args[1], args[2:])
+        if name == "HINCRBY":
+            return self.hincrby(args[1], args[2], int(args[3]))
+        if name == "EXPIRE":
+            return self.expire(args[1], int(args[2]))
+        if name == "DEL":
+            return sum(self._hashes.pop(k, None) is not None for k in args[1:])
+        if name == "FLUSHALL":
+            self._hashes.clear()
+            self._expires.clear()
+            return "OK"
+        if name == "SCRIPT" and args[1].upper() == "LOAD":
+            return self._load_script(args[2])
+        if name == "EVALSHA":
+            return self._run_script(args[1], args[2:])
+        if name == "EVAL":
+            sha = self._load_script(args[1])
+            if isinstance(sha, RedisError):
+                return sha
+            return self._run_script(sha, args[2:])
+        return RedisError(f"ERR unknown command '{args[0]}'")
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                command = await read_reply(reader)
+                args = [a.decode() if isinstance(a, bytes) else str(a) for a in command]
+                writer.write(_encode_reply(self.execute(args)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
@@ -6,15 +6,26 @@ gateway. Structured logs (not print statements, not unstructured text)
 are the foundation of AI observability: you cannot optimize what you
 cannot query.
 
+Writing those lines must not slow the requests they describe. By
+default GatewayLogger hands each entry to an AsyncLogSink: the event
+loop only builds a dict and appends it to a bounded ring buffer; a
+background thread serializes and writes in batches. If the writer falls
+behind (stdout backpressure, a slow log shipper), the sink samples and
+then drops informational lines --- counted, never blocking --- while
+errors are always kept.
+
 Reference: Chapter 4 - The Infrastructure Stack
 """
 
+import atexit
 import json
 import logging
 import sys
+import threading
 import time
-from dataclasses import asdict, dataclass, field
-from typing import Any
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, TextIO
 
 
 @dataclass
@@ -54,13 +65,206 @@ class StructuredFormatter(logging.Formatter):
         return json.dumps(entry, default=str)
 
 
-def configure_logging(level: str = "INFO") -> logging.Logger:
+# Every GatewayLogEntry field with its default, in declaration order.
+# The fast path copies this instead of building the dataclass + asdict().
+_ENTRY_DEFAULTS: dict[str, Any] = {
+    f.name: f.default for f in fields(GatewayLogEntry) if f.name not in ("timestamp", "level", "event", "extra")
+}
+
+_timestamp_cache: tuple[int, str] = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp, formatted at most once per second."""
+    global _timestamp_cache
+    now = int(time.time())
+    if _timestamp_cache[0] != now:
+        _timestamp_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return _timestamp_cache[1]
+
+
+class AsyncLogSink:
+    """
+    Non-blocking log output: a bounded ring buffer drained by a writer thread.
+
+    submit() never waits on I/O. It accepts a dict (serialized to JSON by
+    the writer thread) or an already-formatted line. The writer wakes
+    every `flush_interval` seconds, or as soon as a batch is ready, and
+    writes up to `batch_size` lines in one call.
+
+    When the buffer passes `sample_above` (fraction of capacity), only
+    one in `sample_rate` non-essential lines is kept; when it is full,
+    non-essential lines are dropped and essential ones (errors) evict
+    the oldest entry. Both are counted in stats().
+
+    Once closed, submit() drops everything: the writer thread is gone.
+    Loggers that don't bring their own sink share default_sink(), so a
+    process runs one writer thread however many loggers it creates.
+
+    Usage:
+        sink = AsyncLogSink(sys.stdout)
+        sink.submit({"event": "request.completed", "latency_ms": 812.4})
+        sink.close()   # drains the buffer; also registered with atexit
+    """
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        capacity: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        sample_above: float = 0.75,
+        sample_rate: int = 10,
+    ) -> None:
+        self._stream = stream or sys.stdout
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._sample_threshold = int(capacity * sample_above)
+        self._sample_rate = sample_rate
+        # deque append/popleft are thread-safe; the length check before
+        # append is advisory, so the buffer can briefly overshoot by a line
+        self._buffer: deque[dict[str, Any] | str] = deque()
+        self._wake = threading.Event()
+        # Held while a batch is popped and written, so flush() and the
+        # writer thread never interleave or reorder lines
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._sample_counter = 0
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.write_errors = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="ai-gateway-log-sink", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, item: dict[str, Any] | str, essential: bool = False) -> bool:
+        """Queue one log line. Returns False if it was sampled out or dropped."""
+        if self._closed:
+            self.dropped += 1
+            return False
+        depth = len(self._buffer)
+        if depth >= self._capacity:
+            if not essential:
+                self.dropped += 1
+                return False
+            self._buffer.popleft()
+            self.dropped += 1
+        elif depth >= self._sample_threshold and not essential:
+            self._sample_counter += 1
+            if self._sample_counter % self._sample_rate:
+                self.sampled_out += 1
+                return False
+
+        self._buffer.append(item)
+        self.submitted += 1
+        if depth + 1 == self._batch_size:
+            self._wake.set()
+        return True
+
+    def _drain(self) -> None:
+        with self._write_lock:
+            self._drain_locked()
+
+    def _drain_locked(self) -> None:
+        buffer = self._buffer
+        while buffer:
+            lines = []
+            for _ in range(min(self._batch_size, len(buffer))):
+                item = buffer.popleft()
+                lines.append(item if isinstance(item, str) else json.dumps(item, default=str))
+            try:
+                self._stream.write("\n".join(lines) + "\n")
+                self._stream.flush()
+                self.written += len(lines)
+            except (OSError, ValueError):
+                # Closed or broken stream: count the loss, keep draining
+                self.write_errors += 1
+                self.dropped += len(lines)
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for dashboards and alerting on log loss."""
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "write_errors": self.write_errors,
+            "queued": len(self._buffer),
+        }
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def flush(self) -> None:
+        """Write out everything queued so far, on the calling thread."""
+        self._drain()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting work and write out everything still queued."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wake.set()
+        self._thread.join(timeout)
+
+
+_default_sink: AsyncLogSink | None = None
+_default_sink_lock = threading.Lock()
+
+
+def default_sink() -> AsyncLogSink:
+    """The process-wide stdout sink, started on first use (again if closed)."""
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is None or _default_sink.closed:
+            _default_sink = AsyncLogSink()
+        return _default_sink
+
+
+class SinkHandler(logging.Handler):
+    """logging.Handler that formats a record and queues it on an AsyncLogSink."""
+
+    def __init__(self, sink: AsyncLogSink) -> None:
+        super().__init__()
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.sink.submit(self.format(record), essential=record.levelno >= logging.ERROR)
+        except Exception:
+            self.handleError(record)
+
+
+def configure_logging(
+    level: str = "INFO", sink: AsyncLogSink | None = None
+) -> logging.Logger:
     """
     Set up structured JSON logging for the gateway.
 
     Call this once at startup. Every logger under 'ai_gateway' will
     emit JSON to stdout --- ready for ingestion by any log aggregator
-    (Datadog, ELK, CloudWatch, etc.).
+    (Datadog, ELK, CloudWatch, etc.). Pass a sink to write through an
+    AsyncLogSink instead of blocking on stdout.
+
+    Calling it again replaces the handler it installed earlier, so the
+    latest sink (or synchronous stdout, with sink=None) takes effect.
+    Handlers added by the application are left alone.
 
     Usage:
         logger = configure_logging("INFO")
@@ -69,9 +273,18 @@ def configure_logging(level: str = "INFO") -> logging.Logger:
     logger = logging.getLogger("ai_gateway")
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
 
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
+    ours = [h for h in logger.handlers if getattr(h, "_ai_gateway", False)]
+    if ours or not logger.handlers:
+        # Already writing where asked: keep it
+        if len(ours) == 1 and getattr(ours[0], "sink", None) is sink:
+            return logger
+        handler: logging.Handler = (
+            SinkHandler(sink) if sink is not None else logging.StreamHandler(sys.stdout)
+        )
         handler.setFormatter(StructuredFormatter())
+        handler._ai_gateway = True  # type: ignore[attr-defined]
+        for old in ours:
+            logger.removeHandler(old)
         logger.addHandler(handler)
 
     return logger
@@ -85,6 +298,12 @@ class GatewayLogger:
     produce consistent structured output. Use this instead of calling
     logger.info() directly to ensure every request has the same fields.
 
+    Lifecycle events take a fast path: the final JSON-ready dict is built
+    directly (no GatewayLogEntry, no asdict(), no LogRecord) and queued
+    on the AsyncLogSink --- the shared default_sink() unless one is
+    passed. Pass synchronous=True to write through the logging module on
+    the calling thread instead.
+
     Usage:
         gw_logger = GatewayLogger()
         gw_logger.log_request(request_id="req-123", key_id="key-001", model="gpt-4o")
@@ -99,8 +318,47 @@ class GatewayLogger:
         )
     """
 
-    def __init__(self, level: str = "INFO") -> None:
-        self._logger = configure_logging(level)
+    def __init__(
+        self,
+        level: str = "INFO",
+        sink: AsyncLogSink | None = None,
+        synchronous: bool = False,
+    ) -> None:
+        self._sink = None if synchronous else (sink or default_sink())
+        self._logger = configure_logging(level, sink=self._sink)
+
+    @property
+    def sink(self) -> AsyncLogSink | None:
+        return self._sink
+
+    def set_level(self, level: str) -> None:
+        """Change the log level in place (config reloads)."""
+        self._logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+    def _emit(self, level: int, event: str, fields: dict[str, Any]) -> None:
+        if not self._logger.isEnabledFor(level):
+            return
+        level_name = logging.getLevelName(level)
+
+        if self._sink is None:
+            entry = GatewayLogEntry(
+                timestamp=_utc_timestamp(), level=level_name, event=event, **fields
+            )
+            self._logger.log(level, event, extra={"structured": asdict(entry)})
+            return
+
+        # Same keys, in the same order, as StructuredFormatter would emit
+        record: dict[str, Any] = {
+            "timestamp": _utc_timestamp(),
+            "level": level_name,
+            "logger": self._logger.name,
+            "message": event,
+            "event": event,
+        }
+        record.update(_ENTRY_DEFAULTS)
+        record.update(fields)
+        record.setdefault("extra", {})
+        self._sink.submit(record, essential=level >= logging.ERROR)
 
     def log_request(
         self,
@@ -110,19 +368,12 @@ class GatewayLogger:
         **extra: Any,
     ) -> None:
         """Log an incoming request before it reaches the provider."""
-        entry = GatewayLogEntry(
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            level="INFO",
-            event="request.received",
-            request_id=request_id,
-            key_id=key_id,
-            model=model,
-            extra=extra,
-        )
-        self._logger.info(
-            "request.received",
-            extra={"structured": asdict(entry)},
-        )
+        self._emit(logging.INFO, "request.received", {
+            "request_id": request_id,
+            "key_id": key_id,
+            "model": model,
+            "extra": extra,
+        })
 
     def log_response(
         self,
@@ -136,23 +387,64 @@ class GatewayLogger:
         **extra: Any,
     ) -> None:
         """Log a completed response after the provider returns."""
-        entry = GatewayLogEntry(
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            level="INFO",
-            event="request.completed",
-            request_id=request_id,
-            provider=provider,
-            model=model,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            latency_ms=latency_ms,
-            cost_usd=cost_usd,
-            extra=extra,
-        )
-        self._logger.info(
-            "request.completed",
-            extra={"structured": asdict(entry)},
-        )
+        self._emit(logging.INFO, "request.completed", {
+            "request_id": request_id,
+            "provider": provider,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": latency_ms,
+            "cost_usd": cost_usd,
+            "extra": extra,
+        })
+
+    def log_cache_hit(
+        self,
+        request_id: str,
+        key_id: str,
+        provider: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency_ms: float,
+        cost_saved_usd: float,
+        **extra: Any,
+    ) -> None:
+        """Log a request answered from the response cache (zero cost)."""
+        self._emit(logging.INFO, "request.cache_hit", {
+            "request_id": request_id,
+            "key_id": key_id,
+            "provider": provider,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": latency_ms,
+            "cost_usd": 0.0,
+            "status": "cache_hit",
+            "extra": {"cost_saved_usd": cost_saved_usd, **extra},
+        })
+
+    def log_compression(
+        self,
+        request_id: str,
+        key_id: str,
+        model: str,
+        tokens_before: int,
+        tokens_after: int,
+        strategies: dict[str, int],
+    ) -> None:
+        """Log a prompt shortened before routing (estimated tokens)."""
+        self._emit(logging.INFO, "request.compressed", {
+            "request_id": request_id,
+            "key_id": key_id,
+            "model": model,
+            "input_tokens": tokens_after,
+            "extra": {
+                "tokens_before": tokens_before,
+                "tokens_saved": tokens_before - tokens_after,
+                "strategies": strategies,
+            },
+        })
 
     def log_error(
         self,
@@ -163,18 +455,25 @@ class GatewayLogger:
         **extra: Any,
     ) -> None:
         """Log a failed request."""
-        entry = GatewayLogEntry(
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            level="ERROR",
-            event="request.failed",
-            request_id=request_id,
-            provider=provider,
-            model=model,
-            status="error",
-            error=error,
-            extra=extra,
-        )
-        self._logger.error(
-            "request.failed",
-            extra={"structured": asdict(entry)},
-        )
+        self._emit(logging.ERROR, "request.failed", {
+            "request_id": request_id,
+            "provider": provider,
+            "model": model,
+            "status": "error",
+            "error": error,
+            "extra": extra,
+        })
+
+    def stats(self) -> dict[str, int]:
+        """Sink counters (submitted, written, dropped, sampled_out, ...)."""
+        return self._sink.stats() if self._sink is not None else {}
+
+    def close(self) -> None:
+        """Flush queued log lines; a sink of its own is also closed."""
+        if self._sink is None:
+            return
+        if self._sink is _default_sink:
+            # Other loggers in the process still write through it
+            self._sink.flush()
+        else:
+            self._sink.close()
@@ -0,0 +1,154 @@
+"""
+Compiled model pricing for the AI Gateway.
+
+Prices live in one place: the cost_per_1k_tokens block of config.yaml.
+DEFAULT_PRICING, a copy of the shipped block, stands in when a config
+has none, so a missing file never prices every request at zero.
+PricingTable compiles that block once into an immutable table: model
+names interned to small integer ids, and per-token input/output prices
+in two float64 arrays indexed by id. Id 0 is reserved for unknown
+models and priced at zero, so costing a request is one dict lookup and
+two multiplications with no per-call allocation.
+
+Because a table never changes, reloading prices is building a new table
+and swapping the reference (CostTracker.set_pricing()); requests in
+flight finish with the table they started with.
+
+price_batch() costs whole columns of (model id, input, output) rows at
+once --- NumPy when it is installed, otherwise array and C-level
+builtins --- for back-filling and re-pricing a CostLedger's history
+after a price change.
+
+Usage:
+    table = load_pricing("config.yaml")
+    input_cost, output_cost = table.cost("gpt-4o-mini", 500, 200)
+
+    ids = table.ids_for(["gpt-4o", "gpt-4o-mini"])  # foreign names -> table ids
+    costs = table.price_batch(model_ids, input_tokens, output_tokens)
+
+Reference: Chapter 4 - The Infrastructure Stack (Day 1 requirements)
+"""
+
+import sys
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+
+import yaml
+
+try:
+    import numpy as np
+except ImportError:  # optional: price_batch falls back to array/map
+    np = None
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
+
+UNKNOWN_MODEL = 0
+
+# Per-1K-token pricing --- mirrors cost_per_1k_tokens in config.yaml.
+# Used only when a config file is missing or has no prices.
+DEFAULT_PRICING: dict[str, dict[str, float]] = {
+    "google/gemini-2.5-flash":            {"input": 0.00015, "output": 0.0006},
+    "google/gemini-2.5-pro":              {"input": 0.00125, "output": 0.01},
+    "anthropic/claude-sonnet-4":          {"input": 0.003,   "output": 0.015},
+    "anthropic/claude-haiku-3.5":         {"input": 0.0008,  "output": 0.004},
+    "openai/gpt-4o":                      {"input": 0.0025,  "output": 0.01},
+    "openai/gpt-4o-mini":                 {"input": 0.00015, "output": 0.0006},
+    "meta-llama/llama-3.3-70b-instruct":  {"input": 0.0003,  "output": 0.0004},
+    "mistralai/mistral-large":            {"input": 0.002,   "output": 0.006},
+    "gpt-4o":                             {"input": 0.0025,  "output": 0.01},
+    "gpt-4o-mini":                        {"input": 0.00015, "output": 0.0006},
+    "o3-mini":                            {"input": 0.0011,  "output": 0.0044},
+    "claude-opus-4-5-20251101":           {"input": 0.015,   "output": 0.075},
+    "claude-sonnet-4-20250514":           {"input": 0.003,   "output": 0.015},
+    "claude-haiku-3-5-20241022":          {"input": 0.0008,  "output": 0.004},
+}
+
+
+class PricingTable:
+    """
+    Immutable per-token prices, indexed by interned model id.
+
+    Build one from a cost_per_1k_tokens mapping (model -> {"input": ...,
+    "output": ...}, USD per 1K tokens). Models missing from the table
+    map to UNKNOWN_MODEL and cost nothing.
+    """
+
+    __slots__ = ("models", "_ids", "input_per_token", "output_per_token")
+
+    def __init__(self, per_1k_tokens: Mapping[str, Mapping[str, float]] | None = None) -> None:
+        per_1k_tokens = per_1k_tokens or {}
+        self.models: tuple[str, ...] = ("",) + tuple(sys.intern(str(m)) for m in per_1k_tokens)
+        self._ids: dict[str, int] = {model: i for i, model in enumerate(self.models) if i}
+        self.input_per_token = array("d", [0.0])
+        self.output_per_token = array("d", [0.0])
+        for prices in per_1k_tokens.values():
+            self.input_per_token.append(float(prices.get("input", 0.0)) / 1000)
+            self.output_per_token.append(float(prices.get("output", 0.0)) / 1000)
+
+    def __len__(self) -> int:
+        return len(self.models) - 1
+
+    def __contains__(self, model: str) -> bool:
+        return model in self._ids
+
+    def model_id(self, model: str) -> int:
+        """Interned id for a model (UNKNOWN_MODEL if it has no price)."""
+        return self._ids.get(model, UNKNOWN_MODEL)
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> tuple[float, float]:
+        """Input and output cost in USD for one request."""
+        i = self._ids.get(model, UNKNOWN_MODEL)
+        return input_tokens * self.input_per_token[i], output_tokens * self.output_per_token[i]
+
+    def per_1k_tokens(self) -> dict[str, dict[str, float]]:
+        """The table back in config form (USD per 1K tokens)."""
+        return {
+            model: {"input": self.input_per_token[i] * 1000, "output": self.output_per_token[i] * 1000}
+            for model, i in self._ids.items()
+        }
+
+    def ids_for(self, names: Iterable[str]) -> array:
+        """
+        Map another id space onto this table.
+
+        `names` lists model names by their id elsewhere (e.g. a ledger's
+        interned names); the result maps each of those ids to this
+        table's id, ready to index price_batch()'s model_ids with.
+        """
+        return array("I", (self._ids.get(name, UNKNOWN_MODEL) for name in names))
+
+    def price_batch(
+        self,
+        model_ids: Sequence[int],
+        input_tokens: Sequence[int],
+        output_tokens: Sequence[int],
+    ):
+        """
+        Total cost of each row, for equal-length columns of table model
+        ids and token counts (lists, arrays, memoryviews or NumPy arrays).
+
+        Returns float64 costs: a NumPy array when NumPy is installed,
+        otherwise an array("d").
+        """
+        if np is not None:
+            ids = np.asarray(model_ids, dtype=np.intp)
+            return (
+                np.asarray(input_tokens, dtype=np.float64) * np.frombuffer(self.input_per_token)[ids]
+                + np.asarray(output_tokens, dtype=np.float64) * np.frombuffer(self.output_per_token)[ids]
+            )
+        inp, out = self.input_per_token, self.output_per_token
+        return array("d", map(
+            lambda m, i, o: i * inp[m] + o * out[m], model_ids, input_tokens, output_tokens
+        ))
+
+
+def load_pricing(path: str | Path = DEFAULT_CONFIG_PATH) -> PricingTable:
+    """Compile the cost_per_1k_tokens block of a config file (DEFAULT_PRICING if absent)."""
+    try:
+        with open(path) as f:
+            raw = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return PricingTable(DEFAULT_PRICING)
+    return PricingTable(raw.get("cost_per_1k_tokens") or DEFAULT_PRICING)
@@ -0,0 +1,340 @@
+"""
+Prompt compression for the AI Gateway.
+
+Long multi-turn conversations --- agent loops especially --- resend the
+whole history on every call: the same system prompt pasted in twice, a
+40 KB tool result from ten turns ago, dozens of turns the model no
+longer needs verbatim. Every one of those input tokens is paid for, and
+provider latency grows with prompt size.
+
+PromptCompressor rewrites CompletionRequest.messages before routing,
+using the local token estimator (no tokenizer, no provider call) to
+decide whether a prompt is worth touching and to measure what each
+strategy saved. Strategies run in order, cheapest and safest first:
+
+1. dedupe     --- drop repeated system messages; replace a tool output
+                  identical to a later one with a pointer to it.
+2. truncate   --- cut tool outputs older than the last `fresh_rounds`
+                  assistant rounds down to `tool_output_max_tokens`
+                  (head and tail kept, the middle marked as truncated).
+3. summarize  --- if the prompt is still over `max_prompt_tokens`,
+                  collapse the middle turns into one summary (a
+                  system message), keeping the system messages in
+                  place, the first `keep_first_turns` turns and the
+                  last `keep_last_turns`.
+
+A turn starts at a user message, so cuts never separate an assistant's
+tool calls from their results. Tool-output freshness is counted in
+assistant rounds instead: an agent loop is often one user turn followed
+by dozens of tool calls. Summaries come from a pluggable
+summarizer (extractive by default) and are cached by the content of the
+span they replace, so an agent resending the same history doesn't pay
+for summarizing it again.
+
+Which strategies run, and with what limits, is a CompressionPolicy; the
+gateway picks one per API key (see config.yaml).
+
+Usage:
+    compressor = PromptCompressor()
+    result = compressor.compress(request.messages, CompressionPolicy())
+    request.messages = result.messages
+    print(result.tokens_saved, result.strategies)
+
+Reference: Chapter 4 - Infrastructure for AI-First Operations
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from typing import Any, Protocol
+
+from providers.base import Message, MessageRole
+
+from .token_estimator import CHARS_PER_TOKEN, estimate_prompt_tokens, estimate_text_tokens
+
+# A tool output shorter than this isn't worth replacing with a pointer
+DEDUPE_MIN_TOKENS = 32
+# Floor for each message's line in an extractive summary
+SUMMARY_LINE_MIN_TOKENS = 12
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """Which strategies run for a key, and their limits (in estimated tokens)."""
+    enabled: bool = True
+    # Prompts smaller than this are sent untouched
+    min_prompt_tokens: int = 4000
+    dedupe: bool = True
+    truncate_tool_outputs: bool = True
+    tool_output_max_tokens: int = 500
+    # Outputs of the last fresh_rounds assistant messages are never truncated
+    fresh_rounds: int = 2
+    summarize: bool = True
+    # Middle turns are collapsed only while the prompt is over this
+    max_prompt_tokens: int = 16_000
+    keep_first_turns: int = 1
+    keep_last_turns: int = 4
+    summary_max_tokens: int = 600
+
+
+@dataclass
+class CompressionResult:
+    """Compressed messages, with the estimated token counts before and after."""
+    messages: list[Message]
+    tokens_before: int
+    tokens_after: int
+    # strategy -> estimated tokens it saved (only strategies that saved any)
+    strategies: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class Summarizer(Protocol):
+    def __call__(self, messages: Sequence[Message], max_tokens: int) -> str: ...
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - 3)].rstrip() + "..."
+
+
+def extractive_summary(messages: Sequence[Message], max_tokens: int) -> str:
+    """
+    One line per message: its role and first sentence, clipped.
+
+    No model call, so it's fast and deterministic. Lines share the
+    budget evenly; if they still don't fit, the oldest are dropped and
+    counted instead.
+    """
+    per_message = max(SUMMARY_LINE_MIN_TOKENS, max_tokens // max(1, len(messages)))
+    line_chars = per_message * CHARS_PER_TOKEN
+    lines = []
+    for message in messages:
+        # Only the start of a message can make its first sentence
+        text = _WHITESPACE.sub(" ", message.content[: line_chars * 2]).strip()
+        text = _SENTENCE_END.split(text, 1)[0]
+        if message.tool_calls:
+            calls = ", ".join(f"{c.name}({_clip(c.arguments, 40)})" for c in message.tool_calls)
+            text = f"{text} [called {calls}]" if text else f"called {calls}"
+        role = message.role.value
+        if message.tool_call_id:
+            role = f"{role} ({message.tool_call_id})"
+        lines.append(f"- {role}: {_clip(text, line_chars)}")
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    kept: list[str] = []
+    used = 0
+    for line in reversed(lines):
+        if used + len(line) > budget and kept:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    omitted = len(lines) - len(kept)
+    if omitted:
+        kept.append(f"- ({omitted} earlier messages omitted)")
+    return "\n".join(reversed(kept))
+
+
+def _turn_starts(messages: Sequence[Message]) -> list[int]:
+    return [i for i, m in enumerate(messages) if m.role == MessageRole.USER]
+
+
+def _span_digest(messages: Sequence[Message], max_tokens: int) -> bytes:
+    digest = hashlib.blake2b(str(max_tokens).encode(), digest_size=16)
+    for m in messages:
+        digest.update(b"\x00" + m.role.value.encode() + b"\x00" + m.content.encode())
+        for call in m.tool_calls or ():
+            digest.update(b"\x01" + call.name.encode() + b"\x01" + call.arguments.encode())
+    return digest.digest()
+
+
+def dedupe_messages(messages: list[Message]) -> list[Message]:
+    """Drop repeated system messages; point repeated tool outputs at the latest copy."""
+    # The latest copy stays whole: it's in the recent turns that
+    # truncation and summarization leave alone
+    latest: dict[str, int] = {}
+    for i, message in enumerate(messages):
+        if (
+            message.role == MessageRole.TOOL
+            and estimate_text_tokens(message.content) >= DEDUPE_MIN_TOKENS
+        ):
+            latest[message.content] = i
+
+    seen_system: set[str] = set()
+    out: list[Message] = []
+    changed = False
+    for i, message in enumerate(messages):
+        if message.role == MessageRole.SYSTEM:
+            if message.content in seen_system:
+                changed = True
+                continue
+            seen_system.add(message.content)
+        elif message.role == MessageRole.TOOL:
+            last = latest.get(message.content, i)
+            if last != i:
+                # The message itself stays: its tool call still needs an answer
+                target = messages[last].tool_call_id or "unknown"
+                message = replace(message, content=f"[Same output as tool call {target} below]")
+                changed = True
+        out.append(message)
+    return out if changed else messages
+
+
+def truncate_tool_outputs(
+    messages: list[Message], max_tokens: int, fresh_rounds: int
+) -> list[Message]:
+    """
+    Cut tool outputs older than the last fresh_rounds rounds to max_tokens.
+
+    A round is an assistant message and the tool outputs answering it,
+    so freshness holds in a single user turn of many tool calls.
+    """
+    if fresh_rounds <= 0:
+        cutoff = len(messages)
+    else:
+        rounds = [i for i, m in enumerate(messages) if m.role == MessageRole.ASSISTANT]
+        if len(rounds) <= fresh_rounds:
+            return messages
+        cutoff = rounds[-fresh_rounds]
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    out = messages
+    for i in range(cutoff):
+        message = messages[i]
+        if message.role != MessageRole.TOOL or len(message.content) <= max_chars:
+            continue
+        if out is messages:
+            out = list(messages)
+        # Keep the head (what the output is) and the tail (how it ended)
+        head = message.content[: max_chars * 2 // 3]
+        tail = message.content[len(message.content) - max_chars // 3:]
+        omitted = estimate_text_tokens(message.content) - estimate_text_tokens(head + tail)
+        out[i] = replace(
+            message, content=f"{head}\n[... {omitted} tokens of tool output truncated ...]\n{tail}"
+        )
+    return out
+
+
+class PromptCompressor:
+    """
+    Applies a CompressionPolicy to a conversation.
+
+    Stateless apart from the summary cache (LRU, max_summaries entries),
+    so one instance serves every request and policy. compress() never
+    mutates the messages it's given.
+    """
+
+    def __init__(
+        self, summarizer: Summarizer | None = None, max_summaries: int = 10_000
+    ) -> None:
+        self._summarize = summarizer or extractive_summary
+        self._max_summaries = max_summaries
+        self._summaries: OrderedDict[bytes, str] = OrderedDict()
+        self._eligible = 0
+        self._compressed = 0
+        self._tokens_saved: dict[str, int] = {"dedupe": 0, "truncate": 0, "summarize": 0}
+        self._summary_hits = 0
+        self._summary_misses = 0
+
+    def compress(self, messages: list[Message], policy: CompressionPolicy) -> CompressionResult:
+        """Run the policy's strategies; the messages come back as-is if none applied."""
+        tokens = before = estimate_prompt_tokens(messages)
+        if not policy.enabled or before < policy.min_prompt_tokens:
+            return CompressionResult(messages, before, before)
+        self._eligible += 1
+
+        result = CompressionResult(messages, before, before)
+
+        def record(strategy: str, compressed: list[Message]) -> None:
+            nonlocal tokens
+            if compressed is result.messages:
+                return
+            after = estimate_prompt_tokens(compressed)
+            result.strategies[strategy] = tokens - after
+            self._tokens_saved[strategy] += tokens - after
+            result.messages = compressed
+            tokens = after
+
+        if policy.dedupe:
+            record("dedupe", dedupe_messages(result.messages))
+        if policy.truncate_tool_outputs:
+            record("truncate", truncate_tool_outputs(
+                result.messages, policy.tool_output_max_tokens, policy.fresh_rounds
+            ))
+        if policy.summarize and tokens > policy.max_prompt_tokens:
+            record("summarize", self._collapse_middle(result.messages, policy))
+
+        result.tokens_after = tokens
+        if result.strategies:
+            self._compressed += 1
+        return result
+
+    def _collapse_middle(self, messages: list[Message], policy: CompressionPolicy) -> list[Message]:
+        starts = _turn_starts(messages)
+        if len(starts) <= policy.keep_first_turns:
+            return messages
+        head_end = starts[policy.keep_first_turns]
+        if policy.keep_last_turns > 0:
+            # Fewer turns than keep_last_turns: the tail is all of them
+            tail_start = starts[-min(policy.keep_last_turns, len(starts))]
+        else:
+            tail_start = len(messages)
+        if tail_start - head_end < 2:
+            # Head and tail overlap (or leave one message): nothing to collapse
+            return messages
+
+        middle = messages[head_end:tail_start]
+        # System messages are instructions, not history: keep them verbatim,
+        # and the summary takes the place of the first history message
+        history = [m for m in middle if m.role != MessageRole.SYSTEM]
+        if not history:
+            return messages
+        first = next(i for i, m in enumerate(middle) if m.role != MessageRole.SYSTEM)
+        # A system message, so it never makes two user turns in a row
+        # with the tail (which starts with one)
+        summary = Message(
+            role=MessageRole.SYSTEM,
+            content=(
+                f"[Summary of {len(history)} earlier messages]\n"
+                + self._summary(history, policy.summary_max_tokens)
+            ),
+        )
+        return (
+            messages[:head_end]
+            + middle[:first]
+            + [summary]
+            + [m for m in middle[first:] if m.role == MessageRole.SYSTEM]
+            + messages[tail_start:]
+        )
+
+    def _summary(self, messages: list[Message], max_tokens: int) -> str:
+        key = _span_digest(messages, max_tokens)
+        summary = self._summaries.get(key)
+        if summary is not None:
+            self._summaries.move_to_end(key)
+            self._summary_hits += 1
+            return summary
+        self._summary_misses += 1
+        summary = self._summarize(messages, max_tokens)
+        self._summaries[key] = summary
+        if len(self._summaries) > self._max_summaries:
+            self._summaries.popitem(last=False)
+        return summary
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._summary_hits + self._summary_misses
+        return {
+            "eligible": self._eligible,
+            "compressed": self._compressed,
+            "tokens_saved": sum(self._tokens_saved.values()),
+            "tokens_saved_by_strategy": dict(self._tokens_saved),
+            "summary_entries": len(self._summaries),
+            "summary_hit_rate": self._summary_hits / lookups if lookups else 0.0,
+        }
@@ -9,11 +9,22 @@ Why rate limiting matters for AI gateways specifically: a single
 runaway agent can exhaust your monthly API budget in minutes. Rate
 limits are not just about fairness --- they are cost circuit breakers.
 
+Token limits use reservations: the gateway reserves an estimate (prompt
+plus max_tokens) before calling the provider and settles it to the
+actual usage afterwards. Concurrent long completions therefore see each
+other's in-flight tokens instead of all passing the check at once.
+
 Reference: Chapter 4 - Infrastructure for AI-First Operations
 """
 
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import Coroutine, Mapping
 from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+T = TypeVar("T")
 
 
 @dataclass
@@ -23,12 +34,40 @@ class RateLimitConfig:
     tokens_per_minute: int = 100_000
 
 
-@dataclass
+@dataclass(slots=True)
 class _Window:
-    """Tracks usage within a rolling window."""
-    requests: list[float] = field(default_factory=list)
-    tokens: list[tuple[float, int]] = field(default_factory=list)
+    """Tracks usage within a rolling window (sliding log).
+
+    Entries are appended in time order, so expired ones are popped from
+    the left and the running token total is adjusted as they go ---
+    O(1) amortized per request instead of rebuilding lists. Token
+    entries are [timestamp, count] lists so a reservation can be
+    settled in place.
+    """
+    requests: deque[float] = field(default_factory=deque)
+    tokens: deque[list] = field(default_factory=deque)
+    token_total: int = 0
+    last_seen: float = 0.0
+
+
+@dataclass(slots=True)
+class _CounterWindow:
+    """Two fixed buckets for the approximate sliding-window counter.
+
+    The estimate for the rolling window is the current bucket plus the
+    previous bucket weighted by how much of it still overlaps the window.
+    Constant memory per key regardless of traffic.
+    """
+    bucket_start: float
+    current_requests: int = 0
+    previous_requests: int = 0
+    current_tokens: int = 0
+    previous_tokens: int = 0
+    last_seen: float = 0.0
+
 
+SLIDING_LOG = "sliding_log"
+SLIDING_COUNTER = "sliding_counter"
 
 # Default tier configs --- loaded from config.yaml in production.
 DEFAULT_TIER_LIMITS: dict[str, RateLimitConfig] = {
@@ -46,6 +85,262 @@ class RateLimitExceeded(Exception):
         self.retry_after_seconds = retry_after_seconds
 
 
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of a backend check: allowed, or which limit was hit."""
+    allowed: bool
+    limit_type: str = ""  # "requests" or "tokens" when not allowed
+    retry_after_seconds: float = 0.0
+
+
+ALLOWED = RateLimitDecision(allowed=True)
+
+
+@dataclass
+class TokenReservation:
+    """Tokens held against a key's window until the request settles."""
+    key_id: str
+    tokens: int
+    handle: Any = None  # backend-specific reference to the reserved entry
+    settled: bool = False
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for rate-limit windows.
+
+    RateLimiter owns the policy (tiers, error messages); a backend owns
+    the counters. The in-memory backend is the default; swap in a shared
+    backend (see middleware/redis_backend.py) so every gateway replica
+    enforces one quota instead of N copies of it.
+    """
+
+    @abstractmethod
+    async def reserve(
+        self, key_id: str, limits: RateLimitConfig, tokens: int
+    ) -> tuple[RateLimitDecision, Any]:
+        """
+        Atomically check both limits and, if allowed, count the request
+        and hold `tokens` in the window. Returns the decision and a
+        handle for settle().
+        """
+        ...
+
+    @abstractmethod
+    async def settle(
+        self, key_id: str, handle: Any, reserved: int, actual: int
+    ) -> None:
+        """Replace a reservation of `reserved` tokens with `actual` tokens."""
+        ...
+
+    async def check_request(
+        self, key_id: str, limits: RateLimitConfig
+    ) -> RateLimitDecision:
+        """Atomically check both limits and count the request if allowed."""
+        decision, _ = await self.reserve(key_id, limits, 0)
+        return decision
+
+    @abstractmethod
+    async def record_tokens(self, key_id: str, token_count: int) -> None:
+        """Add completed-request tokens to the key's window."""
+        ...
+
+    @abstractmethod
+    async def get_usage(self, key_id: str) -> tuple[int, int]:
+        """Return (requests, tokens) used in the current window."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release any connections held by the backend."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """
+    Process-local rate-limit storage.
+
+    Two modes:
+    - "sliding_log" (default): exact. Keeps a timestamp per request and
+      per token record in a deque with a running token total.
+    - "sliding_counter": approximate. Keeps two fixed-window buckets per
+      key and weights the previous one by its overlap with the window.
+      Constant memory per key, slightly permissive at bucket edges.
+
+    Keys idle for longer than idle_ttl_seconds (at least one window) are
+    evicted, so memory stays bounded by the number of active keys.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        mode: str = SLIDING_LOG,
+        idle_ttl_seconds: float | None = None,
+    ) -> None:
+        if mode not in (SLIDING_LOG, SLIDING_COUNTER):
+            raise ValueError(f"Unknown rate limit mode: {mode}")
+        self._window_seconds = window_seconds
+        self._mode = mode
+        # Evicting before a window has fully elapsed would forget usage
+        self._idle_ttl = max(idle_ttl_seconds or window_seconds, window_seconds)
+        # Ordered by last access: idle keys collect at the front
+        self._windows: OrderedDict[str, _Window | _CounterWindow] = OrderedDict()
+
+    @property
+    def tracked_keys(self) -> int:
+        """Number of keys currently holding window state."""
+        return len(self._windows)
+
+    def _get_window(self, key_id: str, now: float) -> _Window | _CounterWindow:
+        window = self._windows.get(key_id)
+        if window is None:
+            if self._mode == SLIDING_LOG:
+                window = _Window()
+            else:
+                window = _CounterWindow(bucket_start=now)
+            self._windows[key_id] = window
+        else:
+            self._windows.move_to_end(key_id)
+        window.last_seen = now
+        self._evict_idle(now)
+        return window
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop keys idle past the TTL (amortized O(1) per call)."""
+        cutoff = now - self._idle_ttl
+        windows = self._windows
+        while windows:
+            key_id, window = next(iter(windows.items()))
+            if window.last_seen > cutoff:
+                break
+            del windows[key_id]
+
+    def _prune(self, window: _Window, now: float) -> None:
+        """Remove entries older than the sliding window."""
+        cutoff = now - self._window_seconds
+        requests = window.requests
+        while requests and requests[0] <= cutoff:
+            requests.popleft()
+        tokens = window.tokens
+        while tokens and tokens[0][0] <= cutoff:
+            window.token_total -= tokens.popleft()[1]
+
+    def _roll(self, window: _CounterWindow, now: float) -> None:
+        """Advance the counter buckets to the bucket containing now."""
+        elapsed = now - window.bucket_start
+        if elapsed < self._window_seconds:
+            return
+        buckets = int(elapsed // self._window_seconds)
+        if buckets == 1:
+            window.previous_requests = window.current_requests
+            window.previous_tokens = window.current_tokens
+        else:
+            window.previous_requests = 0
+            window.previous_tokens = 0
+        window.current_requests = 0
+        window.current_tokens = 0
+        window.bucket_start += buckets * self._window_seconds
+
+    def _estimate(self, window: _CounterWindow, now: float) -> tuple[float, float]:
+        """Weighted request and token counts for the rolling window."""
+        overlap = 1.0 - (now - window.bucket_start) / self._window_seconds
+        return (
+            window.previous_requests * overlap + window.current_requests,
+            window.previous_tokens * overlap + window.current_tokens,
+        )
+
+    async def reserve(
+        self, key_id: str, limits: RateLimitConfig, tokens: int
+    ) -> tuple[RateLimitDecision, Any]:
+        now = time.monotonic()
+        window = self._get_window(key_id, now)
+        token_limit = limits.tokens_per_minute
+
+        if isinstance(window, _CounterWindow):
+            self._roll(window, now)
+            requests, used = self._estimate(window, now)
+            # Approximate: usage drops once the current bucket rolls over
+            retry_after = max(0.0, window.bucket_start + self._window_seconds - now)
+            if requests >= limits.requests_per_minute:
+                return RateLimitDecision(False, "requests", retry_after), None
+            if used >= token_limit or used + tokens > token_limit:
+                return RateLimitDecision(False, "tokens", retry_after), None
+            window.current_requests += 1
+            window.current_tokens += tokens
+            return ALLOWED, window.bucket_start
+
+        self._prune(window, now)
+
+        # Check request count
+        if len(window.requests) >= limits.requests_per_minute:
+            oldest = window.requests[0]
+            retry_after = self._window_seconds - (now - oldest)
+            return RateLimitDecision(False, "requests", max(0.0, retry_after)), None
+
+        # Check token count, including this request's reservation
+        used = window.token_total
+        if used >= token_limit or used + tokens > token_limit:
+            oldest_token_time = window.tokens[0][0] if window.tokens else now
+            retry_after = self._window_seconds - (now - oldest_token_time)
+            return RateLimitDecision(False, "tokens", max(0.0, retry_after)), None
+
+        # Record this request timestamp and hold its tokens
+        window.requests.append(now)
+        if not tokens:
+            return ALLOWED, None
+        entry = [now, tokens]
+        window.tokens.append(entry)
+        window.token_total += tokens
+        return ALLOWED, entry
+
+    async def settle(
+        self, key_id: str, handle: Any, reserved: int, actual: int
+    ) -> None:
+        now = time.monotonic()
+        window = self._get_window(key_id, now)
+        delta = actual - reserved
+
+        if isinstance(window, _CounterWindow):
+            self._roll(window, now)
+            if handle == window.bucket_start:
+                window.current_tokens += delta
+            elif handle == window.bucket_start - self._window_seconds:
+                window.previous_tokens += delta
+            else:
+                # Reservation already aged out: count actual usage as new
+                window.current_tokens += actual
+            return
+
+        self._prune(window, now)
+        if handle is not None and handle[0] > now - self._window_seconds:
+            handle[1] = actual
+            window.token_total += delta
+        elif actual:
+            window.tokens.append([now, actual])
+            window.token_total += actual
+
+    async def record_tokens(self, key_id: str, token_count: int) -> None:
+        now = time.monotonic()
+        window = self._get_window(key_id, now)
+        if isinstance(window, _CounterWindow):
+            self._roll(window, now)
+            window.current_tokens += token_count
+        else:
+            window.tokens.append([now, token_count])
+            window.token_total += token_count
+
+    async def get_usage(self, key_id: str) -> tuple[int, int]:
+        now = time.monotonic()
+        # Read-only: an unknown key has no usage and gets no window
+        window = self._windows.get(key_id)
+        if isinstance(window, _CounterWindow):
+            self._roll(window, now)
+            requests, tokens = self._estimate(window, now)
+            return int(requests), int(tokens)
+        if window is not None:
+            self._prune(window, now)
+            return len(window.requests), window.token_total
+        return 0, 0
+
+
 class RateLimiter:
     """
     Sliding-window rate limiter keyed by API key ID.
@@ -53,90 +348,131 @@ class RateLimiter:
     Tracks both request count and token count per minute. Either
     limit being exceeded blocks the request.
 
-    In production, replace the in-memory dict with Redis for
-    multi-instance deployments. The interface stays the same.
+    Window state lives in a pluggable RateLimitBackend. The default
+    InMemoryBackend (exact sliding log, or the approximate two-bucket
+    sliding_counter) is fine for a single instance; for multi-instance
+    deployments pass a shared backend such as RedisBackend so all
+    replicas enforce one quota. The interface stays the same.
 
     Usage:
         limiter = RateLimiter()
-        limiter.check_request("key-std-001", tier="standard")
+        reservation = await limiter.reserve("key-std-001", "standard", tokens=1200)
         # ... after completion ...
-        limiter.record_tokens("key-std-001", token_count=1500)
+        await limiter.commit(reservation, actual_tokens=1500)
+        # ... or, if the provider call failed ...
+        await limiter.refund(reservation)
+
+    check_request() / record_tokens() remain for callers that only
+    account tokens after the fact.
+
+    check_request(), record_tokens() and get_usage() stay synchronous,
+    as they always were: they work with backends that never wait
+    (InMemoryBackend, SharedMemoryBackend) and raise RuntimeError with
+    one that does I/O. Async code, and any code using a network backend
+    such as RedisBackend, awaits acheck_request(), arecord_tokens() and
+    aget_usage() instead.
     """
 
     def __init__(
         self,
-        tier_limits: dict[str, RateLimitConfig] | None = None,
+        tier_limits: Mapping[str, RateLimitConfig] | None = None,
         window_seconds: float = 60.0,
+        mode: str = SLIDING_LOG,
+        idle_ttl_seconds: float | None = None,
+        backend: RateLimitBackend | None = None,
     ) -> None:
         self._tier_limits = tier_limits or DEFAULT_TIER_LIMITS
-        self._window_seconds = window_seconds
-        self._windows: dict[str, _Window] = {}
-
-    def _get_window(self, key_id: str) -> _Window:
-        if key_id not in self._windows:
-            self._windows[key_id] = _Window()
-        return self._windows[key_id]
+        self._backend = backend or InMemoryBackend(
+            window_seconds=window_seconds,
+            mode=mode,
+            idle_ttl_seconds=idle_ttl_seconds,
+        )
 
-    def _prune(self, window: _Window, now: float) -> None:
-        """Remove entries older than the sliding window."""
-        cutoff = now - self._window_seconds
-        window.requests = [t for t in window.requests if t > cutoff]
-        window.tokens = [(t, n) for t, n in window.tokens if t > cutoff]
+    @property
+    def backend(self) -> RateLimitBackend:
+        return self._backend
 
     def _get_limits(self, tier: str) -> RateLimitConfig:
         return self._tier_limits.get(tier, self._tier_limits.get("free", RateLimitConfig()))
 
-    def check_request(self, key_id: str, tier: str = "free") -> None:
+    def limits(self, tier: str = "free") -> RateLimitConfig:
+        """The limits that apply to a tier (unknown tiers get free-tier limits)."""
+        return self._get_limits(tier)
+
+    def set_tier_limits(self, tier_limits: Mapping[str, RateLimitConfig] | None) -> None:
+        """Apply new per-tier limits from the next request on (config reloads).
+
+        Window state is kept, so usage already counted this minute still
+        counts against the new limits.
+        """
+        self._tier_limits = tier_limits or DEFAULT_TIER_LIMITS
+
+    async def acheck_request(self, key_id: str, tier: str = "free") -> None:
         """
         Check whether this key can make another request right now.
 
         Raises RateLimitExceeded if either the request count or the
         token count has been exceeded within the current window.
         """
-        now = time.monotonic()
-        window = self._get_window(key_id)
-        self._prune(window, now)
         limits = self._get_limits(tier)
+        decision = await self._backend.check_request(key_id, limits)
+        if not decision.allowed:
+            self._raise_exceeded(decision, limits, tier)
 
-        # Check request count
-        if len(window.requests) >= limits.requests_per_minute:
-            oldest = window.requests[0]
-            retry_after = self._window_seconds - (now - oldest)
-            raise RateLimitExceeded(
+    async def reserve(
+        self, key_id: str, tier: str = "free", tokens: int = 0
+    ) -> TokenReservation:
+        """
+        Count a request and hold `tokens` against the key's token limit.
+
+        Raises RateLimitExceeded if the request count is exhausted or the
+        reservation would push the window past tokens_per_minute.
+        """
+        limits = self._get_limits(tier)
+        decision, handle = await self._backend.reserve(key_id, limits, tokens)
+        if not decision.allowed:
+            self._raise_exceeded(decision, limits, tier)
+        return TokenReservation(key_id=key_id, tokens=tokens, handle=handle)
+
+    async def commit(self, reservation: TokenReservation, actual_tokens: int) -> None:
+        """Settle a reservation to the tokens the request actually used."""
+        if reservation.settled:
+            return
+        reservation.settled = True
+        await self._backend.settle(
+            reservation.key_id, reservation.handle, reservation.tokens, actual_tokens
+        )
+
+    async def refund(self, reservation: TokenReservation) -> None:
+        """Release a reservation whose request produced no tokens."""
+        await self.commit(reservation, 0)
+
+    @staticmethod
+    def _raise_exceeded(
+        decision: RateLimitDecision, limits: RateLimitConfig, tier: str
+    ) -> None:
+        if decision.limit_type == "requests":
+            message = (
                 f"Rate limit exceeded: {limits.requests_per_minute} requests/min "
-                f"(tier={tier})",
-                retry_after_seconds=max(0.0, retry_after),
+                f"(tier={tier})"
             )
-
-        # Check token count
-        total_tokens = sum(n for _, n in window.tokens)
-        if total_tokens >= limits.tokens_per_minute:
-            oldest_token_time = window.tokens[0][0]
-            retry_after = self._window_seconds - (now - oldest_token_time)
-            raise RateLimitExceeded(
+        else:
+            message = (
                 f"Token limit exceeded: {limits.tokens_per_minute} tokens/min "
-                f"(tier={tier})",
-                retry_after_seconds=max(0.0, retry_after),
+                f"(tier={tier})"
             )
+        raise RateLimitExceeded(
+            message, retry_after_seconds=decision.retry_after_seconds
+        )
 
-        # Record this request timestamp
-        window.requests.append(now)
-
-    def record_tokens(self, key_id: str, token_count: int) -> None:
+    async def arecord_tokens(self, key_id: str, token_count: int) -> None:
         """Record token usage after a successful completion."""
-        now = time.monotonic()
-        window = self._get_window(key_id)
-        window.tokens.append((now, token_count))
+        await self._backend.record_tokens(key_id, token_count)
 
-    def get_usage(self, key_id: str, tier: str = "free") -> dict[str, int | float]:
+    async def aget_usage(self, key_id: str, tier: str = "free") -> dict[str, int | float]:
         """Return current window usage for monitoring or response headers."""
-        now = time.monotonic()
-        window = self._get_window(key_id)
-        self._prune(window, now)
         limits = self._get_limits(tier)
-
-        request_count = len(window.requests)
-        token_count = sum(n for _, n in window.tokens)
+        request_count, token_count = await self._backend.get_usage(key_id)
 
         return {
             "requests_used": request_count,
@@ -146,3 +482,32 @@ class RateLimiter:
             "tokens_limit": limits.tokens_per_minute,
             "tokens_remaining": max(0, limits.tokens_per_minute - token_count),
         }
+
+    async def aclose(self) -> None:
+        """Close the backend's connections."""
+        await self._backend.aclose()
+
+    @staticmethod
+    def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+        # A backend that never waits finishes on the first step, so no
+        # event loop is needed (and a running one isn't disturbed)
+        try:
+            coro.send(None)
+        except StopIteration as done:
+            return done.value
+        coro.close()
+        raise RuntimeError(
+            "This rate limit backend does I/O; await the a-prefixed method instead"
+        )
+
+    def check_request(self, key_id: str, tier: str = "free") -> None:
+        """acheck_request() for synchronous callers (non-waiting backends only)."""
+        self._run_sync(self.acheck_request(key_id, tier))
+
+    def record_tokens(self, key_id: str, token_count: int) -> None:
+        """arecord_tokens() for synchronous callers (non-waiting backends only)."""
+        self._run_sync(self.arecord_tokens(key_id, token_count))
+
+    def get_usage(self, key_id: str, tier: str = "free") -> dict[str, int | float]:
+        """aget_usage() for synchronous callers (non-waiting backends only)."""
+        return self._run_sync(self.aget_usage(key_id, tier))
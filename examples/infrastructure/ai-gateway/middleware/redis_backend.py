@@ -0,0 +1,377 @@
+"""
+Redis-backed rate-limit storage for multi-instance gateways.
+
+With the in-memory backend every gateway replica enforces its own
+limits, so N replicas quietly allow N times the configured quota. This
+backend keeps the counters in a Redis-compatible server that all
+replicas share.
+
+Design:
+- Sliding-window counter (two buckets per key, previous bucket weighted
+  by overlap). Constant memory per key and cheap to express in Lua.
+- The check-and-increment runs as one Lua script (EVALSHA), so the read
+  and the increment are atomic across replicas --- no race where two
+  replicas both see "59 of 60" and both let a request through.
+- Reservations are taken inside the same script. Settling one (and
+  record_tokens()) doesn't pay its own round trip: the adjustment is
+  queued locally and pipelined in front of the next check, so one
+  AIGateway.complete costs one round trip for its reservation plus the
+  previous request's settlement. A queue that no check picks up is
+  sent by a timer after flush_interval seconds, so other replicas see
+  a settlement or refund within that delay even when this one goes
+  quiet. Replies are still checked: a failed settlement is logged and
+  counted (settle_errors), and doesn't fail the unrelated request it
+  rode along with. If the connection fails, the queued commands stay
+  queued for the next attempt.
+- Speaks raw RESP over asyncio streams, in keeping with the gateway's
+  "raw httpx, no SDKs" approach --- no redis package required.
+
+For local development and tests, run it against FakeRedisServer
+(middleware/fake_redis.py), an in-process stand-in.
+
+Reference: Chapter 4 - Infrastructure for AI-First Operations
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from .rate_limit import (
+    ALLOWED,
+    RateLimitBackend,
+    RateLimitConfig,
+    RateLimitDecision,
+)
+
+logger = logging.getLogger("ai_gateway.redis_backend")
+
+
+class RedisError(Exception):
+    """An error reply from the server (e.g. NOSCRIPT, WRONGTYPE)."""
+
+
+class RedisConnectionError(RedisError):
+    """The connection to the server failed or was closed."""
+
+
+# KEYS[1]: current bucket hash, KEYS[2]: previous bucket hash
+# ARGV: requests_per_minute, tokens_per_minute, previous-bucket weight, ttl,
+#       tokens to reserve
+# Returns {status, requests, tokens}; status 0 = allowed, 1 = requests, 2 = tokens
+CHECK_AND_INCREMENT_SCRIPT = """
+local cur = redis.call('HMGET', KEYS[1], 'r', 't')
+local prev = redis.call('HMGET', KEYS[2], 'r', 't')
+local weight = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[5])
+local requests = (tonumber(prev[1]) or 0) * weight + (tonumber(cur[1]) or 0)
+local tokens = (tonumber(prev[2]) or 0) * weight + (tonumber(cur[2]) or 0)
+if requests >= tonumber(ARGV[1]) then
+  return {1, math.floor(requests), math.floor(tokens)}
+end
+if tokens >= tonumber(ARGV[2]) or tokens + reserve > tonumber(ARGV[2]) then
+  return {2, math.floor(requests), math.floor(tokens)}
+end
+redis.call('HINCRBY', KEYS[1], 'r', 1)
+if reserve > 0 then
+  redis.call('HINCRBY', KEYS[1], 't', reserve)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {0, math.floor(requests) + 1, math.floor(tokens + reserve)}
+"""
+
+CHECK_AND_INCREMENT_SHA = hashlib.sha1(CHECK_AND_INCREMENT_SCRIPT.encode()).hexdigest()
+
+
+# ---- RESP protocol ---------------------------------------------------------
+
+def encode_command(*args: Any) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP reply. Error replies are returned as RedisError."""
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RedisConnectionError(f"Unexpected RESP reply: {line!r}")
+
+
+class RESPConnection:
+    """
+    One pipelined connection to a Redis-compatible server.
+
+    Commands from concurrent callers are written as soon as they are
+    issued; a single reader task hands replies back in order. Nothing
+    waits for another caller's round trip to finish.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379) -> None:
+        self.host = host
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._waiting: deque[asyncio.Future] = deque()
+        self._connect_lock = asyncio.Lock()
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(
+                    self.host, self.port
+                )
+                self._reader_task = asyncio.create_task(self._read_loop())
+            return self._writer
+
+    async def _read_loop(self) -> None:
+        assert self._reader is not None
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                future = self._waiting.popleft()
+                if not future.done():
+                    future.set_result(reply)
+        except (asyncio.IncompleteReadError, ConnectionError, RedisConnectionError) as exc:
+            self._fail_waiting(RedisConnectionError(f"Connection lost: {exc}"))
+
+    def _fail_waiting(self, exc: Exception) -> None:
+        self._writer = None
+        while self._waiting:
+            future = self._waiting.popleft()
+            if not future.done():
+                future.set_exception(exc)
+
+    async def execute_many(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        """Send several commands in one write and return their replies."""
+        writer = await self._ensure_connected()
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in commands]
+        self._waiting.extend(futures)
+        writer.write(b"".join(encode_command(*cmd) for cmd in commands))
+        await writer.drain()
+        # gather, so every reply's error is retrieved when the connection drops
+        return list(await asyncio.gather(*futures))
+
+    async def execute(self, *args: Any) -> Any:
+        (reply,) = await self.execute_many([args])
+        return reply
+
+    async def aclose(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+
+# ---- Backend ---------------------------------------------------------------
+
+class RedisBackend(RateLimitBackend):
+    """
+    Shared rate-limit storage in a Redis-compatible server.
+
+    Usage:
+        backend = RedisBackend(host="redis.internal", port=6379)
+        limiter = RateLimiter(backend=backend)
+
+    Bucket boundaries use wall-clock time so every replica agrees on
+    them; keep replica clocks NTP-synced.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        window_seconds: float = 60.0,
+        key_prefix: str = "ratelimit",
+        max_pending: int = 256,
+        flush_interval: float = 0.05,
+    ) -> None:
+        self._conn = RESPConnection(host, port)
+        self._window_seconds = window_seconds
+        self._prefix = key_prefix
+        self._ttl = int(window_seconds * 2) + 1
+        self._max_pending = max_pending
+        self._flush_interval = flush_interval
+        # Token increments waiting to ride along with the next round trip
+        self._pending: list[tuple[Any, ...]] = []
+        # Sends the queue if no round trip picks it up first
+        self._flush_task: asyncio.Task | None = None
+        # Queued token records the server rejected
+        self.settle_errors = 0
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self._window_seconds)
+
+    def _bucket_key(self, key_id: str, bucket: int) -> str:
+        return f"{self._prefix}:{key_id}:{bucket}"
+
+    def _bucket_keys(self, key_id: str, now: float) -> tuple[str, str, float]:
+        """Return (current key, previous key, previous-bucket weight)."""
+        bucket = self._bucket(now)
+        weight = 1.0 - (now % self._window_seconds) / self._window_seconds
+        return (
+            self._bucket_key(key_id, bucket),
+            self._bucket_key(key_id, bucket - 1),
+            weight,
+        )
+
+    def _queue_tokens(self, key: str, token_count: int) -> None:
+        self._pending.append(("HINCRBY", key, "t", token_count))
+        self._pending.append(("EXPIRE", key, self._ttl))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later(self._flush_interval))
+
+    async def _flush_later(self, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            self._flush_task = None
+            await self.flush()
+        except (OSError, RedisConnectionError) as exc:
+            logger.warning("Rate limit settlements not sent, retrying: %s", exc)
+            if self._flush_task is None and self._pending:
+                # Back off while the server is unreachable
+                self._flush_task = asyncio.create_task(
+                    self._flush_later(max(self._flush_interval, 1.0))
+                )
+
+    def _take_pending(self) -> list[tuple[Any, ...]]:
+        pending, self._pending = self._pending, []
+        return pending
+
+    def _restore_pending(self, pending: list[tuple[Any, ...]]) -> None:
+        """Put commands back at the front of the queue after a failed send."""
+        self._pending[:0] = pending
+        # Keep the newest commands if the server stays unreachable
+        overflow = len(self._pending) - self._max_pending * 4
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.settle_errors += overflow // 2
+
+    def _check_pending(self, pending: list[tuple[Any, ...]], replies: list[Any]) -> None:
+        for command, reply in zip(pending, replies):
+            if isinstance(reply, RedisError):
+                self.settle_errors += 1
+                logger.error(
+                    "Queued rate limit update %s %s failed: %s", command[0], command[1], reply
+                )
+
+    async def _run(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        """Pipeline queued token records ahead of commands; return their replies."""
+        pending = self._take_pending()
+        try:
+            replies = await self._conn.execute_many(pending + commands)
+        except BaseException:
+            self._restore_pending(pending)
+            raise
+        self._check_pending(pending, replies)
+        return replies[len(pending):]
+
+    async def reserve(
+        self, key_id: str, limits: RateLimitConfig, tokens: int
+    ) -> tuple[RateLimitDecision, Any]:
+        now = time.time()
+        current, previous, weight = self._bucket_keys(key_id, now)
+        args = (
+            current,
+            previous,
+            limits.requests_per_minute,
+            limits.tokens_per_minute,
+            repr(weight),
+            self._ttl,
+            tokens,
+        )
+
+        (reply,) = await self._run([("EVALSHA", CHECK_AND_INCREMENT_SHA, 2, *args)])
+        if isinstance(reply, RedisError) and str(reply).startswith("NOSCRIPT"):
+            # First call against this server: send the script body once
+            reply = await self._conn.execute(
+                "EVAL", CHECK_AND_INCREMENT_SCRIPT, 2, *args
+            )
+        if isinstance(reply, RedisError):
+            raise reply
+
+        status = reply[0]
+        if status == 0:
+            return ALLOWED, self._bucket(now)
+        retry_after = max(0.0, self._window_seconds - (now % self._window_seconds))
+        decision = RateLimitDecision(
+            False, "requests" if status == 1 else "tokens", retry_after
+        )
+        return decision, None
+
+    async def settle(
+        self, key_id: str, handle: Any, reserved: int, actual: int
+    ) -> None:
+        current_bucket = self._bucket(time.time())
+        if handle is not None and handle >= current_bucket - 1:
+            # Reservation still counts toward the window: adjust it in place
+            delta = actual - reserved
+            if delta:
+                self._queue_tokens(self._bucket_key(key_id, handle), delta)
+        elif actual:
+            # Reservation already aged out: count actual usage as new
+            self._queue_tokens(self._bucket_key(key_id, current_bucket), actual)
+        if len(self._pending) >= self._max_pending:
+            await self.flush()
+
+    async def record_tokens(self, key_id: str, token_count: int) -> None:
+        current, _, _ = self._bucket_keys(key_id, time.time())
+        self._queue_tokens(current, token_count)
+        if len(self._pending) >= self._max_pending:
+            await self.flush()
+
+    async def get_usage(self, key_id: str) -> tuple[int, int]:
+        current, previous, weight = self._bucket_keys(key_id, time.time())
+        cur, prev = await self._run([
+            ("HMGET", current, "r", "t"),
+            ("HMGET", previous, "r", "t"),
+        ])
+        requests = int(prev[0] or 0) * weight + int(cur[0] or 0)
+        tokens = int(prev[1] or 0) * weight + int(cur[1] or 0)
+        return int(requests), int(tokens)
+
+    async def flush(self) -> None:
+        """Send queued token records now instead of with the next check."""
+        pending = self._take_pending()
+        if not pending:
+            return
+        try:
+            replies = await self._conn.execute_many(pending)
+        except BaseException:
+            self._restore_pending(pending)
+            raise
+        self._check_pending(pending, replies)
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await self._conn.aclose()
@@ -0,0 +1,305 @@
+"""
+Exact-match response cache for the AI Gateway.
+
+Deterministic traffic --- temperature-0 classification prompts, the same
+system prompt plus the same FAQ question --- produces the same answer
+every time, and every one of those answers is a paid round trip. This
+cache sits in front of the providers and returns the stored response
+for an identical request instead.
+
+Design:
+- Keyed on a canonical hash of the fields that determine the output:
+  model, messages, temperature, max_tokens and tools.
+- In-memory LRU with a per-entry TTL and a byte-size cap. Entries are
+  stored serialized, so the byte count is exact and callers can't
+  mutate a cached response.
+- Optional SQLite tier (stdlib sqlite3, WAL mode) that survives
+  restarts. Memory misses fall through to disk; disk hits are promoted.
+  Disk I/O stays off the event loop: aget() runs the disk lookup in a
+  worker thread, and put() queues writes for a writer thread, which
+  commits them in batches on its own connection.
+
+The gateway decides *whether* a request may use the cache (per-tier
+opt-in, temperature ceiling); this module only stores and returns.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+
+from providers.base import CompletionRequest, CompletionResponse, ToolCall, Usage
+
+
+def request_cache_key(request: CompletionRequest) -> str:
+    """Canonical hash of the request fields that determine the response."""
+    canonical = {
+        "model": request.model,
+        "messages": [
+            {
+                "role": m.role.value,
+                "content": m.content,
+                "tool_calls": [asdict(c) for c in m.tool_calls] if m.tool_calls else None,
+                "tool_call_id": m.tool_call_id,
+            }
+            for m in request.messages
+        ],
+        "temperature": float(request.temperature),  # 0 and 0.0 must match
+        "max_tokens": request.max_tokens,
+        "tools": [asdict(t) for t in request.tools] if request.tools else None,
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def serialize_response(response: CompletionResponse) -> bytes:
+    return json.dumps(asdict(response), separators=(",", ":")).encode()
+
+
+def deserialize_response(data: bytes) -> CompletionResponse:
+    raw = json.loads(data)
+    raw["usage"] = Usage(**raw["usage"])
+    if raw.get("tool_calls"):
+        raw["tool_calls"] = [ToolCall(**c) for c in raw["tool_calls"]]
+    return CompletionResponse(**raw)
+
+
+logger = logging.getLogger("ai_gateway.response_cache")
+
+# Writer thread: rows per transaction, and how long queued writes may wait
+DISK_BATCH_SIZE = 256
+DISK_FLUSH_INTERVAL = 0.05
+
+
+@dataclass(slots=True)
+class _Entry:
+    data: bytes
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of completion responses, with an optional disk tier.
+
+    Usage:
+        cache = ResponseCache(max_bytes=64 * 1024 * 1024, disk_path="cache.db")
+        key = request_cache_key(request)
+        response = await cache.aget(key)
+        if response is None:
+            response = await provider.complete(request)
+            cache.put(key, response)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        disk_path: str | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._puts_since_purge = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()  # reads come from worker threads
+        # Queued disk writes: (key, data, expires_at) rows, or "purge"/"clear"
+        self._disk_queue: deque[tuple[str, bytes, float] | str] = deque()
+        self._disk_wake = threading.Event()
+        self._disk_closed = False
+        self._disk_thread: threading.Thread | None = None
+        self.disk_write_errors = 0
+        if disk_path is not None:
+            # Reads use this connection from aget()'s worker threads, one
+            # at a time; WAL lets them run alongside the writer's transactions
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._disk_thread = threading.Thread(
+                target=self._write_disk, args=(disk_path,),
+                name="ai-gateway-response-cache", daemon=True,
+            )
+            self._disk_thread.start()
+
+    # ---- Memory tier -------------------------------------------------------
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.data)
+        if len(entry.data) > self._max_bytes:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry.data)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.data)
+
+    # ---- Public API --------------------------------------------------------
+
+    def get(self, key: str) -> CompletionResponse | None:
+        """
+        Return a fresh copy of the cached response, or None.
+
+        Blocks on the disk tier after a memory miss; in async code use
+        aget(), which doesn't.
+        """
+        now = time.time()
+        response = self._get_memory(key, now)
+        if response is None and self._db is not None:
+            response = self._promote(key, self._read_disk(key, now))
+        if response is None:
+            self.misses += 1
+        return response
+
+    async def aget(self, key: str) -> CompletionResponse | None:
+        """get(), with the disk lookup run in a worker thread."""
+        now = time.time()
+        response = self._get_memory(key, now)
+        if response is None and self._db is not None:
+            row = await asyncio.to_thread(self._read_disk, key, now)
+            # A put() while the read was out wins over the older disk row
+            response = self._get_memory(key, now) or self._promote(key, row)
+        if response is None:
+            self.misses += 1
+        return response
+
+    def _get_memory(self, key: str, now: float) -> CompletionResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return deserialize_response(entry.data)
+            self._drop(key)
+        return None
+
+    def _read_disk(self, key: str, now: float) -> tuple[bytes, float] | None:
+        with self._db_lock:
+            if self._db is None:  # closed while the lookup was queued
+                return None
+            return self._db.execute(
+                "SELECT data, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+
+    def _promote(self, key: str, row: tuple[bytes, float] | None) -> CompletionResponse | None:
+        if row is None:
+            return None
+        data, expires_at = row
+        self._store(key, _Entry(data, expires_at))
+        self.hits += 1
+        self.disk_hits += 1
+        return deserialize_response(data)
+
+    def put(self, key: str, response: CompletionResponse) -> None:
+        """Cache a response under `key` for the configured TTL."""
+        entry = _Entry(serialize_response(response), time.time() + self._ttl)
+        self._store(key, entry)
+        if self._db is not None:
+            # The memory tier answers for the row until the writer commits it
+            self._queue_disk((key, entry.data, entry.expires_at))
+            self._puts_since_purge += 1
+            if self._puts_since_purge >= 1000:
+                self._puts_since_purge = 0
+                self._queue_disk("purge")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        if self._db is not None:
+            self._queue_disk("clear")
+
+    # ---- Disk writer -------------------------------------------------------
+
+    def _queue_disk(self, op: tuple[str, bytes, float] | str) -> None:
+        if self._disk_closed:
+            return
+        self._disk_queue.append(op)
+        if len(self._disk_queue) >= DISK_BATCH_SIZE:
+            self._disk_wake.set()
+
+    def _write_disk(self, disk_path: str) -> None:
+        """Writer thread: commit queued ops in batches, one transaction each."""
+        db = sqlite3.connect(disk_path)
+        db.execute("PRAGMA synchronous=NORMAL")
+        queue = self._disk_queue
+        try:
+            while True:
+                closed = self._disk_closed
+                self._disk_wake.wait(DISK_FLUSH_INTERVAL)
+                self._disk_wake.clear()
+                while queue:
+                    batch = [queue.popleft() for _ in range(min(DISK_BATCH_SIZE, len(queue)))]
+                    try:
+                        with db:
+                            for op in batch:
+                                if op == "purge":
+                                    db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                                elif op == "clear":
+                                    db.execute("DELETE FROM responses")
+                                else:
+                                    db.execute(
+                                        "INSERT OR REPLACE INTO responses (key, data, expires_at) "
+                                        "VALUES (?, ?, ?)",
+                                        op,
+                                    )
+                    except sqlite3.Error:
+                        # The memory tier still has the rows; only persistence is lost
+                        self.disk_write_errors += 1
+                        logger.exception("Response cache disk write failed (%d ops)", len(batch))
+                if closed:
+                    return
+        finally:
+            db.close()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_queued": len(self._disk_queue),
+            "disk_write_errors": self.disk_write_errors,
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out queued disk rows, then close the database."""
+        if self._disk_thread is not None:
+            self._disk_closed = True
+            self._disk_wake.set()
+            self._disk_thread.join(timeout)
+            self._disk_thread = None
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
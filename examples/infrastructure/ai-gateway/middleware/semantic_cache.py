@@ -0,0 +1,352 @@
+"""
+Semantic response cache for the AI Gateway.
+
+The exact-match cache (response_cache.py) only helps when a prompt is
+repeated byte for byte. Many prompts are paraphrases of each other ---
+"how do I reset my password?" / "How can I reset my password" --- and
+deserve the same answer. This layer embeds the final user message and
+serves a cached response when a previous one is similar enough.
+
+Design:
+- Pluggable embedder. HashingEmbedder works offline with no model: word
+  and character n-grams hashed into a fixed-size, L2-normalized vector.
+- Namespaces: a response is only reused for the same model *and* the
+  same preceding context (system prompt, earlier turns). Only the final
+  user message is compared semantically.
+- Index: vectors are partitioned by random-hyperplane signatures (an
+  IVF-style coarse quantizer that needs no training). A lookup scores
+  only the query's partition plus its one-bit neighbours, with one
+  matrix-vector product per partition when NumPy is installed.
+- LRU + TTL eviction with a global entry cap.
+- Metrics: hit rate, lookup latency, provider latency saved, and a
+  sample of hits (query vs. matched prompt) for false-hit review.
+
+A semantic hit can be wrong, so keep the threshold high and review the
+sampled hits before widening it.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import hashlib
+import math
+import random
+import re
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from operator import mul
+from typing import Any, Protocol
+
+from providers.base import CompletionRequest, CompletionResponse, MessageRole
+
+from .response_cache import deserialize_response, serialize_response
+
+try:
+    import numpy as np
+except ImportError:  # optional: the index falls back to pure Python
+    np = None
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class Embedder(Protocol):
+    """Anything that turns text into a fixed-size, L2-normalized vector."""
+
+    dim: int
+
+    def embed(self, text: str) -> list[float]:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Offline text embedder using the hashing trick.
+
+    Features are lower-cased words, word bigrams and character
+    n-grams; each is hashed (crc32, stable across processes) into one
+    of `dim` buckets with a hash-derived sign. No vocabulary, no model,
+    no network --- good enough to match paraphrases that share wording.
+    """
+
+    def __init__(self, dim: int = 256, char_ngram: int = 3) -> None:
+        self.dim = dim
+        self._char_ngram = char_ngram
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        n = self._char_ngram
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, text: str) -> list[float]:
+        dim = self.dim
+        vector = [0.0] * dim
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode())
+            vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = math.hypot(*vector)
+        if norm:
+            scale = 1.0 / norm
+            vector = [v * scale for v in vector]
+        return vector
+
+
+@dataclass(slots=True)
+class _Entry:
+    namespace: str
+    partition: int
+    data: bytes
+    prompt: str
+    latency_ms: float
+    expires_at: float
+
+
+class _Partition:
+    """Vectors sharing one hyperplane signature, with swap-remove deletes."""
+
+    __slots__ = ("ids", "vectors", "positions", "_matrix")
+
+    def __init__(self) -> None:
+        self.ids: list[int] = []
+        self.vectors: list[Any] = []
+        self.positions: dict[int, int] = {}
+        self._matrix = None
+
+    def add(self, entry_id: int, vector: Any) -> None:
+        self.positions[entry_id] = len(self.ids)
+        self.ids.append(entry_id)
+        self.vectors.append(vector)
+        self._matrix = None
+
+    def remove(self, entry_id: int) -> None:
+        pos = self.positions.pop(entry_id)
+        last_id = self.ids.pop()
+        last_vector = self.vectors.pop()
+        if last_id != entry_id:
+            self.ids[pos] = last_id
+            self.vectors[pos] = last_vector
+            self.positions[last_id] = pos
+        self._matrix = None
+
+    def best(self, query: Any) -> tuple[int, float]:
+        """Return (entry id, cosine similarity) of the closest vector."""
+        if np is not None:
+            if self._matrix is None:
+                self._matrix = np.vstack(self.vectors)
+            scores = self._matrix @ query
+            i = int(scores.argmax())
+            return self.ids[i], float(scores[i])
+        best_i, best_score = 0, -2.0
+        for i, vector in enumerate(self.vectors):
+            score = sum(map(mul, vector, query))
+            if score > best_score:
+                best_i, best_score = i, score
+        return self.ids[best_i], best_score
+
+
+@dataclass
+class SemanticCacheStats:
+    """Counters exported by SemanticCache.stats()."""
+    lookups: int = 0
+    hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    lookup_ms_total: float = 0.0
+    latency_saved_ms: float = 0.0
+    false_hit_samples: deque = field(default_factory=lambda: deque(maxlen=100))
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of completion responses.
+
+    Usage:
+        cache = SemanticCache(threshold=0.9)
+        response, similarity = cache.lookup(request)
+        if response is None:
+            response = await provider.complete(request)
+            cache.store(request, response)
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        threshold: float = 0.9,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 3600.0,
+        num_planes: int = 16,
+        sample_rate: float = 0.01,
+        seed: int = 0,
+    ) -> None:
+        self._embedder = embedder or HashingEmbedder()
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._sample_rate = sample_rate
+        self._rng = random.Random(seed)
+
+        planes_rng = random.Random(seed)
+        planes = [
+            [planes_rng.gauss(0.0, 1.0) for _ in range(self._embedder.dim)]
+            for _ in range(num_planes)
+        ]
+        self._num_planes = num_planes
+        self._planes = np.array(planes, dtype=np.float32) if np is not None else planes
+
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._partitions: dict[str, dict[int, _Partition]] = {}
+        self._next_id = 0
+        self._stats = SemanticCacheStats()
+
+    # ---- Keys and vectors --------------------------------------------------
+
+    @staticmethod
+    def split_request(request: CompletionRequest) -> tuple[str, str] | None:
+        """Return (namespace, final user message), or None if not cacheable."""
+        if not request.messages or request.tools:
+            return None
+        final = request.messages[-1]
+        if final.role != MessageRole.USER or not final.content:
+            return None
+        # Tool calls and results are part of the context: the same text
+        # after a different call, or answering a different call, isn't
+        context = hashlib.sha256()
+        for message in request.messages[:-1]:
+            context.update(f"{message.role.value}\0{message.content}\0".encode())
+            for call in message.tool_calls or ():
+                context.update(f"\1{call.id}\1{call.name}\1{call.arguments}\0".encode())
+            if message.tool_call_id is not None:
+                context.update(f"\2{message.tool_call_id}\0".encode())
+        namespace = f"{request.model}|{float(request.temperature)}|{request.max_tokens}|{context.hexdigest()}"
+        return namespace, final.content
+
+    def _vector(self, text: str) -> Any:
+        vector = self._embedder.embed(text)
+        if np is not None:
+            return np.asarray(vector, dtype=np.float32)
+        return array("f", vector)
+
+    def _signature(self, vector: Any) -> int:
+        if np is not None:
+            bits = (self._planes @ vector) > 0
+            return int(sum(1 << i for i, bit in enumerate(bits) if bit))
+        signature = 0
+        for i, plane in enumerate(self._planes):
+            if sum(map(mul, plane, vector)) > 0:
+                signature |= 1 << i
+        return signature
+
+    # ---- Public API --------------------------------------------------------
+
+    def lookup(
+        self, request: CompletionRequest
+    ) -> tuple[CompletionResponse | None, float]:
+        """Return (cached response, similarity), or (None, best similarity)."""
+        split = self.split_request(request)
+        if split is None:
+            return None, 0.0
+        namespace, prompt = split
+        partitions = self._partitions.get(namespace)
+        if not partitions:
+            return None, 0.0
+
+        start = time.perf_counter()
+        stats = self._stats
+        stats.lookups += 1
+        query = self._vector(prompt)
+        signature = self._signature(query)
+
+        best_id, best_score = -1, -2.0
+        # Multi-probe: the query's partition plus every one-bit neighbour
+        for probe in [signature] + [signature ^ (1 << i) for i in range(self._num_planes)]:
+            partition = partitions.get(probe)
+            if partition is None or not partition.ids:
+                continue
+            entry_id, score = partition.best(query)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        response = None
+        if best_score >= self._threshold:
+            entry = self._entries[best_id]
+            if entry.expires_at <= time.time():
+                self._evict(best_id)
+            else:
+                self._entries.move_to_end(best_id)
+                stats.hits += 1
+                stats.latency_saved_ms += entry.latency_ms
+                if self._rng.random() < self._sample_rate:
+                    stats.false_hit_samples.append(
+                        {"query": prompt, "matched": entry.prompt, "similarity": best_score}
+                    )
+                response = deserialize_response(entry.data)
+
+        stats.lookup_ms_total += (time.perf_counter() - start) * 1000
+        return response, max(best_score, 0.0)
+
+    def store(self, request: CompletionRequest, response: CompletionResponse) -> None:
+        """Index `response` under the request's final user message."""
+        split = self.split_request(request)
+        if split is None:
+            return
+        namespace, prompt = split
+        vector = self._vector(prompt)
+        signature = self._signature(vector)
+
+        entry_id = self._next_id
+        self._next_id += 1
+        partitions = self._partitions.setdefault(namespace, {})
+        partition = partitions.get(signature)
+        if partition is None:
+            partition = partitions[signature] = _Partition()
+        partition.add(entry_id, vector)
+        self._entries[entry_id] = _Entry(
+            namespace=namespace,
+            partition=signature,
+            data=serialize_response(response),
+            prompt=prompt,
+            latency_ms=response.latency_ms,
+            expires_at=time.time() + self._ttl,
+        )
+        self._stats.stores += 1
+
+        while len(self._entries) > self._max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        partitions = self._partitions[entry.namespace]
+        partition = partitions[entry.partition]
+        partition.remove(entry_id)
+        if not partition.ids:
+            del partitions[entry.partition]
+            if not partitions:
+                del self._partitions[entry.namespace]
+        self._stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        stats = self._stats
+        return {
+            "entries": len(self._entries),
+            "lookups": stats.lookups,
+            "hits": stats.hits,
+            "hit_rate": stats.hits / stats.lookups if stats.lookups else 0.0,
+            "avg_lookup_ms": stats.lookup_ms_total / stats.lookups if stats.lookups else 0.0,
+            "latency_saved_ms": stats.latency_saved_ms,
+            "evictions": stats.evictions,
+            "vectorized": np is not None,
+        }
+
+    def false_hit_samples(self) -> list[dict[str, Any]]:
+        """A sample of recent hits (query vs. matched prompt) for review."""
+        return list(self._stats.false_hit_samples)
@@ -0,0 +1,285 @@
+"""
+Shared-memory counters for a multi-process gateway.
+
+A pre-fork server runs one gateway per worker process. With the
+in-memory rate-limit backend each worker would enforce its own copy of
+every quota (N workers = N times the limit), and each would only see its
+own share of the spend. Redis fixes that across machines; on a single
+machine a shared-memory segment does the same job with no external
+service.
+
+Design:
+- SharedTable: a fixed-capacity, open-addressing hash table of
+  fixed-size rows in one multiprocessing.shared_memory segment, guarded
+  by one multiprocessing.Lock. Critical sections are a few struct
+  reads/writes, so a single lock is plenty for a handful of workers.
+- Create the tables in the parent *before* forking: children inherit
+  the mapping and the lock, and every worker sees the same counters.
+- SharedMemoryBackend: the sliding-window counter (two buckets per key,
+  as in RedisBackend) as a RateLimitBackend.
+- SharedCostTable: per-(key, model) request, token, cost and cache
+  counters that CostTracker mirrors its aggregates into.
+
+Rows are never deleted. Rate-limit rows whose window has expired are
+reused in place by the next new key that probes past them.
+
+Reference: Chapter 4 - Infrastructure for AI-First Operations
+"""
+
+import multiprocessing
+import struct
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from multiprocessing import shared_memory
+from typing import Any
+
+from .rate_limit import (
+    ALLOWED,
+    RateLimitBackend,
+    RateLimitConfig,
+    RateLimitDecision,
+)
+
+
+class SharedTableFull(Exception):
+    """No free row left for a new key."""
+
+
+class SharedTable:
+    """
+    Fixed-size rows keyed by string, in one shared-memory segment.
+
+    Each row is: used flag, key (utf-8, up to key_bytes), then the
+    fields of `row_format` (struct syntax, little-endian).
+
+    Usage:
+        table = SharedTable("qd", capacity=4096)    # before os.fork()
+        table.transact("key-std-001", lambda row: ((row or (0, 0.0))[0] + 1, 1.5))
+        for key, values in table.items():
+            ...
+        table.unlink()                              # in the parent, at exit
+    """
+
+    def __init__(
+        self,
+        row_format: str,
+        capacity: int = 16_384,
+        key_bytes: int = 128,
+        expired: Callable[[tuple, float], bool] | None = None,
+    ) -> None:
+        self._row = struct.Struct(f"<B{key_bytes}s{row_format}")
+        self._capacity = capacity
+        self._key_bytes = key_bytes
+        self._expired = expired
+        self._shm = shared_memory.SharedMemory(create=True, size=self._row.size * capacity)
+        self._buf = self._shm.buf
+        self._lock = multiprocessing.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self._row.size * self._capacity
+
+    def _encode(self, key: str) -> bytes:
+        encoded = key.encode()
+        if len(encoded) > self._key_bytes:
+            raise ValueError(f"Key longer than {self._key_bytes} bytes: {key[:40]}...")
+        return encoded
+
+    def _locate(self, key: bytes, now: float) -> tuple[int, tuple | None]:
+        """Return (row offset, current values or None if new). Caller holds the lock."""
+        row, size, buf = self._row, self._row.size, self._buf
+        start = zlib.crc32(key) % self._capacity
+        reusable = -1
+        for probe in range(self._capacity):
+            offset = ((start + probe) % self._capacity) * size
+            used, stored, *values = row.unpack_from(buf, offset)
+            if not used:
+                # End of the probe chain: the key isn't in the table
+                return (reusable if reusable >= 0 else offset), None
+            if stored.rstrip(b"\0") == key:
+                return offset, tuple(values)
+            if reusable < 0 and self._expired is not None and self._expired(tuple(values), now):
+                reusable = offset
+        if reusable >= 0:
+            return reusable, None
+        raise SharedTableFull(f"Shared table full ({self._capacity} rows)")
+
+    def transact(self, key: str, fn: Callable[[tuple | None], tuple[tuple | None, Any]]) -> Any:
+        """
+        Atomically read-modify-write one row.
+
+        fn receives the row's values (None for a new key) and returns
+        (new values or None to leave the row untouched, result).
+        """
+        encoded = self._encode(key)
+        with self._lock:
+            offset, values = self._locate(encoded, time.time())
+            new_values, result = fn(values)
+            if new_values is not None:
+                self._row.pack_into(self._buf, offset, 1, encoded, *new_values)
+        return result
+
+    def get(self, key: str) -> tuple | None:
+        return self.transact(key, lambda values: (None, values))
+
+    def items(self) -> Iterator[tuple[str, tuple]]:
+        """Every stored row, from a consistent snapshot of the segment."""
+        with self._lock:
+            snapshot = bytes(self._buf[: self.nbytes])
+        for used, stored, *values in self._row.iter_unpack(snapshot):
+            if used:
+                yield stored.rstrip(b"\0").decode(), tuple(values)
+
+    def close(self) -> None:
+        """Detach this process from the segment."""
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Detach and destroy the segment (once, from the creating process)."""
+        self.close()
+        self._shm.unlink()
+
+
+class SharedMemoryBackend(RateLimitBackend):
+    """
+    Sliding-window-counter rate limits shared by every forked worker.
+
+    Same algorithm as RedisBackend and InMemoryBackend(mode=
+    "sliding_counter"): two fixed buckets per key, the previous one
+    weighted by its overlap with the window. Check and increment happen
+    under the table lock, so two workers can't both admit the 60th
+    request.
+    """
+
+    # bucket_start, current/previous requests, current/previous tokens
+    ROW_FORMAT = "dqqqq"
+
+    def __init__(self, window_seconds: float = 60.0, capacity: int = 65_536) -> None:
+        self._window = window_seconds
+        self._table = SharedTable(
+            self.ROW_FORMAT,
+            capacity=capacity,
+            key_bytes=64,
+            expired=lambda row, now: row[0] + 2 * window_seconds <= now,
+        )
+
+    @property
+    def table(self) -> SharedTable:
+        return self._table
+
+    def _roll(self, row: tuple | None, now: float) -> list:
+        """Advance a row to the bucket containing now (as InMemoryBackend._roll)."""
+        if row is None:
+            return [now, 0, 0, 0, 0]
+        start, cur_r, prev_r, cur_t, prev_t = row
+        elapsed = now - start
+        if elapsed < self._window:
+            return [start, cur_r, prev_r, cur_t, prev_t]
+        buckets = int(elapsed // self._window)
+        if buckets == 1:
+            return [start + self._window, 0, cur_r, 0, cur_t]
+        return [start + buckets * self._window, 0, 0, 0, 0]
+
+    def _estimate(self, row: list, now: float) -> tuple[float, float]:
+        overlap = 1.0 - (now - row[0]) / self._window
+        return row[2] * overlap + row[1], row[4] * overlap + row[3]
+
+    async def reserve(
+        self, key_id: str, limits: RateLimitConfig, tokens: int
+    ) -> tuple[RateLimitDecision, Any]:
+        def check(values: tuple | None):
+            now = time.time()
+            row = self._roll(values, now)
+            requests, used = self._estimate(row, now)
+            retry_after = max(0.0, row[0] + self._window - now)
+            if requests >= limits.requests_per_minute:
+                return row, (RateLimitDecision(False, "requests", retry_after), None)
+            token_limit = limits.tokens_per_minute
+            if used >= token_limit or used + tokens > token_limit:
+                return row, (RateLimitDecision(False, "tokens", retry_after), None)
+            row[1] += 1
+            row[3] += tokens
+            return row, (ALLOWED, row[0])
+
+        return self._table.transact(key_id, check)
+
+    async def settle(
+        self, key_id: str, handle: Any, reserved: int, actual: int
+    ) -> None:
+        def adjust(values: tuple | None):
+            row = self._roll(values, time.time())
+            if handle == row[0]:
+                row[3] += actual - reserved
+            elif handle == row[0] - self._window:
+                row[4] += actual - reserved
+            else:
+                row[3] += actual  # reservation already aged out
+            return row, None
+
+        self._table.transact(key_id, adjust)
+
+    async def record_tokens(self, key_id: str, token_count: int) -> None:
+        def add(values: tuple | None):
+            row = self._roll(values, time.time())
+            row[3] += token_count
+            return row, None
+
+        self._table.transact(key_id, add)
+
+    async def get_usage(self, key_id: str) -> tuple[int, int]:
+        values = self._table.get(key_id)
+        if values is None:
+            return 0, 0
+        now = time.time()
+        requests, tokens = self._estimate(self._roll(values, now), now)
+        return int(requests), int(tokens)
+
+
+class SharedCostTable:
+    """
+    Per-(key, model) cost counters shared by every forked worker.
+
+    Pass one to CostTracker(shared=...) and its summaries and totals
+    cover all workers instead of only the current process.
+    """
+
+    # requests, input tokens, output tokens, cost, cache hits, cost saved
+    ROW_FORMAT = "qqqdqd"
+
+    def __init__(self, capacity: int = 16_384) -> None:
+        self._table = SharedTable(self.ROW_FORMAT, capacity=capacity)
+
+    @property
+    def table(self) -> SharedTable:
+        return self._table
+
+    def add(
+        self,
+        key_id: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost: float,
+        cached: bool = False,
+        cost_saved: float = 0.0,
+    ) -> None:
+        def bump(values: tuple | None):
+            requests, inp, out, total, hits, saved = values or (0, 0, 0, 0.0, 0, 0.0)
+            return (
+                requests + 1,
+                inp + input_tokens,
+                out + output_tokens,
+                total + cost,
+                hits + cached,
+                saved + cost_saved,
+            ), None
+
+        self._table.transact(f"{key_id}\0{model}", bump)
+
+    def rows(self) -> Iterator[tuple[str, str, tuple]]:
+        """(key_id, model, counters) for every stored row."""
+        for key, values in self._table.items():
+            key_id, _, model = key.partition("\0")
+            yield key_id, model, values
@@ -0,0 +1,172 @@
+"""
+Request coalescing (single-flight) for the AI Gateway.
+
+When a popular prompt spikes, dozens of identical requests arrive at
+once --- before the first response exists, so the response cache can't
+help. Single-flight makes them share one provider call: the first
+caller (the leader) starts it, everyone else with the same key awaits
+the same result.
+
+- complete(): callers await one shared task. The task is shielded from
+  any single caller's cancellation and is only cancelled once every
+  caller has gone away.
+- stream(): one producer task reads the provider stream into a buffer
+  and fans events out to every subscriber. Late joiners replay the
+  buffer first, then follow live.
+
+Keys come from request_cache_key(), so only byte-identical requests
+coalesce. The gateway keeps per-caller auth, rate limiting, cost and
+logging; this module only shares the provider call.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamCall:
+    __slots__ = ("task", "events", "done", "error", "new_data", "subscribers")
+
+    def __init__(self) -> None:
+        self.task: asyncio.Task | None = None
+        self.events: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.new_data = asyncio.Event()
+        self.subscribers = 0
+
+    def publish(self) -> None:
+        # Wake everyone waiting, then hand out a fresh event for next time
+        self.new_data.set()
+        self.new_data = asyncio.Event()
+
+
+class StreamSubscription:
+    """One caller's view of a shared stream. `coalesced` is False for the leader."""
+
+    def __init__(self, flight: "SingleFlight", key: str, call: _StreamCall, coalesced: bool) -> None:
+        self._flight = flight
+        self._key = key
+        self._call = call
+        self.coalesced = coalesced
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        call = self._call
+        call.subscribers += 1
+        i = 0
+        try:
+            while True:
+                if i < len(call.events):
+                    event = call.events[i]
+                    i += 1
+                    yield event
+                    continue
+                if call.done:
+                    if call.error is not None:
+                        raise call.error
+                    return
+                await call.new_data.wait()
+        finally:
+            call.subscribers -= 1
+            if call.subscribers == 0 and not call.done and call.task is not None:
+                # Last subscriber left: stop paying for the stream. Unlist
+                # it first, so a caller arriving before the producer has
+                # unwound starts a fresh stream instead of joining this one
+                self._flight._forget(self._flight._streams, self._key, call)
+                call.task.cancel()
+
+
+class SingleFlight:
+    """
+    Share one in-flight provider call among identical concurrent requests.
+
+    Usage:
+        flight = SingleFlight()
+        response, coalesced = await flight.do(key, lambda: provider.complete(request))
+
+        subscription = flight.stream(key, lambda: provider.stream_events(request))
+        async for event in subscription:
+            ...
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+        self._streams: dict[str, _StreamCall] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: str, fn: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """Run fn() once per key at a time; return (result, coalesced)."""
+        call = self._calls.get(key)
+        coalesced = call is not None
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(self._calls, key, call))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), coalesced
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Unlisted before cancelling, like abandoned streams
+                self._forget(self._calls, key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[Any]]
+    ) -> StreamSubscription:
+        """Subscribe to the shared stream for key, starting it if needed."""
+        call = self._streams.get(key)
+        if call is not None:
+            self.coalesced += 1
+            return StreamSubscription(self, key, call, coalesced=True)
+
+        call = self._streams[key] = _StreamCall()
+        self.leaders += 1
+
+        async def produce() -> None:
+            try:
+                async for event in factory():
+                    call.events.append(event)
+                    call.publish()
+            except BaseException as exc:
+                call.error = exc
+                if isinstance(exc, asyncio.CancelledError):
+                    raise
+            finally:
+                call.done = True
+                self._forget(self._streams, key, call)
+                call.publish()
+
+        call.task = asyncio.ensure_future(produce())
+        return StreamSubscription(self, key, call, coalesced=False)
+
+    @staticmethod
+    def _forget(calls: dict, key: str, call: Any) -> None:
+        if calls.get(key) is call:
+            del calls[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
@@ -0,0 +1,53 @@
+"""
+Fast local token estimation for the AI Gateway.
+
+The gateway needs a token count *before* the provider call --- to
+reserve rate-limit budget, and later to decide whether a prompt is worth
+compressing --- but the real count only arrives with the response.
+Running a provider tokenizer per request is slow and provider-specific,
+so this uses the usual rule of thumb instead: about four characters per
+token for English text, plus a few tokens of chat-format overhead per
+message.
+
+The estimate only has to be in the right neighbourhood. Reservations
+are settled to the provider's actual usage once the response arrives.
+
+Reference: Chapter 4 - Infrastructure for AI-First Operations
+"""
+
+from collections.abc import Iterable
+
+from providers.base import CompletionRequest, Message
+
+CHARS_PER_TOKEN = 4
+# Role marker and separators each chat message costs in OpenAI-style formats
+MESSAGE_OVERHEAD_TOKENS = 4
+# Tokens that prime the assistant's reply
+REPLY_PRIMING_TOKENS = 3
+
+
+def estimate_text_tokens(text: str | None) -> int:
+    """Estimate the token count of a piece of text."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: Message) -> int:
+    """Estimate the prompt tokens one message contributes."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_text_tokens(message.content)
+    if message.tool_calls:
+        for call in message.tool_calls:
+            tokens += estimate_text_tokens(call.name)
+            tokens += estimate_text_tokens(call.arguments)
+    return tokens
+
+
+def estimate_prompt_tokens(messages: Iterable[Message]) -> int:
+    """Estimate the prompt tokens for a whole conversation."""
+    return REPLY_PRIMING_TOKENS + sum(estimate_message_tokens(m) for m in messages)
+
+
+def estimate_request_tokens(request: CompletionRequest) -> int:
+    """Upper-bound estimate for a request: prompt plus max_tokens."""
+    return estimate_prompt_tokens(request.messages) + request.max_tokens
@@ -10,11 +10,13 @@ from .base import (
     CompletionResponse,
     Message,
     MessageRole,
+    ProviderError,
     ToolCall,
     ToolDefinition,
     Usage,
 )
 from .fallback import FallbackProvider
+from .latency import HedgeBudget, ProviderStats
 from .openai import OpenAIProvider
 from .openrouter import OpenRouterProvider
 
@@ -24,10 +26,13 @@ __all__ = [
     "CompletionRequest",
     "CompletionResponse",
     "FallbackProvider",
+    "HedgeBudget",
     "Message",
     "MessageRole",
     "OpenAIProvider",
     "OpenRouterProvider",
+    "ProviderError",
+    "ProviderStats",
     "ToolCall",
     "ToolDefinition",
     "Usage",
@@ -9,6 +9,7 @@ that translation so the gateway stays provider-agnostic.
 Reference: Chapter 4 - The AI Tool Gateway Pattern
 """
 
+import asyncio
 import json
 import logging
 import os
@@ -22,6 +23,7 @@ from .base import (
     CompletionRequest,
     CompletionResponse,
     MessageRole,
+    ProviderError,
     ToolCall,
     Usage,
 )
@@ -42,13 +44,13 @@ class AnthropicProvider(BaseProvider):
     gateway never has to care.
     """
 
-    def __init__(self) -> None:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
+    def __init__(self, base_url: str | None = None, api_key: str | None = None) -> None:
+        api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not api_key:
             raise EnvironmentError("ANTHROPIC_API_KEY environment variable is required")
         self._api_key = api_key
         self._client = httpx.AsyncClient(
-            base_url=_BASE_URL,
+            base_url=base_url or os.environ.get("ANTHROPIC_BASE_URL", _BASE_URL),
             headers={
                 "x-api-key": api_key,
                 "anthropic-version": _API_VERSION,
@@ -62,7 +64,7 @@ class AnthropicProvider(BaseProvider):
         return "anthropic"
 
     @property
-    def available_models(self) -> list[str]:
+    def default_models(self) -> list[str]:
         return [
             "claude-opus-4-5-20251101",
             "claude-sonnet-4-20250514",
@@ -116,13 +118,18 @@ class AnthropicProvider(BaseProvider):
         if resp.status_code != 200:
             body = resp.text
             logger.error("Anthropic API error %d: %s", resp.status_code, body)
-            raise RuntimeError(
+            raise ProviderError(
                 f"Anthropic API returned {resp.status_code}: {body}"
             )
 
-        data = resp.json()
-        latency_ms = (time.monotonic() - start) * 1000
+        return self._parse_message(
+            resp.json(), request, (time.monotonic() - start) * 1000
+        )
 
+    def _parse_message(
+        self, data: dict, request: CompletionRequest, latency_ms: float
+    ) -> CompletionResponse:
+        """Convert a Messages API body into a CompletionResponse."""
         # Extract text from content blocks
         content = ""
         tool_calls = None
@@ -164,12 +171,26 @@ class AnthropicProvider(BaseProvider):
         - event: content_block_delta  (contains the text chunks)
         - event: message_stop         (signals end of stream)
         """
+        async for event in self.stream_events(request):
+            if isinstance(event, str):
+                yield event
+
+    async def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        """Stream text chunks, then Usage assembled from the stream's events.
+
+        Input tokens arrive in message_start; the running output count
+        arrives in message_delta. Usage is yielded at message_stop.
+        """
         payload = self._build_payload(request, stream=True)
+        input_tokens = 0
+        output_tokens = 0
 
         async with self._client.stream("POST", "/messages", json=payload) as resp:
             if resp.status_code != 200:
                 body = await resp.aread()
-                raise RuntimeError(
+                raise ProviderError(
                     f"Anthropic API returned {resp.status_code}: {body.decode()}"
                 )
 
@@ -179,16 +200,78 @@ class AnthropicProvider(BaseProvider):
                 data_str = line[len("data: "):]
                 try:
                     chunk = json.loads(data_str)
+                    event_type = chunk.get("type")
                     # Anthropic sends content_block_delta events with text
-                    if chunk.get("type") == "content_block_delta":
+                    if event_type == "content_block_delta":
                         delta = chunk.get("delta", {})
                         if delta.get("type") == "text_delta":
                             text = delta.get("text", "")
                             if text:
                                 yield text
+                    elif event_type == "message_start":
+                        usage = chunk.get("message", {}).get("usage", {})
+                        input_tokens = usage.get("input_tokens", 0)
+                        output_tokens = usage.get("output_tokens", 0)
+                    elif event_type == "message_delta":
+                        usage = chunk.get("usage", {})
+                        output_tokens = usage.get("output_tokens", output_tokens)
+                    elif event_type == "message_stop":
+                        yield Usage(
+                            prompt_tokens=input_tokens,
+                            completion_tokens=output_tokens,
+                            total_tokens=input_tokens + output_tokens,
+                        )
                 except (json.JSONDecodeError, KeyError):
                     continue
 
+    @property
+    def supports_batch(self) -> bool:
+        return True
+
+    async def complete_batch(
+        self, requests: list[CompletionRequest]
+    ) -> list[CompletionResponse | Exception]:
+        """Run requests through the Message Batches API (50% cheaper).
+
+        Creates one batch, polls until processing has ended, then reads
+        the JSONL results. Each item's custom_id is the request's index.
+        """
+        start = time.monotonic()
+        resp = await self._client.post("/messages/batches", json={
+            "requests": [
+                {"custom_id": str(i), "params": self._build_payload(request)}
+                for i, request in enumerate(requests)
+            ],
+        })
+        if resp.status_code != 200:
+            raise ProviderError(f"Anthropic batch create returned {resp.status_code}: {resp.text}")
+        batch = resp.json()
+        while batch["processing_status"] != "ended":
+            await asyncio.sleep(self.batch_poll_interval)
+            resp = await self._client.get(f"/messages/batches/{batch['id']}")
+            resp.raise_for_status()
+            batch = resp.json()
+
+        latency_ms = (time.monotonic() - start) * 1000
+        results: list[CompletionResponse | Exception] = [
+            ProviderError(f"No result in Anthropic batch {batch['id']}")
+        ] * len(requests)
+        resp = await self._client.get(batch["results_url"])
+        resp.raise_for_status()
+        for line in resp.text.splitlines():
+            if not line:
+                continue
+            item = json.loads(line)
+            index = int(item["custom_id"])
+            result = item["result"]
+            if result["type"] == "succeeded":
+                results[index] = self._parse_message(result["message"], requests[index], latency_ms)
+            else:
+                results[index] = ProviderError(
+                    f"Anthropic batch item {result['type']}: {result.get('error')}"
+                )
+        return results
+
     async def health_check(self) -> bool:
         """Verify Anthropic is reachable with a minimal request."""
         try:
@@ -203,3 +286,7 @@ class AnthropicProvider(BaseProvider):
             return resp.status_code == 200
         except Exception:
             return False
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and its connection pool."""
+        await self._client.aclose()
@@ -12,12 +12,18 @@ the HTTP layer and can swap providers without installing anything new.
 Reference: Chapter 4 - The AI Tool Gateway Pattern
 """
 
+import copy
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, AsyncIterator
 
 
+class ProviderError(RuntimeError):
+    """A provider rejected or failed a request (bad status, failed batch job)."""
+
+
 class MessageRole(str, Enum):
     """Standard roles across all providers."""
     SYSTEM = "system"
@@ -103,10 +109,16 @@ class BaseProvider(ABC):
 
     @property
     @abstractmethod
-    def available_models(self) -> list[str]:
-        """Models this provider supports."""
+    def default_models(self) -> list[str]:
+        """Models this provider supports out of the box."""
         ...
 
+    @property
+    def available_models(self) -> list[str]:
+        """Models this provider serves: the with_models() list if set, else default_models."""
+        served = self.__dict__.get("_served_models")
+        return list(served) if served is not None else self.default_models
+
     @abstractmethod
     async def complete(self, request: CompletionRequest) -> CompletionResponse:
         """Send a completion request and return the response."""
@@ -117,11 +129,85 @@ class BaseProvider(ABC):
         """Stream a completion response token by token."""
         ...
 
+    async def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        """Stream text chunks, then the final Usage if the provider reports one.
+
+        The gateway uses this to settle cost and rate limits on streamed
+        requests. The default wraps stream() and reports no usage, in
+        which case the gateway falls back to local token estimates.
+        """
+        async for chunk in self.stream(request):
+            yield chunk
+
+    def stream_raw(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[memoryview | Usage]:
+        """Stream OpenAI chat.completion.chunk SSE frames and the final Usage.
+
+        Frames are complete `data: ...` events, blank line included, ready
+        to write to a client as-is; the last is `data: [DONE]`, and the
+        Usage (if reported) comes before it, where OpenAI sends usage. Providers
+        that speak OpenAI's wire format relay the frames they receive
+        without parsing them (see sse.py). This default translates:
+        it parses stream_events() and encodes a frame per text chunk.
+        """
+        from .sse import translate_events  # sse imports this module
+
+        return translate_events(self.stream_events(request), request.model)
+
     @abstractmethod
     async def health_check(self) -> bool:
         """Return True if the provider is reachable and responding."""
         ...
 
+    # Seconds between status polls while a native batch is running
+    batch_poll_interval: float = 30.0
+
+    @property
+    def supports_batch(self) -> bool:
+        """True if complete_batch() submits to a provider-native batch API."""
+        return False
+
+    async def complete_batch(
+        self, requests: list[CompletionRequest]
+    ) -> list[CompletionResponse | Exception]:
+        """Run requests as one provider-native batch job.
+
+        Returns one entry per request, in order: the response, or the
+        exception for an item that failed. Raises if the job itself can't
+        be submitted or fails as a whole. Native batches trade latency
+        (minutes to hours) for price and separate rate limits.
+        """
+        raise NotImplementedError(f"{self.name} has no native batch API")
+
+    @property
+    def model_set(self) -> frozenset[str]:
+        """available_models as a frozenset, built once per provider instance.
+
+        Copies made by with_models() carry the set of their own list.
+        """
+        models = self.__dict__.get("_model_set")
+        if models is None:
+            models = self._model_set = frozenset(self.available_models)
+        return models
+
     def supports_model(self, model: str) -> bool:
         """Check whether this provider handles the given model."""
-        return model in self.available_models
+        return model in self.model_set
+
+    def with_models(self, models: Iterable[str]) -> "BaseProvider":
+        """A shallow copy that serves exactly `models`.
+
+        The copy shares this provider's HTTP client, so the gateway can
+        apply a config's model list without opening a new connection pool.
+        Both available_models and model_set report the new list.
+        """
+        clone = copy.copy(self)
+        clone._served_models = list(dict.fromkeys(models))
+        clone._model_set = frozenset(clone._served_models)
+        return clone
+
+    async def aclose(self) -> None:
+        """Release the provider's HTTP client (no-op for providers without one)."""
@@ -0,0 +1,213 @@
+"""
+Circuit breakers for provider calls.
+
+Retries help with a blip; against a provider that is hard down they
+just add latency --- every request pays max_retries backoff sleeps
+before falling back. A circuit breaker remembers the outage:
+
+- closed:    calls flow; outcomes go into a rolling time window. Once
+             the window holds min_requests calls and the failure rate
+             reaches failure_rate, the circuit opens.
+- open:      calls are refused immediately, so FallbackProvider skips
+             straight to the next provider. After a jittered cooldown
+             (doubling on each consecutive trip) it turns half-open.
+- half-open: exactly one probe call is let through. Success closes the
+             circuit; failure opens it again.
+
+Breakers exist per provider and per (provider, model): a provider that
+is fine except for one overloaded model only loses that model.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import random
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    One closed/open/half-open breaker over a rolling failure-rate window.
+
+    Usage:
+        breaker = CircuitBreaker(failure_rate=0.5, min_requests=10)
+        if breaker.allow():
+            try:
+                result = await call()
+                breaker.record_success()
+            except Exception:
+                breaker.record_failure()
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 30.0,
+        buckets: int = 10,
+        min_requests: int = 10,
+        failure_rate: float = 0.5,
+        open_seconds: float = 15.0,
+        max_open_seconds: float = 120.0,
+        jitter: float = 0.2,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._width = window_seconds / buckets
+        # [bucket index, successes, failures]; a slot is reused once its
+        # bucket index falls out of the window
+        self._slots = [[-1, 0, 0] for _ in range(buckets)]
+        self._min_requests = min_requests
+        self._failure_rate = failure_rate
+        self._open_seconds = open_seconds
+        self._max_open_seconds = max_open_seconds
+        self._jitter = jitter
+        self._rng = rng or random.Random()
+
+        self._state = CLOSED
+        self._retry_at = 0.0
+        self._consecutive_trips = 0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() >= self._retry_at:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """May a call go through now? In half-open, claims the one probe."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._state == HALF_OPEN:
+            self._close()
+        elif self._state == CLOSED:
+            self._slot(time.monotonic())[1] += 1
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        if self._state == OPEN:
+            return  # a call that started before the circuit opened
+        now = time.monotonic()
+        self._slot(now)[2] += 1
+        successes, failures = self._totals(now)
+        total = successes + failures
+        if total >= self._min_requests and failures / total >= self._failure_rate:
+            self._open()
+
+    def release(self) -> None:
+        """An allowed call ended without an outcome (e.g. it was cancelled)."""
+        if self._state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _slot(self, now: float) -> list[int]:
+        index = int(now / self._width)
+        slot = self._slots[index % len(self._slots)]
+        if slot[0] != index:
+            slot[0], slot[1], slot[2] = index, 0, 0
+        return slot
+
+    def _totals(self, now: float) -> tuple[int, int]:
+        index = int(now / self._width)
+        successes = failures = 0
+        for slot_index, ok, failed in self._slots:
+            if index - slot_index < len(self._slots):
+                successes += ok
+                failures += failed
+        return successes, failures
+
+    def _open(self) -> None:
+        self._consecutive_trips += 1
+        cooldown = min(
+            self._open_seconds * 2 ** (self._consecutive_trips - 1),
+            self._max_open_seconds,
+        )
+        # Jitter keeps breakers that tripped together (other models,
+        # other gateway replicas) from probing in lockstep
+        cooldown *= self._rng.uniform(1 - self._jitter, 1 + self._jitter)
+        self._state = OPEN
+        self._retry_at = time.monotonic() + cooldown
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._consecutive_trips = 0
+        self._probe_in_flight = False
+        for slot in self._slots:
+            slot[0], slot[1], slot[2] = -1, 0, 0
+
+
+class CircuitBreakers:
+    """
+    Breakers per provider and per (provider, model), created on demand.
+
+    A call needs both its provider's and its model's breaker to allow
+    it, and its outcome is recorded on both.
+    """
+
+    def __init__(self, **settings) -> None:
+        self._settings = settings
+        self._breakers: dict[tuple[str, str | None], CircuitBreaker] = {}
+
+    def _get(self, provider: str, model: str | None) -> CircuitBreaker:
+        key = (provider, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(**self._settings)
+        return breaker
+
+    def is_open(self, provider: str, model: str) -> bool:
+        """True if calls would be refused outright (half-open is not open)."""
+        # Lookups only: no breaker is created for a call never made
+        for key in ((provider, None), (provider, model)):
+            breaker = self._breakers.get(key)
+            if breaker is not None and breaker.state == OPEN:
+                return True
+        return False
+
+    def allow(self, provider: str, model: str) -> bool:
+        provider_breaker = self._get(provider, None)
+        if not provider_breaker.allow():
+            return False
+        if not self._get(provider, model).allow():
+            provider_breaker.release()
+            return False
+        return True
+
+    def record_success(self, provider: str, model: str) -> None:
+        self._get(provider, None).record_success()
+        self._get(provider, model).record_success()
+
+    def record_failure(self, provider: str, model: str) -> None:
+        self._get(provider, None).record_failure()
+        self._get(provider, model).record_failure()
+
+    def release(self, provider: str, model: str) -> None:
+        self._get(provider, None).release()
+        self._get(provider, model).release()
+
+    def snapshot(self, provider: str) -> dict[str, object]:
+        """Provider circuit state plus any models whose circuit isn't closed."""
+        return {
+            "circuit": self._get(provider, None).state,
+            "models": {
+                model: breaker.state
+                for (name, model), breaker in self._breakers.items()
+                if name == provider and model is not None and breaker.state != CLOSED
+            },
+        }
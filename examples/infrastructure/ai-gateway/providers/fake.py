@@ -0,0 +1,113 @@
+"""
+In-process fake provider for load tests and local runs.
+
+Answers every model with canned text after a simulated latency, with no
+network and no API key. Use it to measure the gateway's own overhead
+(auth, rate limiting, routing, cost tracking, logging) and how it scales
+across worker processes, without paying a provider per request.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import asyncio
+import random
+import time
+from typing import AsyncIterator
+
+from .base import BaseProvider, CompletionRequest, CompletionResponse, Usage
+
+_WORDS = "the gateway routes every request through auth rate limits and cost tracking".split()
+
+
+class FakeProvider(BaseProvider):
+    """
+    A provider that sleeps instead of calling an API.
+
+    Latency is drawn from a normal distribution around latency_ms
+    (jitter_ms standard deviation, floored at zero); streams emit
+    output_tokens one word at a time, spread over that latency. It also
+    stands in for a native batch API: complete_batch() answers every
+    request after batch_seconds.
+
+    Usage:
+        gateway = AIGateway(providers={"fake": FakeProvider(latency_ms=50)})
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 20.0,
+        jitter_ms: float = 5.0,
+        output_tokens: int = 32,
+        models: list[str] | None = None,
+        batch_seconds: float = 0.5,
+    ) -> None:
+        self._latency_ms = latency_ms
+        self._jitter_ms = jitter_ms
+        self._output_tokens = output_tokens
+        self._models = models or ["fake-model"]
+        self._batch_seconds = batch_seconds
+        self._rng = random.Random()
+
+    @property
+    def name(self) -> str:
+        return "fake"
+
+    @property
+    def default_models(self) -> list[str]:
+        return self._models
+
+    def _delay(self) -> float:
+        return max(0.0, self._rng.gauss(self._latency_ms, self._jitter_ms)) / 1000
+
+    def _usage(self, request: CompletionRequest) -> Usage:
+        prompt = sum(len(m.content) for m in request.messages) // 4 + 1
+        completion = min(self._output_tokens, request.max_tokens)
+        return Usage(prompt, completion, prompt + completion)
+
+    def _words(self, count: int) -> list[str]:
+        return [_WORDS[i % len(_WORDS)] for i in range(count)]
+
+    def _response(self, request: CompletionRequest, start: float) -> CompletionResponse:
+        usage = self._usage(request)
+        return CompletionResponse(
+            content=" ".join(self._words(usage.completion_tokens)),
+            model=request.model,
+            provider=self.name,
+            usage=usage,
+            latency_ms=(time.monotonic() - start) * 1000,
+        )
+
+    async def complete(self, request: CompletionRequest) -> CompletionResponse:
+        start = time.monotonic()
+        await asyncio.sleep(self._delay())
+        return self._response(request, start)
+
+    @property
+    def supports_batch(self) -> bool:
+        return True
+
+    async def complete_batch(
+        self, requests: list[CompletionRequest]
+    ) -> list[CompletionResponse | Exception]:
+        start = time.monotonic()
+        await asyncio.sleep(self._batch_seconds)
+        return [self._response(request, start) for request in requests]
+
+    async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
+        async for event in self.stream_events(request):
+            if isinstance(event, str):
+                yield event
+
+    async def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        usage = self._usage(request)
+        words = self._words(usage.completion_tokens)
+        gap = self._delay() / max(len(words), 1)
+        for i, word in enumerate(words):
+            await asyncio.sleep(gap)
+            yield word if i == 0 else f" {word}"
+        yield usage
+
+    async def health_check(self) -> bool:
+        return True
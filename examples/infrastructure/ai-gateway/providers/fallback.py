@@ -6,14 +6,25 @@ gateway automatically retries and then falls back to an alternate
 provider. This is why multi-provider support matters --- not for
 cost optimization on day one, but for reliability.
 
+Optionally, tail latency too: providers can be ordered by observed
+latency and error rate, and a request stuck past the primary's p95 can
+be hedged to the next provider (see latency.py). With circuit breakers
+(see circuit_breaker.py), a provider that is down is skipped outright
+instead of being retried on every request, and a HealthMonitor lets
+chains skip providers already known to be unhealthy.
+
 Reference: Chapter 4 - The AI Tool Gateway Pattern
 """
 
 import asyncio
 import logging
-from typing import AsyncIterator
+import time
+from typing import AsyncIterator, Callable
 
-from .base import BaseProvider, CompletionRequest, CompletionResponse
+from .base import BaseProvider, CompletionRequest, CompletionResponse, ProviderError, Usage
+from .circuit_breaker import CircuitBreakers, CircuitOpenError
+from .health import HealthMonitor
+from .latency import HedgeBudget, ProviderStats
 
 logger = logging.getLogger("ai_gateway.fallback")
 
@@ -26,6 +37,11 @@ class FallbackProvider(BaseProvider):
     fails after retries, the gateway moves to the next provider. This
     gives you provider redundancy without manual intervention.
 
+    With latency_aware=True the order comes from live EWMA latency and
+    error rate per (provider, model) instead; with a hedge_budget, slow
+    requests are also raced against the next provider. With breakers,
+    providers whose circuit is open are skipped without a call.
+
     Usage:
         provider = FallbackProvider(
             providers=[openai_provider, anthropic_provider],
@@ -39,12 +55,30 @@ class FallbackProvider(BaseProvider):
         providers: list[BaseProvider],
         max_retries: int = 2,
         retry_delay: float = 1.0,
+        stats: ProviderStats | None = None,
+        latency_aware: bool = False,
+        hedge_budget: HedgeBudget | None = None,
+        min_hedge_delay: float = 0.05,
+        breakers: CircuitBreakers | None = None,
+        health: HealthMonitor | None = None,
     ) -> None:
         if not providers:
             raise ValueError("At least one provider is required")
         self._providers = providers
         self._max_retries = max_retries
         self._retry_delay = retry_delay
+        self._stats = stats if stats is not None else ProviderStats()
+        self._latency_aware = latency_aware
+        self._hedge_budget = hedge_budget
+        self._min_hedge_delay = min_hedge_delay
+        self._breakers = breakers
+        self._health = health
+        # The provider list is fixed for this instance, so the model list
+        # and per-model candidate chains are computed once, not per call
+        self._available_models = [
+            model for provider in providers for model in provider.available_models
+        ]
+        self._candidates: dict[str, list[BaseProvider]] = {}
 
     @property
     def name(self) -> str:
@@ -52,15 +86,41 @@ class FallbackProvider(BaseProvider):
         return f"fallback({', '.join(names)})"
 
     @property
-    def available_models(self) -> list[str]:
-        models: list[str] = []
-        for provider in self._providers:
-            models.extend(provider.available_models)
-        return models
+    def providers(self) -> list[BaseProvider]:
+        return self._providers
+
+    @property
+    def default_models(self) -> list[str]:
+        return self._available_models
 
     def _find_provider_for_model(self, model: str) -> list[BaseProvider]:
         """Return providers that support the given model, in priority order."""
-        return [p for p in self._providers if p.supports_model(model)]
+        candidates = self._candidates.get(model)
+        if candidates is None:
+            candidates = [p for p in self._providers if p.supports_model(model)]
+            if not candidates:
+                # Fall back to all if no model match; not cached, so
+                # arbitrary model names from callers can't grow the dict
+                return self._providers
+            self._candidates[model] = candidates
+        return candidates
+
+    def _ordered_candidates(self, model: str) -> list[BaseProvider]:
+        candidates = self._find_provider_for_model(model)
+        if self._health is not None:
+            healthy = [p for p in candidates if self._health.is_healthy(p.name)]
+            # Health checks are advisory: if none pass, still try them all
+            if healthy:
+                candidates = healthy
+        if self._breakers is not None:
+            candidates = [
+                p for p in candidates if not self._breakers.is_open(p.name, model)
+            ]
+            if not candidates:
+                raise CircuitOpenError(f"All provider circuits are open for model {model}")
+        if self._latency_aware and len(candidates) > 1:
+            return self._stats.order(candidates, model)
+        return candidates
 
     async def complete(self, request: CompletionRequest) -> CompletionResponse:
         """
@@ -69,42 +129,145 @@ class FallbackProvider(BaseProvider):
         On each provider: retry up to max_retries times with exponential
         backoff. If all retries fail, move to the next provider. If all
         providers fail, raise the last exception.
+
+        With hedging on, a primary that hasn't answered by its observed
+        p95 is raced against the next provider; see _complete_hedged.
         """
-        candidates = self._find_provider_for_model(request.model)
-        if not candidates:
-            candidates = self._providers  # Fall back to all if no model match
+        candidates = self._ordered_candidates(request.model)
+        if self._hedge_budget is not None and len(candidates) > 1:
+            return await self._complete_hedged(request, candidates)
 
         last_error: Exception | None = None
 
         for provider in candidates:
-            for attempt in range(self._max_retries + 1):
-                try:
-                    logger.info(
-                        "Trying provider=%s model=%s attempt=%d",
-                        provider.name,
-                        request.model,
-                        attempt + 1,
-                    )
-                    return await provider.complete(request)
-
-                except Exception as exc:
-                    last_error = exc
-                    logger.warning(
-                        "Provider %s failed (attempt %d/%d): %s",
-                        provider.name,
-                        attempt + 1,
-                        self._max_retries + 1,
-                        str(exc),
-                    )
-                    if attempt < self._max_retries:
-                        delay = self._retry_delay * (2 ** attempt)
-                        await asyncio.sleep(delay)
-
-            logger.error(
-                "Provider %s exhausted all retries, falling back", provider.name
-            )
-
-        raise RuntimeError(
+            try:
+                return await self._complete_with_retries(provider, request)
+            except Exception as exc:
+                last_error = exc
+
+        raise ProviderError(
+            f"All providers failed. Last error: {last_error}"
+        )
+
+    async def _complete_with_retries(
+        self, provider: BaseProvider, request: CompletionRequest
+    ) -> CompletionResponse:
+        """One provider's retry loop, recording latency, errors and breaker outcomes."""
+        breakers = self._breakers
+        last_error: Exception | None = None
+
+        for attempt in range(self._max_retries + 1):
+            if breakers is not None and not breakers.allow(provider.name, request.model):
+                # Opened (or its half-open probe is taken): stop here
+                if last_error is None:
+                    raise CircuitOpenError(f"Circuit open for {provider.name}/{request.model}")
+                break
+            start = time.monotonic()
+            try:
+                logger.info(
+                    "Trying provider=%s model=%s attempt=%d",
+                    provider.name,
+                    request.model,
+                    attempt + 1,
+                )
+                response = await provider.complete(request)
+                self._stats.record_success(
+                    provider.name, request.model, (time.monotonic() - start) * 1000
+                )
+                if breakers is not None:
+                    breakers.record_success(provider.name, request.model)
+                return response
+
+            except asyncio.CancelledError:
+                self._stats.record_cancelled(
+                    provider.name, request.model, (time.monotonic() - start) * 1000
+                )
+                if breakers is not None:
+                    breakers.release(provider.name, request.model)
+                raise
+
+            except Exception as exc:
+                last_error = exc
+                self._stats.record_error(provider.name, request.model)
+                if breakers is not None:
+                    breakers.record_failure(provider.name, request.model)
+                logger.warning(
+                    "Provider %s failed (attempt %d/%d): %s",
+                    provider.name,
+                    attempt + 1,
+                    self._max_retries + 1,
+                    str(exc),
+                )
+                if attempt < self._max_retries:
+                    if breakers is not None and breakers.is_open(provider.name, request.model):
+                        break  # no point sleeping before a refused retry
+                    delay = self._retry_delay * (2 ** attempt)
+                    await asyncio.sleep(delay)
+
+        logger.error(
+            "Provider %s exhausted all retries, falling back", provider.name
+        )
+        raise last_error
+
+    async def _complete_hedged(
+        self, request: CompletionRequest, candidates: list[BaseProvider]
+    ) -> CompletionResponse:
+        """
+        Race the primary against the next provider once it runs long.
+
+        The primary starts alone. If it hasn't answered by its observed
+        p95 latency for this model, and the hedge budget allows, the
+        same request goes to the next provider and the first success
+        wins; the loser is cancelled. A failed provider is replaced by
+        the next one immediately. At most one hedge per request.
+        """
+        self._hedge_budget.deposit()
+        remaining = list(candidates)
+        running: dict[asyncio.Task, BaseProvider] = {}
+        last_error: BaseException | None = None
+        hedge_checked = False
+
+        def launch() -> BaseProvider:
+            provider = remaining.pop(0)
+            task = asyncio.ensure_future(self._complete_with_retries(provider, request))
+            running[task] = provider
+            return provider
+
+        primary = launch()
+        try:
+            while running:
+                timeout = None
+                if remaining and not hedge_checked:
+                    p95_ms = self._stats.p95_ms(primary.name, request.model)
+                    if p95_ms is not None:
+                        timeout = max(p95_ms / 1000, self._min_hedge_delay)
+
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge_checked = True
+                    if self._hedge_budget.try_spend():
+                        hedge = launch()
+                        logger.info(
+                            "Hedging model=%s: %s past p95 (%.0fms), also trying %s",
+                            request.model, primary.name, timeout * 1000, hedge.name,
+                        )
+                    continue
+
+                for task in done:
+                    running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    last_error = error
+                if not running and remaining:
+                    primary = launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise ProviderError(
             f"All providers failed. Last error: {last_error}"
         )
 
@@ -113,35 +276,104 @@ class FallbackProvider(BaseProvider):
         Stream with fallback.
 
         Streaming is harder to retry mid-stream, so we attempt each
-        provider once. If the stream fails, we try the next provider
-        from the beginning.
+        provider once. If the stream fails before producing output, we
+        try the next provider from the beginning; once output has been
+        sent, a failure is raised rather than replayed from another model.
         """
-        candidates = self._find_provider_for_model(request.model)
-        if not candidates:
-            candidates = self._providers
+        async for event in self.stream_events(request):
+            if isinstance(event, str):
+                yield event
+
+    def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        """stream() with the serving provider's final Usage passed through."""
+        return self._failover_stream(request, lambda p: p.stream_events(request))
+
+    def stream_raw(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[memoryview | Usage]:
+        """Raw SSE frames with fallback, same rules as stream()."""
+        return self._failover_stream(request, lambda p: p.stream_raw(request))
+
+    async def _failover_stream(
+        self,
+        request: CompletionRequest,
+        open_stream: Callable[[BaseProvider], AsyncIterator],
+    ) -> AsyncIterator:
+        candidates = self._ordered_candidates(request.model)
 
         last_error: Exception | None = None
 
+        breakers = self._breakers
+
         for provider in candidates:
+            if breakers is not None and not breakers.allow(provider.name, request.model):
+                continue
+            started = False
+            settled = False
             try:
-                async for token in provider.stream(request):
-                    yield token
+                async for event in open_stream(provider):
+                    started = True
+                    yield event
+                settled = True
+                if breakers is not None:
+                    breakers.record_success(provider.name, request.model)
                 return  # Successful stream completed
             except Exception as exc:
+                settled = True
+                if breakers is not None:
+                    breakers.record_failure(provider.name, request.model)
+                if started:
+                    raise
                 last_error = exc
                 logger.warning(
                     "Stream from %s failed, trying next provider: %s",
                     provider.name,
                     str(exc),
                 )
+            finally:
+                # Caller closed the stream or was cancelled: no outcome
+                if not settled and breakers is not None:
+                    breakers.release(provider.name, request.model)
 
-        raise RuntimeError(
+        raise ProviderError(
             f"All providers failed to stream. Last error: {last_error}"
         )
 
+    @property
+    def supports_batch(self) -> bool:
+        return any(p.supports_batch for p in self._providers)
+
+    async def complete_batch(
+        self, requests: list[CompletionRequest]
+    ) -> list[CompletionResponse | Exception]:
+        """Submit the batch to the first candidate with a native batch API.
+
+        No retries or fallback here: a batch job runs for minutes to
+        hours, so the caller decides what to do if it fails.
+        """
+        model = requests[0].model if requests else ""
+        for provider in self._ordered_candidates(model):
+            if provider.supports_batch:
+                return await provider.complete_batch(requests)
+        raise NotImplementedError(f"No provider in {self.name} has a native batch API")
+
     async def health_check(self) -> bool:
-        """Return True if at least one provider is healthy."""
-        for provider in self._providers:
-            if await provider.health_check():
-                return True
-        return False
+        """Return True if at least one provider is healthy.
+
+        Providers are checked concurrently and the first healthy answer
+        wins; the remaining checks are cancelled.
+        """
+        tasks = [asyncio.ensure_future(p.health_check()) for p in self._providers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    if await next_done:
+                        return True
+                except Exception:
+                    continue
+            return False
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,177 @@
+"""
+Provider health checks for the AI Gateway.
+
+Checking providers one after another means the slowest (or hung) one
+sets the pace: three providers behind 10-second timeouts make a 30-second
+health endpoint. Here every provider is checked concurrently, each under
+its own timeout, and HealthMonitor keeps the latest results so that:
+
+- health endpoints answer instantly from cache, refreshed in the
+  background on an interval;
+- fallback chains skip providers known to be unhealthy instead of
+  discovering it again on a live request.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+
+from .base import BaseProvider
+
+logger = logging.getLogger("ai_gateway.health")
+
+
+@dataclass(slots=True)
+class HealthStatus:
+    """Latest health check result for one provider."""
+    healthy: bool
+    checked_at: float
+    latency_ms: float
+    error: str | None = None
+    consecutive_failures: int = 0
+
+
+async def check_health(provider: BaseProvider, timeout: float) -> HealthStatus:
+    """Run one provider's health check under a timeout; never raises."""
+    start = time.monotonic()
+    error = None
+    try:
+        healthy = await asyncio.wait_for(provider.health_check(), timeout)
+        if not healthy:
+            error = "health check failed"
+    except asyncio.TimeoutError:
+        healthy, error = False, f"timed out after {timeout:g}s"
+    except Exception as exc:
+        healthy, error = False, str(exc)
+    return HealthStatus(
+        healthy=healthy,
+        checked_at=time.time(),
+        latency_ms=(time.monotonic() - start) * 1000,
+        error=error,
+    )
+
+
+class HealthMonitor:
+    """
+    Concurrent, cached provider health checks with a background prober.
+
+    Results are keyed by provider.name. A provider counts as unhealthy
+    for routing only after `unhealthy_after` consecutive failed checks,
+    and only while that result is fresh; unknown or stale means healthy,
+    so a stalled prober can never take providers out of rotation.
+
+    Usage:
+        monitor = HealthMonitor(providers, interval=30.0, timeout=5.0)
+        monitor.start()                 # inside a running event loop
+        statuses = await monitor.get()  # cached if fresh
+        if monitor.is_healthy("openrouter"):
+            ...
+        await monitor.stop()
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, BaseProvider],
+        interval: float = 30.0,
+        timeout: float = 5.0,
+        unhealthy_after: int = 2,
+    ) -> None:
+        # Replaced by set_providers() when the gateway's provider set changes
+        self._providers = providers
+        self._interval = interval
+        self._timeout = timeout
+        self._unhealthy_after = unhealthy_after
+        self._max_age = interval * 3
+        self._statuses: dict[str, HealthStatus] = {}
+        self._refreshing: asyncio.Task | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def set_providers(self, providers: dict[str, BaseProvider]) -> None:
+        """Check this provider set from the next round on.
+
+        Statuses are keyed by provider name, so providers present in both
+        sets keep their history.
+        """
+        self._providers = providers
+
+    def is_healthy(self, name: str) -> bool:
+        status = self._statuses.get(name)
+        if status is None or time.time() - status.checked_at > self._max_age:
+            return True
+        return status.consecutive_failures < self._unhealthy_after
+
+    async def refresh(self) -> dict[str, HealthStatus]:
+        """Check every provider now. Concurrent callers share one round."""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._check_all())
+        return await asyncio.shield(self._refreshing)
+
+    async def _check_all(self) -> dict[str, HealthStatus]:
+        providers = list(self._providers.values())
+        results = await asyncio.gather(
+            *(check_health(p, self._timeout) for p in providers)
+        )
+        for provider, status in zip(providers, results):
+            previous = self._statuses.get(provider.name)
+            if not status.healthy:
+                status.consecutive_failures = (
+                    previous.consecutive_failures + 1 if previous is not None else 1
+                )
+            was_healthy = self.is_healthy(provider.name)
+            self._statuses[provider.name] = status
+            if was_healthy != self.is_healthy(provider.name):
+                logger.warning(
+                    "Provider %s is now %s%s",
+                    provider.name,
+                    "healthy" if status.healthy else "unhealthy",
+                    f" ({status.error})" if status.error else "",
+                )
+        return self.statuses()
+
+    async def get(self) -> dict[str, HealthStatus]:
+        """Cached statuses if every provider has a fresh one, else refresh."""
+        now = time.time()
+        fresh = all(
+            (status := self._statuses.get(p.name)) is not None
+            and now - status.checked_at <= self._max_age
+            for p in self._providers.values()
+        )
+        return self.statuses() if fresh else await self.refresh()
+
+    def statuses(self) -> dict[str, HealthStatus]:
+        return {
+            p.name: self._statuses[p.name]
+            for p in self._providers.values()
+            if p.name in self._statuses
+        }
+
+    def start(self) -> None:
+        """Start the background prober (call from inside the event loop)."""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health probe round failed")
+            # Jittered so gateway replicas don't probe in lockstep
+            await asyncio.sleep(self._interval * random.uniform(0.9, 1.1))
@@ -0,0 +1,174 @@
+"""
+Live latency and error statistics per (provider, model).
+
+FallbackProvider uses these to decide two things on every request:
+
+- Order: candidates are tried in order of expected time to a good
+  answer --- EWMA latency divided by the EWMA success rate --- instead
+  of the fixed order from config.
+- When to hedge: a request still waiting past the primary's observed
+  p95 is sent to the next provider as well (see HedgeBudget).
+
+One ProviderStats instance is shared by every fallback chain in the
+gateway, so what one chain learns about a provider the others use too.
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class _Series:
+    """EWMAs plus a small ring of recent latencies for the p95."""
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    samples: int = 0
+    errors: int = 0
+    ring: list[float] | None = None
+    ring_pos: int = 0
+    p95_ms: float = 0.0
+    p95_stale: int = 0
+
+
+class ProviderStats:
+    """
+    EWMA latency, EWMA error rate and p95 latency per (provider, model).
+
+    Usage:
+        stats = ProviderStats()
+        stats.record_success("openrouter", "gpt-4o", 812.0)
+        stats.record_error("openrouter", "gpt-4o")
+        ordered = stats.order(candidates, "gpt-4o")
+        delay_ms = stats.p95_ms("openrouter", "gpt-4o")
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        window: int = 256,
+        min_samples: int = 20,
+    ) -> None:
+        self._alpha = alpha
+        self._window = window
+        self._min_samples = min_samples
+        self._series: dict[tuple[str, str], _Series] = {}
+
+    def _get(self, provider: str, model: str) -> _Series:
+        key = (provider, model)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def record_success(self, provider: str, model: str, latency_ms: float) -> None:
+        series = self._get(provider, model)
+        self._observe_latency(series, latency_ms)
+        series.error_rate += self._alpha * (0.0 - series.error_rate)
+
+    def record_error(self, provider: str, model: str) -> None:
+        series = self._get(provider, model)
+        series.errors += 1
+        series.error_rate += self._alpha * (1.0 - series.error_rate)
+
+    def record_cancelled(self, provider: str, model: str, elapsed_ms: float) -> None:
+        """A hedge loser was cancelled after elapsed_ms.
+
+        Its real latency is unknown but at least elapsed_ms; recording
+        the lower bound keeps a slow provider from looking fast just
+        because its slow responses are always cancelled.
+        """
+        self._observe_latency(self._get(provider, model), elapsed_ms)
+
+    def _observe_latency(self, series: _Series, latency_ms: float) -> None:
+        if series.samples == 0:
+            series.latency_ms = latency_ms
+            series.ring = [0.0] * self._window
+        else:
+            series.latency_ms += self._alpha * (latency_ms - series.latency_ms)
+        series.samples += 1
+        series.ring[series.ring_pos] = latency_ms
+        series.ring_pos = (series.ring_pos + 1) % self._window
+        series.p95_stale += 1
+
+    def p95_ms(self, provider: str, model: str) -> float | None:
+        """Observed p95 latency, or None until min_samples are in."""
+        series = self._series.get((provider, model))
+        if series is None or series.samples < self._min_samples:
+            return None
+        # Re-sort the ring only every few samples, not on every request
+        if series.p95_stale >= 16 or not series.p95_ms:
+            recent = sorted(series.ring[: min(series.samples, self._window)])
+            series.p95_ms = recent[int(0.95 * (len(recent) - 1))]
+            series.p95_stale = 0
+        return series.p95_ms
+
+    def score(self, provider: str, model: str) -> float | None:
+        """Expected ms to a successful answer from this provider; None if unknown."""
+        series = self._series.get((provider, model))
+        if series is None or series.samples + series.errors < self._min_samples:
+            return None
+        if series.samples == 0:
+            return float("inf")  # only ever failed
+        # latency / P(success): a provider failing half its calls costs
+        # two attempts on average
+        return series.latency_ms / max(1.0 - series.error_rate, 0.01)
+
+    def order(self, providers: list, model: str) -> list:
+        """Sort providers by score; providers without data keep config order, last."""
+        scored = [(self.score(p.name, model), i, p) for i, p in enumerate(providers)]
+        if all(s is None for s, _, _ in scored):
+            return providers
+        known = sorted((s, i, p) for s, i, p in scored if s is not None)
+        unknown = [p for s, _, p in scored if s is None]
+        return [p for _, _, p in known] + unknown
+
+    def snapshot(self) -> dict[str, dict[str, float | int | None]]:
+        return {
+            f"{provider}/{model}": {
+                "ewma_latency_ms": round(series.latency_ms, 1),
+                "error_rate": round(series.error_rate, 4),
+                "p95_ms": self.p95_ms(provider, model),
+                "samples": series.samples,
+                "errors": series.errors,
+            }
+            for (provider, model), series in self._series.items()
+        }
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a fraction of all requests.
+
+    Every request deposits `ratio` tokens, a hedge spends one, and the
+    balance is capped at `burst` --- so hedges stay at or under `ratio`
+    of traffic over time, even if a provider slows down across the board.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0) -> None:
+        self._ratio = ratio
+        self._burst = burst
+        self._tokens = burst
+        self.requests = 0
+        self.hedges = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        self.requests += 1
+        self._tokens = min(self._burst, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.hedges += 1
+            return True
+        self.denied += 1
+        return False
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "denied": self.denied,
+            "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+        }
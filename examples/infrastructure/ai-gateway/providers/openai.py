@@ -9,10 +9,12 @@ connection pooling).
 Reference: Chapter 4 - The AI Tool Gateway Pattern
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
+import uuid
 from typing import AsyncIterator
 
 import httpx
@@ -21,9 +23,11 @@ from .base import (
     BaseProvider,
     CompletionRequest,
     CompletionResponse,
+    ProviderError,
     ToolCall,
     Usage,
 )
+from .sse import relay_frames
 
 logger = logging.getLogger("ai_gateway.openai")
 
@@ -39,13 +43,13 @@ class OpenAIProvider(BaseProvider):
     just HTTP POST with JSON.
     """
 
-    def __init__(self) -> None:
-        api_key = os.environ.get("OPENAI_API_KEY")
+    def __init__(self, base_url: str | None = None, api_key: str | None = None) -> None:
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise EnvironmentError("OPENAI_API_KEY environment variable is required")
         self._api_key = api_key
         self._client = httpx.AsyncClient(
-            base_url=_BASE_URL,
+            base_url=base_url or os.environ.get("OPENAI_BASE_URL", _BASE_URL),
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json",
@@ -58,7 +62,7 @@ class OpenAIProvider(BaseProvider):
         return "openai"
 
     @property
-    def available_models(self) -> list[str]:
+    def default_models(self) -> list[str]:
         return [
             "gpt-4o",
             "gpt-4o-mini",
@@ -82,6 +86,8 @@ class OpenAIProvider(BaseProvider):
         }
         if stream:
             payload["stream"] = True
+            # Ask for a final chunk carrying token usage
+            payload["stream_options"] = {"include_usage": True}
         if request.tools:
             payload["tools"] = [
                 {
@@ -106,13 +112,18 @@ class OpenAIProvider(BaseProvider):
         if resp.status_code != 200:
             body = resp.text
             logger.error("OpenAI API error %d: %s", resp.status_code, body)
-            raise RuntimeError(
+            raise ProviderError(
                 f"OpenAI API returned {resp.status_code}: {body}"
             )
 
-        data = resp.json()
-        latency_ms = (time.monotonic() - start) * 1000
+        return self._parse_completion(
+            resp.json(), request, (time.monotonic() - start) * 1000
+        )
 
+    def _parse_completion(
+        self, data: dict, request: CompletionRequest, latency_ms: float
+    ) -> CompletionResponse:
+        """Convert a chat completion body into a CompletionResponse."""
         choice = data["choices"][0]
         message = choice["message"]
         usage_data = data.get("usage", {})
@@ -144,6 +155,14 @@ class OpenAIProvider(BaseProvider):
 
     async def stream(self, request: CompletionRequest) -> AsyncIterator[str]:
         """Stream tokens from OpenAI using server-sent events."""
+        async for event in self.stream_events(request):
+            if isinstance(event, str):
+                yield event
+
+    async def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        """Stream text chunks, then the Usage from the final usage chunk."""
         payload = self._build_payload(request, stream=True)
 
         async with self._client.stream(
@@ -151,7 +170,7 @@ class OpenAIProvider(BaseProvider):
         ) as resp:
             if resp.status_code != 200:
                 body = await resp.aread()
-                raise RuntimeError(
+                raise ProviderError(
                     f"OpenAI API returned {resp.status_code}: {body.decode()}"
                 )
 
@@ -163,6 +182,16 @@ class OpenAIProvider(BaseProvider):
                     break
                 try:
                     chunk = json.loads(data_str)
+                    # The usage chunk arrives last, with an empty choices list
+                    usage_data = chunk.get("usage")
+                    if usage_data:
+                        yield Usage(
+                            prompt_tokens=usage_data.get("prompt_tokens", 0),
+                            completion_tokens=usage_data.get("completion_tokens", 0),
+                            total_tokens=usage_data.get("total_tokens", 0),
+                        )
+                    if not chunk.get("choices"):
+                        continue
                     delta = chunk["choices"][0].get("delta", {})
                     content = delta.get("content")
                     if content:
@@ -170,6 +199,105 @@ class OpenAIProvider(BaseProvider):
                 except (json.JSONDecodeError, KeyError, IndexError):
                     continue
 
+    async def stream_raw(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[memoryview | Usage]:
+        """Relay OpenAI's SSE frames as received, with usage sniffed (see sse.py)."""
+        payload = self._build_payload(request, stream=True)
+
+        async with self._client.stream(
+            "POST", "/chat/completions", json=payload
+        ) as resp:
+            if resp.status_code != 200:
+                body = await resp.aread()
+                raise ProviderError(
+                    f"OpenAI API returned {resp.status_code}: {body.decode()}"
+                )
+
+            async for event in relay_frames(resp.aiter_bytes()):
+                yield event
+
+    @property
+    def supports_batch(self) -> bool:
+        return True
+
+    async def complete_batch(
+        self, requests: list[CompletionRequest]
+    ) -> list[CompletionResponse | Exception]:
+        """Run requests through the Batch API (50% cheaper, 24h window).
+
+        Uploads the requests as a JSONL file, creates a batch over it,
+        polls until it finishes, then reads the output and error files.
+        Each line's custom_id is the request's index.
+        """
+        start = time.monotonic()
+        lines = b"".join(
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_payload(request),
+            }).encode() + b"\n"
+            for i, request in enumerate(requests)
+        )
+        # Multipart by hand: the client's default JSON content-type
+        # would otherwise win over httpx's multipart header
+        boundary = uuid.uuid4().hex
+        upload = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="purpose"\r\n\r\n'
+            f"batch\r\n--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="batch.jsonl"\r\n'
+            "Content-Type: application/jsonl\r\n\r\n"
+        ).encode() + lines + f"\r\n--{boundary}--\r\n".encode()
+        resp = await self._client.post(
+            "/files",
+            content=upload,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        if resp.status_code != 200:
+            raise ProviderError(f"OpenAI file upload returned {resp.status_code}: {resp.text}")
+        resp = await self._client.post("/batches", json={
+            "input_file_id": resp.json()["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        })
+        if resp.status_code != 200:
+            raise ProviderError(f"OpenAI batch create returned {resp.status_code}: {resp.text}")
+        batch = resp.json()
+        while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(self.batch_poll_interval)
+            resp = await self._client.get(f"/batches/{batch['id']}")
+            resp.raise_for_status()
+            batch = resp.json()
+        if batch["status"] == "failed":
+            raise ProviderError(f"OpenAI batch {batch['id']} failed: {batch.get('errors')}")
+
+        latency_ms = (time.monotonic() - start) * 1000
+        results: list[CompletionResponse | Exception] = [
+            ProviderError(f"No result in OpenAI batch {batch['id']} ({batch['status']})")
+        ] * len(requests)
+        for file_key in ("output_file_id", "error_file_id"):
+            if not batch.get(file_key):
+                continue
+            resp = await self._client.get(f"/files/{batch[file_key]}/content")
+            resp.raise_for_status()
+            for line in resp.text.splitlines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                index = int(item["custom_id"])
+                response = item.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[index] = self._parse_completion(
+                        response["body"], requests[index], latency_ms
+                    )
+                else:
+                    error = item.get("error") or response.get("body", {}).get("error")
+                    results[index] = ProviderError(
+                        f"OpenAI batch item returned {response.get('status_code')}: {error}"
+                    )
+        return results
+
     async def health_check(self) -> bool:
         """Verify OpenAI is reachable with a lightweight models list call."""
         try:
@@ -177,3 +305,7 @@ class OpenAIProvider(BaseProvider):
             return resp.status_code == 200
         except Exception:
             return False
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and its connection pool."""
+        await self._client.aclose()
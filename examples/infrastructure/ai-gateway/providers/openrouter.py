@@ -28,9 +28,11 @@ from .base import (
     BaseProvider,
     CompletionRequest,
     CompletionResponse,
+    ProviderError,
     ToolCall,
     Usage,
 )
+from .sse import relay_frames
 
 logger = logging.getLogger("ai_gateway.openrouter")
 
@@ -49,8 +51,8 @@ class OpenRouterProvider(BaseProvider):
     enough for most gateway routing scenarios.
     """
 
-    def __init__(self) -> None:
-        api_key = os.environ.get("OPENROUTER_API_KEY")
+    def __init__(self, base_url: str | None = None, api_key: str | None = None) -> None:
+        api_key = api_key or os.environ.get("OPENROUTER_API_KEY")
         if not api_key:
             raise EnvironmentError(
                 "OPENROUTER_API_KEY environment variable is required"
@@ -71,7 +73,7 @@ class OpenRouterProvider(BaseProvider):
             headers["X-Title"] = title
 
         self._client = httpx.AsyncClient(
-            base_url=_BASE_URL,
+            base_url=base_url or os.environ.get("OPENROUTER_BASE_URL", _BASE_URL),
             headers=headers,
             timeout=httpx.Timeout(60.0, connect=10.0),
         )
@@ -81,7 +83,7 @@ class OpenRouterProvider(BaseProvider):
         return "openrouter"
 
     @property
-    def available_models(self) -> list[str]:
+    def default_models(self) -> list[str]:
         return [
             "google/gemini-2.5-flash",
             "google/gemini-2.5-pro",
@@ -107,6 +109,8 @@ class OpenRouterProvider(BaseProvider):
         }
         if stream:
             payload["stream"] = True
+            # Ask for token usage in the final chunk
+            payload["usage"] = {"include": True}
         if request.tools:
             payload["tools"] = [
                 {
@@ -131,7 +135,7 @@ class OpenRouterProvider(BaseProvider):
         if resp.status_code != 200:
             body = resp.text
             logger.error("OpenRouter API error %d: %s", resp.status_code, body)
-            raise RuntimeError(
+            raise ProviderError(
                 f"OpenRouter API returned {resp.status_code}: {body}"
             )
 
@@ -172,6 +176,14 @@ class OpenRouterProvider(BaseProvider):
 
         Same SSE format as OpenAI since OpenRouter is API-compatible.
         """
+        async for event in self.stream_events(request):
+            if isinstance(event, str):
+                yield event
+
+    async def stream_events(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[str | Usage]:
+        """Stream text chunks, then the Usage from the final usage chunk."""
         payload = self._build_payload(request, stream=True)
 
         async with self._client.stream(
@@ -179,7 +191,7 @@ class OpenRouterProvider(BaseProvider):
         ) as resp:
             if resp.status_code != 200:
                 body = await resp.aread()
-                raise RuntimeError(
+                raise ProviderError(
                     f"OpenRouter API returned {resp.status_code}: {body.decode()}"
                 )
 
@@ -191,6 +203,16 @@ class OpenRouterProvider(BaseProvider):
                     break
                 try:
                     chunk = json.loads(data_str)
+                    # The usage chunk arrives last, with an empty choices list
+                    usage_data = chunk.get("usage")
+                    if usage_data:
+                        yield Usage(
+                            prompt_tokens=usage_data.get("prompt_tokens", 0),
+                            completion_tokens=usage_data.get("completion_tokens", 0),
+                            total_tokens=usage_data.get("total_tokens", 0),
+                        )
+                    if not chunk.get("choices"):
+                        continue
                     delta = chunk["choices"][0].get("delta", {})
                     content = delta.get("content")
                     if content:
@@ -198,6 +220,24 @@ class OpenRouterProvider(BaseProvider):
                 except (json.JSONDecodeError, KeyError, IndexError):
                     continue
 
+    async def stream_raw(
+        self, request: CompletionRequest
+    ) -> AsyncIterator[memoryview | Usage]:
+        """Relay OpenRouter's SSE frames as received, with usage sniffed (see sse.py)."""
+        payload = self._build_payload(request, stream=True)
+
+        async with self._client.stream(
+            "POST", "/chat/completions", json=payload
+        ) as resp:
+            if resp.status_code != 200:
+                body = await resp.aread()
+                raise ProviderError(
+                    f"OpenRouter API returned {resp.status_code}: {body.decode()}"
+                )
+
+            async for event in relay_frames(resp.aiter_bytes()):
+                yield event
+
     async def health_check(self) -> bool:
         """Verify OpenRouter is reachable by listing models."""
         try:
@@ -205,3 +245,7 @@ class OpenRouterProvider(BaseProvider):
             return resp.status_code == 200
         except Exception:
             return False
+
+    async def aclose(self) -> None:
+        """Close the HTTP client and its connection pool."""
+        await self._client.aclose()
@@ -0,0 +1,253 @@
+"""
+Raw server-sent event relay for OpenAI-compatible streams.
+
+Parsing a stream token by token (decode each line, json.loads it, pull
+out delta.content, re-serialize it for the client) costs CPU on every
+token, even when the client wants the same OpenAI chunk format the
+provider already sends. The raw relay skips all of that: SSEFrameSplitter
+cuts the response body into complete SSE frames as memoryview slices of
+the bytes httpx received, and the gateway writes them to the client
+unchanged.
+
+Usage accounting still needs the token counts, so UsageSniffer scans
+each frame with a precompiled byte regex. Only the usage frame matches,
+and only that frame's integer fields are read; nothing else is decoded.
+
+Streams that need format translation (Anthropic's event format to
+OpenAI chunks) can't be relayed raw. translate_events() builds the
+OpenAI frames for those from fully parsed events instead.
+
+Usage:
+    splitter = SSEFrameSplitter()
+    sniffer = UsageSniffer()
+    async for data in response.aiter_bytes():
+        for frame in splitter.feed(data):
+            usage = sniffer.observe(frame)
+            ...
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import json
+import re
+import time
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing
+
+from .base import Usage
+
+DONE_FRAME = b"data: [DONE]\n\n"
+
+# A frame ends at a blank line; providers send LF, the SSE spec also allows CRLF
+_FRAME_END = re.compile(rb"\r?\n\r?\n")
+# Only the usage frame carries an object here (other chunks have "usage": null
+# or no usage key); `"` can't appear unescaped inside JSON strings, so
+# generated text can't fake it
+_USAGE_OBJECT = re.compile(rb'"usage"\s*:\s*\{')
+_USAGE_FIELD = re.compile(rb'"(prompt_tokens|completion_tokens|total_tokens)"\s*:\s*(\d+)')
+_EMPTY_CHOICES = re.compile(rb'"choices"\s*:\s*\[\s*\]')
+# A chunk's delta text, still JSON-escaped; the role chunk's "" doesn't match
+_DELTA_CONTENT = re.compile(rb'"content"\s*:\s*"((?:[^"\\]|\\.)+)"')
+_DATA_LINE = re.compile(rb"^data:", re.MULTILINE)
+
+
+def is_comment(frame: memoryview) -> bool:
+    """True for a frame of only `:` comment lines (keep-alives, OpenRouter's PROCESSING)."""
+    return frame[:1] == b":" and _DATA_LINE.search(frame) is None
+
+
+def delta_content(frame: memoryview) -> bytes | None:
+    """
+    The frame's delta text as escaped JSON string bytes, or None if it
+    carries no text (role, finish, usage and [DONE] frames).
+
+    Lets a relay time and count only frames with content without
+    parsing them; decode_content() turns the pieces back into text.
+    """
+    match = _DELTA_CONTENT.search(frame)
+    return match.group(1) if match is not None else None
+
+
+def decode_content(pieces: list[bytes]) -> str:
+    """Join delta_content() pieces and decode them to text."""
+    # Escaped JSON strings concatenate into one escaped JSON string
+    return json.loads(b'"' + b"".join(pieces) + b'"')
+
+
+class SSEFrameSplitter:
+    """
+    Split a byte stream into complete SSE frames without copying.
+
+    feed() takes each received chunk and returns the frames it
+    completes, terminator included, as memoryview slices. A frame lying
+    wholly inside one chunk is a view of that chunk's bytes. Only a frame
+    split across chunks is copied, once, into a new bytes object. The
+    views stay valid as long as they're referenced; nothing they point
+    into is ever mutated.
+    """
+
+    __slots__ = ("_partial",)
+
+    def __init__(self) -> None:
+        self._partial = bytearray()
+
+    def feed(self, data: bytes) -> list[memoryview]:
+        frames: list[memoryview] = []
+        start = 0
+        if self._partial:
+            # Finish the frame carried over from earlier chunks. Search
+            # from a few bytes back, in case its terminator is split too.
+            carried = len(self._partial)
+            self._partial += data
+            end = _FRAME_END.search(self._partial, max(0, carried - 3))
+            if end is None:
+                return frames
+            frames.append(memoryview(bytes(self._partial[:end.end()])))
+            start = end.end() - carried
+            self._partial.clear()
+        view = memoryview(data)
+        while (end := _FRAME_END.search(data, start)) is not None:
+            frames.append(view[start:end.end()])
+            start = end.end()
+        if start < len(data):
+            self._partial += view[start:]
+        return frames
+
+    def flush(self) -> memoryview | None:
+        """Whatever followed the last complete frame (None if nothing)."""
+        if not self._partial:
+            return None
+        rest = memoryview(bytes(self._partial))
+        self._partial.clear()
+        return rest
+
+
+class UsageSniffer:
+    """
+    Find token usage in OpenAI-format chunk frames without parsing them.
+
+    observe() returns the Usage from the frame that carries it, else
+    None. `usage_only` tells whether that frame was a pure usage chunk
+    (empty choices), which a relay may drop for clients that didn't ask
+    for usage.
+    """
+
+    __slots__ = ("usage", "usage_only")
+
+    def __init__(self) -> None:
+        self.usage: Usage | None = None
+        self.usage_only = False
+
+    def observe(self, frame: memoryview) -> Usage | None:
+        match = _USAGE_OBJECT.search(frame)
+        if match is None:
+            return None
+        fields = {
+            name.decode(): int(value)
+            for name, value in _USAGE_FIELD.findall(frame, match.end())
+        }
+        prompt_tokens = fields.get("prompt_tokens", 0)
+        completion_tokens = fields.get("completion_tokens", 0)
+        self.usage = Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=fields.get("total_tokens", prompt_tokens + completion_tokens),
+        )
+        self.usage_only = _EMPTY_CHOICES.search(frame) is not None
+        return self.usage
+
+
+async def relay_frames(chunks: AsyncIterator[bytes]) -> AsyncIterator[memoryview | Usage]:
+    """
+    Relay an OpenAI-format SSE body frame by frame, usage sniffed.
+
+    Yields every frame as received, up to and including `data: [DONE]`.
+    Comment frames are dropped. A pure usage frame is replaced by its
+    Usage; a content frame that also carries usage is yielded first and
+    followed by its Usage.
+    """
+    splitter = SSEFrameSplitter()
+    sniffer = UsageSniffer()
+    async for data in chunks:
+        for frame in splitter.feed(data):
+            if is_comment(frame):
+                continue
+            usage = sniffer.observe(frame)
+            if usage is None:
+                yield frame
+                continue
+            if not sniffer.usage_only:
+                yield frame
+            yield usage
+    rest = splitter.flush()
+    if rest is not None and bytes(rest).strip() and not is_comment(rest):
+        # A last frame without its blank line: terminate it for the client
+        yield memoryview(bytes(rest).rstrip(b"\r\n") + b"\n\n")
+
+
+def encode_chunk(
+    completion_id: str,
+    created: int,
+    model: str,
+    delta: dict,
+    finish_reason: str | None = None,
+) -> memoryview:
+    """One OpenAI chat.completion.chunk frame."""
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return memoryview(b"data: " + json.dumps(payload).encode() + b"\n\n")
+
+
+def encode_usage_chunk(completion_id: str, created: int, model: str, usage: Usage) -> memoryview:
+    """The final usage chunk, as OpenAI sends it with stream_options.include_usage."""
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [],
+        "usage": {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+        },
+    }
+    return memoryview(b"data: " + json.dumps(payload).encode() + b"\n\n")
+
+
+async def translate_events(
+    events: AsyncGenerator[str | Usage, None], model: str
+) -> AsyncIterator[memoryview | Usage]:
+    """
+    Re-encode parsed text/Usage events as OpenAI chunk frames.
+
+    The fallback for providers whose wire format isn't OpenAI's: the same
+    sequence a raw relay yields (role, content, finish, Usage, [DONE]).
+    The role frame waits for the provider's first event, so it isn't
+    sent before the provider has answered.
+    """
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    role_sent = False
+    usage: Usage | None = None
+    async with aclosing(events):
+        async for event in events:
+            if not role_sent:
+                role_sent = True
+                yield encode_chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+            if isinstance(event, Usage):
+                usage = event
+                continue
+            yield encode_chunk(completion_id, created, model, {"content": event})
+    if not role_sent:
+        yield encode_chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+    yield encode_chunk(completion_id, created, model, {}, "stop")
+    if usage is not None:
+        yield usage
+    yield memoryview(DONE_FRAME)
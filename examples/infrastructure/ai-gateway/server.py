@@ -0,0 +1,582 @@
+"""
+HTTP server for the AI Gateway.
+
+Exposes AIGateway over an OpenAI-compatible HTTP API:
+
+    POST /v1/chat/completions   completion, or SSE stream with "stream": true
+    GET  /v1/usage              caller's cost summary and rate-limit usage
+    GET  /health                provider health and circuit state
+
+The API is a plain ASGI app (GatewayApp), so any ASGI server can host
+it. This module also ships a small stdlib HTTP/1.1 server with a
+pre-fork process model: the parent binds the socket, creates the
+shared-memory rate-limit and cost tables, and forks N workers that each
+run their own event loop and gateway. Limits and spend totals stay
+correct across workers without Redis.
+
+    python server.py --workers 4
+    python server.py --workers 4 --fake-provider   # no API keys needed
+
+Reference: Chapter 4 - The AI Tool Gateway Pattern
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
+from functools import partial
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import unquote
+
+import httpx
+
+from gateway import AIGateway, load_config
+from middleware.admission import QueueFull, QueueTimeout
+from middleware.auth import AuthenticationError, AuthorizationError
+from middleware.cost_tracker import CostTracker
+from middleware.pricing import PricingTable
+from middleware.rate_limit import RateLimitExceeded
+from middleware.shared_memory import SharedCostTable, SharedMemoryBackend
+from providers.base import Message, MessageRole, ProviderError, ToolCall, Usage
+from providers.circuit_breaker import CircuitOpenError
+from providers.fake import FakeProvider
+from providers.sse import DONE_FRAME, encode_usage_chunk
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Failures of the provider call itself (502); anything else is ours (500)
+UPSTREAM_ERRORS = (ProviderError, CircuitOpenError, httpx.HTTPError, TimeoutError)
+
+
+# ---------------------------------------------------------------------------
+# ASGI application
+# ---------------------------------------------------------------------------
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: list | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or []
+
+
+def _parse_messages(raw: Any) -> list[Message]:
+    if not isinstance(raw, list) or not raw:
+        raise HTTPError(400, "messages must be a non-empty list")
+    messages = []
+    for item in raw:
+        try:
+            tool_calls = [
+                ToolCall(id=c["id"], name=c["function"]["name"], arguments=c["function"]["arguments"])
+                for c in item.get("tool_calls") or []
+            ]
+            messages.append(Message(
+                role=MessageRole(item["role"]),
+                content=item.get("content") or "",
+                tool_calls=tool_calls or None,
+                tool_call_id=item.get("tool_call_id"),
+            ))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise HTTPError(400, f"Invalid message: {exc}") from exc
+    return messages
+
+
+class GatewayApp:
+    """
+    ASGI app wrapping one AIGateway.
+
+    The gateway is built in the lifespan startup event --- after the
+    server has forked --- so each worker gets its own event loop, HTTP
+    clients and background tasks.
+
+    Usage:
+        app = GatewayApp(lambda: AIGateway("config.yaml"))
+    """
+
+    def __init__(self, gateway_factory: Callable[[], AIGateway] = AIGateway) -> None:
+        self._factory = gateway_factory
+        self._gateway: AIGateway | None = None
+
+    async def _get_gateway(self) -> AIGateway:
+        if self._gateway is None:
+            self._gateway = self._factory()
+            await self._gateway.start()
+        return self._gateway
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self._get_gateway()
+                except Exception as exc:
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._gateway is not None:
+                    await self._gateway.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        route = (scope["method"], scope["path"])
+        try:
+            gateway = await self._get_gateway()
+            if route == ("POST", "/v1/chat/completions"):
+                body = await self._read_body(receive)
+                await self._chat_completions(gateway, authorization, body, send)
+            elif route == ("GET", "/v1/usage"):
+                ctx = await gateway.authenticate(authorization)
+                await self._json(send, 200, {
+                    "cost": gateway.get_cost_summary(ctx.api_key_id),
+                    "rate_limit": await gateway.get_rate_limit_status(ctx.api_key_id, ctx.tier),
+                })
+            elif route == ("GET", "/health"):
+                await self._json(send, 200, await gateway.health())
+            elif scope["path"] in ("/v1/chat/completions", "/v1/usage", "/health"):
+                raise HTTPError(405, "Method not allowed")
+            else:
+                raise HTTPError(404, "Not found")
+        except HTTPError as exc:
+            await self._error(send, exc.status, str(exc), exc.headers)
+        except AuthenticationError as exc:
+            await self._error(send, 401, str(exc))
+        except AuthorizationError as exc:
+            await self._error(send, 403, str(exc))
+        except (QueueFull, QueueTimeout) as exc:
+            # The gateway is at capacity, not the key over its quota
+            retry_after = str(max(1, round(exc.retry_after_seconds)))
+            await self._error(send, 503, str(exc), [(b"retry-after", retry_after.encode())])
+        except RateLimitExceeded as exc:
+            retry_after = str(max(1, round(exc.retry_after_seconds)))
+            await self._error(send, 429, str(exc), [(b"retry-after", retry_after.encode())])
+        except UPSTREAM_ERRORS as exc:
+            await self._error(send, 502, f"Upstream error: {exc}")
+        except Exception:
+            traceback.print_exc()
+            await self._error(send, 500, "Internal server error")
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> dict:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        try:
+            body = json.loads(b"".join(chunks) or b"{}")
+        except json.JSONDecodeError as exc:
+            raise HTTPError(400, f"Invalid JSON: {exc}") from exc
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def _chat_completions(
+        self, gateway: AIGateway, authorization: str, body: dict, send: Send
+    ) -> None:
+        kwargs = {
+            "authorization": authorization,
+            "messages": _parse_messages(body.get("messages")),
+            "model": body.get("model"),
+            "temperature": body.get("temperature", 0.7),
+            "max_tokens": body.get("max_tokens", 1024),
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            response = await gateway.complete(**kwargs)
+            message: dict[str, Any] = {"role": "assistant", "content": response.content}
+            if response.tool_calls:
+                message["tool_calls"] = [
+                    {"id": c.id, "type": "function", "function": {"name": c.name, "arguments": c.arguments}}
+                    for c in response.tool_calls
+                ]
+            await self._json(send, 200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": response.model,
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if response.tool_calls else "stop",
+                }],
+                "usage": asdict(response.usage),
+                "gateway": {
+                    "provider": response.provider,
+                    "latency_ms": response.latency_ms,
+                    **response.metadata,
+                },
+            })
+            return
+
+        model = kwargs["model"] or gateway.config.default_model
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        # Raw mode: provider SSE frames are written through unparsed
+        frames = gateway.stream(**kwargs, raw=True)
+        try:
+            # Auth and rate-limit errors surface on the first frame, while
+            # a plain JSON error response is still possible
+            try:
+                first = await frames.__anext__()
+            except StopAsyncIteration:
+                first = None
+
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                ],
+            })
+            # An empty upstream body still gets a well-formed end
+            tail = b"" if first is not None else DONE_FRAME
+            try:
+                if first is not None:
+                    await self._send_frame(send, first, completion_id, created, model, include_usage)
+                    async for frame in frames:
+                        await self._send_frame(send, frame, completion_id, created, model, include_usage)
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as exc:
+                # Headers are already sent: report the failure in-band
+                if isinstance(exc, UPSTREAM_ERRORS):
+                    error = {"error": {"message": f"Upstream error: {exc}", "code": 502}}
+                else:
+                    traceback.print_exc()
+                    error = {"error": {"message": "Internal server error", "code": 500}}
+                tail = b"data: " + json.dumps(error).encode() + b"\n\n" + DONE_FRAME
+            # On success the provider's own [DONE] frame has been relayed
+            await send({"type": "http.response.body", "body": tail, "more_body": False})
+        finally:
+            await frames.aclose()
+
+    @staticmethod
+    async def _send_frame(
+        send: Send,
+        frame: memoryview | Usage,
+        completion_id: str,
+        created: int,
+        model: str,
+        include_usage: bool,
+    ) -> None:
+        if isinstance(frame, Usage):
+            # Sent only to clients that asked, as OpenAI does
+            if not include_usage:
+                return
+            frame = encode_usage_chunk(completion_id, created, model, frame)
+        await send({"type": "http.response.body", "body": frame, "more_body": True})
+
+    @staticmethod
+    async def _json(send: Send, status: int, payload: Any, headers: list | None = None) -> None:
+        body = json.dumps(payload, default=str).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")] + (headers or []),
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _error(self, send: Send, status: int, message: str, headers: list | None = None) -> None:
+        await self._json(send, status, {"error": {"message": message, "code": status}}, headers)
+
+
+# ---------------------------------------------------------------------------
+# Minimal HTTP/1.1 server for ASGI apps
+# ---------------------------------------------------------------------------
+
+class _ResponseWriter:
+    """Frames ASGI send() messages as HTTP/1.1 (Content-Length or chunked)."""
+
+    def __init__(self, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        self._writer = writer
+        self.keep_alive = keep_alive
+        self._status = 500
+        self._headers: list[tuple[bytes, bytes]] = []
+        self._started = False
+        self._chunked = False
+        self.finished = False
+
+    def _head(self, extra: list[tuple[bytes, bytes]]) -> bytes:
+        try:
+            reason = HTTPStatus(self._status).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {self._status} {reason}".encode()]
+        lines += [name + b": " + value for name, value in self._headers + extra]
+        lines.append(b"connection: keep-alive" if self.keep_alive else b"connection: close")
+        return b"\r\n".join(lines) + b"\r\n\r\n"
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self._status = message["status"]
+            self._headers = [(bytes(k).lower(), bytes(v)) for k, v in message.get("headers", [])]
+            return
+        if message["type"] != "http.response.body" or self.finished:
+            return
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        # Pieces go to the transport as-is: a memoryview body (relayed SSE
+        # frames) isn't copied into an intermediate buffer first
+        out: list[bytes | memoryview] = []
+        if not self._started:
+            self._started = True
+            has_length = any(name == b"content-length" for name, _ in self._headers)
+            if more and not has_length:
+                self._chunked = True
+                out.append(self._head([(b"transfer-encoding", b"chunked")]))
+            else:
+                extra = [] if has_length else [(b"content-length", str(len(body)).encode())]
+                out.append(self._head(extra))
+        if self._chunked:
+            if body:
+                out += (b"%x\r\n" % len(body), body, b"\r\n")
+            if not more:
+                out.append(b"0\r\n\r\n")
+        elif body:
+            out.append(body)
+        self._writer.writelines(out)
+        if not more:
+            self.finished = True
+        await self._writer.drain()
+
+
+async def _handle_connection(
+    app: ASGIApp, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    peer = writer.get_extra_info("peername")
+    local = writer.get_extra_info("sockname")
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except asyncio.LimitOverrunError:
+                writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+
+            request_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+            try:
+                method, target, version = request_line.split(" ", 2)
+            except ValueError:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            headers = []
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            header_map = dict(headers)
+
+            length = int(header_map.get(b"content-length", b"0") or 0)
+            if length > MAX_BODY_BYTES or b"transfer-encoding" in header_map:
+                # Chunked request bodies aren't supported; clients send Content-Length
+                writer.write(b"HTTP/1.1 413 Payload Too Large\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            body = await reader.readexactly(length) if length else b""
+
+            connection = header_map.get(b"connection", b"").lower()
+            keep_alive = connection != b"close" if version == "HTTP/1.1" else connection == b"keep-alive"
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": version.removeprefix("HTTP/"),
+                "method": method.upper(),
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": peer[:2] if peer else None,
+                "server": local[:2] if local else None,
+            }
+
+            body_sent = False
+
+            async def receive() -> dict:
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                # Nothing more will arrive for this request; park until cancelled
+                await asyncio.Future()
+
+            response = _ResponseWriter(writer, keep_alive)
+            try:
+                await app(scope, receive, response.send)
+            except Exception:
+                traceback.print_exc()
+                if not response.finished:
+                    response.keep_alive = False
+                    await response.send({"type": "http.response.start", "status": 500, "headers": []})
+                    await response.send({"type": "http.response.body", "body": b""})
+            if not response.keep_alive or not response.finished:
+                return
+    except ConnectionError:
+        return
+    finally:
+        writer.close()
+
+
+class _Lifespan:
+    """Drive an ASGI app's lifespan protocol from the server side."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self._app = app
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    async def startup(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}}
+        self._task = asyncio.ensure_future(self._app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "lifespan.startup"})
+        message = await self._from_app.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Startup failed: {message.get('message', '')}")
+
+    async def shutdown(self) -> None:
+        await self._to_app.put({"type": "lifespan.shutdown"})
+        await self._from_app.get()
+        await self._task
+
+
+async def _run_worker(app_factory: Callable[[], ASGIApp], sock: socket.socket) -> None:
+    app = app_factory()
+    lifespan = _Lifespan(app)
+    await lifespan.startup()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = await asyncio.start_server(
+        partial(_handle_connection, app), sock=sock, limit=MAX_HEADER_BYTES
+    )
+    async with server:
+        await stop.wait()
+    await lifespan.shutdown()
+
+
+def serve(
+    app_factory: Callable[[], ASGIApp],
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = 1,
+) -> None:
+    """
+    Serve an ASGI app with `workers` pre-forked processes.
+
+    The listening socket is bound once in the parent and inherited, so
+    every worker accepts from the same queue. app_factory runs in each
+    worker after the fork. Blocks until the workers exit (SIGINT/SIGTERM
+    to the parent is forwarded to them).
+    """
+    sock = socket.create_server((host, port), backlog=2048)
+    if workers <= 1:
+        try:
+            asyncio.run(_run_worker(app_factory, sock))
+        finally:
+            sock.close()
+        return
+
+    children: list[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                asyncio.run(_run_worker(app_factory, sock))
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+    sock.close()
+
+    def forward(signum: int, frame: Any) -> None:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI Gateway HTTP server")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--host", help="default: gateway.host from config")
+    parser.add_argument("--port", type=int, help="default: gateway.port from config")
+    parser.add_argument("--workers", type=int, help="default: gateway.workers from config")
+    parser.add_argument("--fake-provider", action="store_true",
+                        help="serve every model from an in-process FakeProvider")
+    parser.add_argument("--fake-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    host = args.host or config.host
+    port = args.port or config.port
+    workers = args.workers or config.workers
+
+    # Shared counters must exist before the fork so workers inherit them
+    limits = costs = None
+    if workers > 1:
+        limits = SharedMemoryBackend()
+        costs = SharedCostTable(capacity=config.shared_cost_rows)
+
+    def gateway_factory() -> AIGateway:
+        providers = None
+        if args.fake_provider:
+            providers = {"fake": FakeProvider(latency_ms=args.fake_latency_ms)}
+        return AIGateway(
+            args.config,
+            rate_limit_backend=limits,
+            cost_tracker=CostTracker(shared=costs, pricing=PricingTable(config.pricing)),
+            providers=providers,
+        )
+
+    print(f"AI Gateway listening on http://{host}:{port} ({workers} worker(s))", file=sys.stderr)
+    try:
+        serve(lambda: GatewayApp(gateway_factory), host, port, workers)
+    finally:
+        if limits is not None:
+            limits.table.unlink()
+            costs.table.unlink()
+
+
+if __name__ == "__main__":
+    main()
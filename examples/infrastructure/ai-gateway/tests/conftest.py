@@ -0,0 +1,6 @@
+"""Shared test setup: import the gateway's modules the way gateway.py does."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,43 @@
+"""Tests for middleware/cost_ledger.py: rows that arrive out of order."""
+
+from middleware.cost_ledger import SECONDS_PER_DAY, CostLedger
+
+DAY = 20_000 * SECONDS_PER_DAY  # any fixed UTC midnight
+
+
+def _fill(ledger: CostLedger) -> None:
+    ledger.append("key-a", "gpt-4o-mini", 10, 5, 1.0, timestamp=DAY + 100)
+    ledger.append("key-a", "gpt-4o-mini", 10, 5, 2.0, timestamp=DAY + 300)
+    # Clock stepped back: older than the last row appended
+    ledger.append("key-b", "gpt-4o-mini", 10, 5, 4.0, timestamp=DAY + 200)
+    # Back-fill into the previous day, after today's rows
+    ledger.append("key-b", "claude-sonnet", 10, 5, 8.0, timestamp=DAY - 50)
+
+
+def test_range_queries_include_out_of_order_rows():
+    ledger = CostLedger()
+    _fill(ledger)
+
+    assert len(ledger) == 4
+    assert ledger.sum().cost == 15.0
+    assert ledger.sum(start=DAY + 150, end=DAY + 250).cost == 4.0
+    assert ledger.sum(start=DAY + 150).cost == 6.0
+    assert ledger.sum(end=DAY).cost == 8.0
+    assert ledger.sum(key_id="key-b", start=DAY).cost == 4.0
+    by_key = ledger.sum_by("key", start=DAY - 100, end=DAY + 250)
+    assert {key: totals.cost for key, totals in by_key.items()} == {"key-a": 1.0, "key-b": 12.0}
+
+
+def test_out_of_order_rows_survive_a_reload(tmp_path):
+    ledger = CostLedger(directory=str(tmp_path))
+    _fill(ledger)
+    ledger.close()
+
+    reloaded = CostLedger(directory=str(tmp_path))
+    assert len(reloaded) == 4
+    assert reloaded.sum(start=DAY + 150, end=DAY + 250).cost == 4.0
+    assert reloaded.sum(model="claude-sonnet").cost == 8.0
+    # A row that is late relative to the reloaded data still lands in order
+    reloaded.append("key-a", "gpt-4o-mini", 10, 5, 16.0, timestamp=DAY + 150)
+    assert reloaded.sum(start=DAY + 120, end=DAY + 250).cost == 20.0
+    reloaded.close()
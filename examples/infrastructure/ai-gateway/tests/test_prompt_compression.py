@@ -0,0 +1,55 @@
+"""Tests for middleware/prompt_compression.py."""
+
+from middleware.prompt_compression import CompressionPolicy, PromptCompressor
+from providers.base import Message, MessageRole, ToolCall
+
+
+def test_collapse_with_fewer_turns_than_keep_last_turns():
+    # 2 user turns, default keep_first_turns=1 / keep_last_turns=4, over 16k tokens
+    messages = [
+        Message(MessageRole.USER, "Analyze this. " + "word " * 20_000),
+        Message(MessageRole.ASSISTANT, "Done. " + "word " * 20_000),
+        Message(MessageRole.USER, "Now summarize it."),
+    ]
+    result = PromptCompressor().compress(messages, CompressionPolicy())
+    assert "summarize" not in result.strategies
+    assert [m.content for m in result.messages] == [m.content for m in messages]
+
+
+def test_truncates_stale_tool_outputs_within_one_user_turn():
+    # Agent loop: one user turn, then many tool-call rounds
+    messages = [Message(MessageRole.USER, "Audit the repository.")]
+    for i in range(10):
+        messages.append(Message(
+            MessageRole.ASSISTANT, "",
+            tool_calls=[ToolCall(id=f"call-{i}", name="read_file", arguments="{}")],
+        ))
+        messages.append(Message(MessageRole.TOOL, f"file {i}\n" + "x" * 20_000, tool_call_id=f"call-{i}"))
+
+    result = PromptCompressor().compress(messages, CompressionPolicy(summarize=False))
+
+    assert "truncate" in result.strategies
+    outputs = [m.content for m in result.messages if m.role == MessageRole.TOOL]
+    assert all("truncated" in content for content in outputs[:-2])
+    assert outputs[-2:] == [m.content for m in messages if m.role == MessageRole.TOOL][-2:]
+
+
+def test_summary_is_a_system_message_and_middle_system_messages_stay_put():
+    messages = [Message(MessageRole.SYSTEM, "You are terse.")]
+    for i in range(8):
+        messages.append(Message(MessageRole.USER, f"Question {i}. " + "word " * 4_000))
+        messages.append(Message(MessageRole.ASSISTANT, f"Answer {i}."))
+        if i == 2:
+            messages.append(Message(MessageRole.SYSTEM, "From now on, answer in French."))
+
+    result = PromptCompressor().compress(messages, CompressionPolicy(dedupe=False))
+
+    assert "summarize" in result.strategies
+    roles = [m.role for m in result.messages]
+    # keep_first_turns=1: system, then the first turn, then the summary
+    assert roles[:4] == [MessageRole.SYSTEM, MessageRole.USER, MessageRole.ASSISTANT, MessageRole.SYSTEM]
+    assert result.messages[3].content.startswith("[Summary of ")
+    # The mid-conversation instruction follows the summary of what preceded it
+    assert result.messages[4].content == "From now on, answer in French."
+    assert result.messages[5].role == MessageRole.USER
+    assert all(a != MessageRole.USER or b != MessageRole.USER for a, b in zip(roles, roles[1:]))
@@ -0,0 +1,62 @@
+"""Tests for middleware/rate_limit.py: token reservations."""
+
+import asyncio
+
+import pytest
+
+from middleware.rate_limit import (
+    SLIDING_COUNTER,
+    SLIDING_LOG,
+    RateLimitConfig,
+    RateLimiter,
+    RateLimitExceeded,
+)
+
+LIMITS = {"free": RateLimitConfig(requests_per_minute=5, tokens_per_minute=1000)}
+
+
+@pytest.fixture(params=[SLIDING_LOG, SLIDING_COUNTER])
+def limiter(request):
+    return RateLimiter(tier_limits=LIMITS, mode=request.param)
+
+
+def test_reservation_holds_tokens_until_commit(limiter):
+    async def run():
+        reservation = await limiter.reserve("key", tokens=800)
+        assert (await limiter.aget_usage("key"))["tokens_used"] == 800
+        # The held tokens count against the next reservation
+        with pytest.raises(RateLimitExceeded, match="Token limit"):
+            await limiter.reserve("key", tokens=300)
+
+        await limiter.commit(reservation, actual_tokens=100)
+        assert (await limiter.aget_usage("key"))["tokens_used"] == 100
+        await limiter.reserve("key", tokens=300)
+
+    asyncio.run(run())
+
+
+def test_refund_releases_tokens_but_keeps_the_request(limiter):
+    async def run():
+        reservation = await limiter.reserve("key", tokens=600)
+        await limiter.refund(reservation)
+        # Settling twice is a no-op, not a second adjustment
+        await limiter.commit(reservation, actual_tokens=600)
+
+        usage = await limiter.aget_usage("key")
+        assert usage["tokens_used"] == 0
+        assert usage["requests_used"] == 1
+
+    asyncio.run(run())
+
+
+def test_request_limit_applies_to_reservations(limiter):
+    async def run():
+        for _ in range(5):
+            await limiter.reserve("key", tokens=10)
+        with pytest.raises(RateLimitExceeded, match="requests/min") as exc_info:
+            await limiter.reserve("key", tokens=10)
+        assert exc_info.value.retry_after_seconds > 0
+        # Other keys have their own window
+        await limiter.reserve("other", tokens=10)
+
+    asyncio.run(run())
@@ -0,0 +1,28 @@
+"""Tests for middleware/semantic_cache.py: what separates cache namespaces."""
+
+from middleware.semantic_cache import SemanticCache
+from providers.base import CompletionRequest, Message, MessageRole, ToolCall
+
+
+def _request(arguments: str, call_id: str = "call-1") -> CompletionRequest:
+    return CompletionRequest(
+        model="gpt-4o-mini",
+        messages=[
+            Message(MessageRole.USER, "What's the weather?"),
+            Message(MessageRole.ASSISTANT, "", tool_calls=[
+                ToolCall(id=call_id, name="get_weather", arguments=arguments),
+            ]),
+            Message(MessageRole.TOOL, "Sunny, 24C", tool_call_id=call_id),
+            Message(MessageRole.USER, "So what should I wear?"),
+        ],
+    )
+
+
+def test_tool_calls_are_part_of_the_context():
+    oslo, _ = SemanticCache.split_request(_request('{"city": "Oslo"}'))
+    rome, _ = SemanticCache.split_request(_request('{"city": "Rome"}'))
+    other_call, _ = SemanticCache.split_request(_request('{"city": "Oslo"}', call_id="call-2"))
+
+    assert oslo == SemanticCache.split_request(_request('{"city": "Oslo"}'))[0]
+    assert oslo != rome
+    assert oslo != other_call
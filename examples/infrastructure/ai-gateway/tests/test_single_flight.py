@@ -0,0 +1,88 @@
+"""Tests for middleware/single_flight.py: cancellation of shared calls."""
+
+import asyncio
+from contextlib import aclosing
+
+from middleware.single_flight import SingleFlight
+
+
+def test_cancelling_one_caller_leaves_the_shared_call_running():
+    async def run():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        started = 0
+
+        async def call():
+            nonlocal started
+            started += 1
+            await release.wait()
+            return "response"
+
+        leader = asyncio.create_task(flight.do("k", call))
+        follower = asyncio.create_task(flight.do("k", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == ("response", True)
+        assert leader.cancelled()
+        assert started == 1
+
+    asyncio.run(run())
+
+
+def test_cancelling_the_last_caller_cancels_the_call():
+    async def run():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def call():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.create_task(flight.do("k", call))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.stats()["in_flight"] == 0
+
+        # The key was unlisted, so the next caller starts a fresh call
+        async def fresh():
+            return "fresh"
+
+        assert await flight.do("k", fresh) == ("fresh", False)
+
+    asyncio.run(run())
+
+
+def test_last_stream_subscriber_leaving_stops_the_producer():
+    async def run():
+        flight = SingleFlight()
+        closed = asyncio.Event()
+
+        async def events():
+            try:
+                for i in range(1000):
+                    yield i
+                    await asyncio.sleep(0.001)
+            finally:
+                closed.set()
+
+        first = flight.stream("k", events)
+        second = flight.stream("k", events)
+        assert (first.coalesced, second.coalesced) == (False, True)
+
+        async with aclosing(first.__aiter__()) as a, aclosing(second.__aiter__()) as b:
+            assert await anext(a) == 0
+            assert await anext(b) == 0  # late joiners replay from the start
+            await a.aclose()
+            assert not closed.is_set()  # one subscriber is still reading
+            assert await anext(b) == 1
+        await asyncio.wait_for(closed.wait(), 1)
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(run())
@@ -16,6 +16,7 @@ Usage:
 from shared.llm_base import (
     ChatMessage,
     ChatResponse,
+    HTTPPoolConfig,
     LLMProvider,
     MessageRole,
     StreamChunk,
@@ -29,11 +30,12 @@ from shared.llm_exceptions import (
     LLMRateLimitException,
     LLMTimeoutException,
 )
-from shared.llm_factory import get_provider
+from shared.llm_factory import close_pooled_clients, get_provider
 
 __all__ = [
     'ChatMessage',
     'ChatResponse',
+    'HTTPPoolConfig',
     'LLMProvider',
     'MessageRole',
     'StreamChunk',
@@ -44,5 +46,6 @@ __all__ = [
     'LLMAuthException',
     'LLMRateLimitException',
     'LLMTimeoutException',
+    'close_pooled_clients',
     'get_provider',
 ]
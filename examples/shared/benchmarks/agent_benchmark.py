@@ -0,0 +1,337 @@
+"""Benchmark: the gateway and agent patterns against the fake LLM server.
+
+Starts shared.fake_llm_server in-process, points every provider at it
+through the *_BASE_URL environment variables, and drives each target
+with a fixed number of operations at a given concurrency:
+
+    gateway            AIGateway.complete() (auth, rate limit, routing, cost)
+    gateway-stream     AIGateway.stream(), time to first chunk and total
+    gateway-raw        AIGateway.stream(raw=True), SSE frames relayed unparsed
+    chat-agent         ChatAgent.chat() turns, including tool rounds
+    agent-hub          AgentHub.handle_request() (router model + specialist)
+    streaming-chat     StreamingChatAgent.stream_with_tools()
+
+Prints throughput and p50/p95/p99 latency per target, plus what the
+fake server saw (upstream calls, tool calls, injected errors). Nothing
+leaves the machine and no API key is needed.
+
+Run from the examples/ directory:
+    python -m shared.benchmarks.agent_benchmark --requests 200 --concurrency 20
+    python -m shared.benchmarks.agent_benchmark --error-429 0.05 --tool-call-rate 0.3
+
+Related: Chapter 4 (Infrastructure) — Provider Abstraction Pattern
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import yaml
+
+from shared.fake_llm_server import FakeLLMConfig, FakeLLMServer
+from shared.llm_factory import close_pooled_clients, get_provider
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent.parent
+GATEWAY_DIR = EXAMPLES_DIR / 'infrastructure' / 'ai-gateway'
+PATTERNS_DIR = EXAMPLES_DIR / 'agent-patterns'
+
+TARGETS = ('gateway', 'gateway-stream', 'gateway-raw', 'chat-agent', 'agent-hub', 'streaming-chat')
+
+# Top-level module names the examples share (every agent has a config.py)
+_EXAMPLE_MODULES = {
+    'agent', 'agents', 'config', 'gateway', 'hub', 'middleware', 'prompts',
+    'providers', 'router', 'streaming_chat', 'tools',
+}
+
+# An operation returns (succeeded, seconds to first streamed token or None)
+Operation = Callable[[int], Awaitable[tuple[bool, float | None]]]
+
+
+def _load(directory: Path, module: str):
+    """Import an example's script module from its own directory."""
+    for name in list(sys.modules):
+        if name.split('.')[0] in _EXAMPLE_MODULES:
+            del sys.modules[name]
+    sys.path.insert(0, str(directory))
+    return importlib.import_module(module)
+
+
+def _route_reply(body: dict) -> str | None:
+    """Answer AgentHub's router with the JSON it parses."""
+    system = (body.get('messages') or [{}])[0].get('content') or ''
+    if isinstance(system, str) and system.startswith('You are a request router'):
+        return json.dumps({
+            'agent': random.choice(['research', 'writer', 'analyst']),
+            'confidence': 0.9,
+            'reasoning': 'benchmark',
+        })
+    return None
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float('nan')
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ---------------------------------------------------------------------------
+# Targets: each returns one Operation per concurrent worker
+# ---------------------------------------------------------------------------
+
+def _gateway_config(path: str) -> None:
+    """config.yaml with caches, coalescing and request logs off, limits lifted.
+
+    Every request is unique anyway; this keeps the numbers about the
+    provider path rather than cache hits or stdout.
+    """
+    with open(GATEWAY_DIR / 'config.yaml') as f:
+        config = yaml.safe_load(f)
+    config['rate_limits']['tiers']['enterprise'] = {
+        'requests_per_minute': 10**9,
+        'tokens_per_minute': 10**12,
+    }
+    middleware = config['middleware']
+    for section in ('response_cache', 'semantic_cache', 'coalescing'):
+        middleware[section]['enabled'] = False
+    middleware['logger']['level'] = 'WARNING'
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+
+
+async def _gateway_workers(
+    concurrency: int, stream: bool, config_path: str, raw: bool = False
+) -> tuple[list[Operation], Callable[[], Awaitable[None]]]:
+    gateway_module = _load(GATEWAY_DIR, 'gateway')
+    base = importlib.import_module('providers.base')
+    sse = importlib.import_module('providers.sse')
+    gateway = gateway_module.AIGateway(config_path)
+
+    async def op(i: int) -> tuple[bool, float | None]:
+        messages = [base.Message(role=base.MessageRole.USER, content=f'Benchmark request {i}')]
+        if not stream:
+            await gateway.complete('Bearer sk-demo-enterprise-001', messages, max_tokens=256)
+            return True, None
+        start = time.perf_counter()
+        first = None
+        chunks = gateway.stream('Bearer sk-demo-enterprise-001', messages, max_tokens=256, raw=raw)
+        async for chunk in chunks:
+            # Raw frames: the first with delta text, not the role frame
+            if first is None and (not raw or (
+                isinstance(chunk, memoryview) and sse.delta_content(chunk) is not None
+            )):
+                first = time.perf_counter() - start
+        return True, first
+
+    return [op] * concurrency, gateway.close
+
+
+async def _chat_agent_workers(
+    concurrency: int, model: str
+) -> tuple[list[Operation], Callable[[], Awaitable[None]]]:
+    agent_module = _load(PATTERNS_DIR / 'chat-agent', 'agent')
+    config_module = importlib.import_module('config')
+
+    def worker() -> Operation:
+        # One conversation per worker, so history grows as a real chat's does
+        agent = agent_module.ChatAgent(config_module.ChatAgentConfig(
+            provider_name='openrouter', api_key='sk-fake', model=model,
+        ))
+
+        async def op(i: int) -> tuple[bool, float | None]:
+            await agent.chat(f'Benchmark question {i}: look something up for me')
+            return True, None
+
+        return op
+
+    return [worker() for _ in range(concurrency)], close_pooled_clients
+
+
+async def _agent_hub_workers(
+    concurrency: int, model: str
+) -> tuple[list[Operation], Callable[[], Awaitable[None]]]:
+    hub_module = _load(PATTERNS_DIR / 'agent-hub', 'hub')
+    config_module = importlib.import_module('config')
+    hub = hub_module.AgentHub(config_module.AgentHubConfig(
+        api_key='sk-fake', router_model=model, agent_model=model, rate_limit=10**9,
+    ))
+
+    async def op(i: int) -> tuple[bool, float | None]:
+        reply = await hub.handle_request(f'Benchmark task {i}: summarize the report')
+        return not reply.startswith('[Hub]'), None
+
+    return [op] * concurrency, close_pooled_clients
+
+
+async def _streaming_chat_workers(
+    concurrency: int, model: str
+) -> tuple[list[Operation], Callable[[], Awaitable[None]]]:
+    streaming_module = _load(PATTERNS_DIR / 'streaming-chat', 'streaming_chat')
+    agent = streaming_module.StreamingChatAgent(
+        provider=get_provider('openrouter', api_key='sk-fake', model=model)
+    )
+
+    async def op(i: int) -> tuple[bool, float | None]:
+        start = time.perf_counter()
+        first = None
+        ok = True
+        async for event in agent.stream_with_tools(f'Benchmark prompt {i}'):
+            if event.event_type == 'content' and first is None:
+                first = time.perf_counter() - start
+            elif event.event_type == 'error':
+                ok = False
+        return ok, first
+
+    return [op] * concurrency, close_pooled_clients
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+async def _drive(workers: list[Operation], requests: int) -> dict:
+    latencies: list[float] = []
+    first_tokens: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker(op: Operation) -> None:
+        nonlocal next_index, errors
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                ok, first = await op(i)
+            except Exception:
+                ok, first = False, None
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if first is not None:
+                first_tokens.append(first)
+
+    start = time.perf_counter()
+    # Agents print progress; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(worker(op) for op in workers))
+    elapsed = time.perf_counter() - start
+    return {
+        'ops': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / elapsed,
+        'p50': _percentile(latencies, 50) * 1000,
+        'p95': _percentile(latencies, 95) * 1000,
+        'p99': _percentile(latencies, 99) * 1000,
+        'ttft': _percentile(first_tokens, 50) * 1000 if first_tokens else None,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = FakeLLMServer(FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        tool_call_rate=args.tool_call_rate,
+        rate_limit_rate=args.error_429,
+        server_error_rate=args.error_5xx,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed,
+        reply=_route_reply,
+    ))
+    await server.start()
+    os.environ.update({
+        'OPENROUTER_API_KEY': 'sk-fake',
+        'OPENROUTER_BASE_URL': server.openrouter_base_url,
+        'OPENAI_API_KEY': 'sk-fake',
+        'OPENAI_BASE_URL': server.openai_base_url,
+        'ANTHROPIC_API_KEY': 'sk-fake',
+        'ANTHROPIC_BASE_URL': server.anthropic_base_url,
+    })
+    # Injected errors are expected; keep their log lines out of the table
+    logging.disable(logging.ERROR)
+
+    print(
+        f'{args.requests} operations per target, concurrency {args.concurrency}; '
+        f'fake LLM: {args.latency_ms:.0f}ms {args.latency_distribution} to first token, '
+        f'{args.tokens_per_second:.0f} tok/s, {args.output_tokens} tokens, '
+        f'tool calls {args.tool_call_rate:.0%}, 429 {args.error_429:.0%}, '
+        f'5xx {args.error_5xx:.0%}, timeouts {args.timeout_rate:.0%}\n'
+    )
+    print(
+        f'{"target":<15} {"ok":>6} {"errors":>6} {"ops/s":>8} {"p50 ms":>8} '
+        f'{"p95 ms":>8} {"p99 ms":>8} {"ttft p50":>9}   upstream'
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gateway_config = os.path.join(tmp, 'config.yaml')
+        _gateway_config(gateway_config)
+        builders = {
+            'gateway': lambda: _gateway_workers(args.concurrency, False, gateway_config),
+            'gateway-stream': lambda: _gateway_workers(args.concurrency, True, gateway_config),
+            'gateway-raw': lambda: _gateway_workers(args.concurrency, True, gateway_config, raw=True),
+            'chat-agent': lambda: _chat_agent_workers(args.concurrency, args.model),
+            'agent-hub': lambda: _agent_hub_workers(args.concurrency, args.model),
+            'streaming-chat': lambda: _streaming_chat_workers(args.concurrency, args.model),
+        }
+        try:
+            for target in args.targets.split(','):
+                workers, close = await builders[target]()
+                server.reset_stats()
+                try:
+                    result = await _drive(workers, args.requests)
+                finally:
+                    await close()
+                seen = server.stats()
+                injected = sum(n for status, n in seen['status'].items() if status >= 400)
+                ttft = f'{result["ttft"]:>9.1f}' if result['ttft'] is not None else f'{"-":>9}'
+                print(
+                    f'{target:<15} {result["ops"]:>6} {result["errors"]:>6} '
+                    f'{result["throughput"]:>8.1f} {result["p50"]:>8.1f} '
+                    f'{result["p95"]:>8.1f} {result["p99"]:>8.1f} {ttft}   '
+                    f'{seen["requests"]} calls, {seen["tool_calls"]} tool calls, '
+                    f'{injected} errors, {seen["timeouts"]} timeouts'
+                )
+        finally:
+            await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--targets', default=','.join(TARGETS), help='Comma-separated subset of ' + ', '.join(TARGETS))
+    parser.add_argument('--requests', type=int, default=200, help='Operations per target')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--model', default='google/gemini-2.5-flash')
+    parser.add_argument('--latency-ms', type=float, default=200.0, help='Median time to first token')
+    parser.add_argument(
+        '--latency-distribution', choices=('fixed', 'normal', 'lognormal'), default='lognormal'
+    )
+    parser.add_argument('--tokens-per-second', type=float, default=100.0)
+    parser.add_argument('--output-tokens', type=int, default=64)
+    parser.add_argument('--tool-call-rate', type=float, default=0.2)
+    parser.add_argument('--error-429', type=float, default=0.0)
+    parser.add_argument('--error-5xx', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument(
+        '--timeout-seconds',
+        type=float,
+        default=5.0,
+        help='How long an injected timeout hangs before the connection drops',
+    )
+    parser.add_argument('--seed', type=int)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,147 @@
+"""Benchmark: per-call HTTP clients vs. a pooled, long-lived client.
+
+Starts a tiny local OpenAI-compatible HTTP server that counts accepted
+connections (each one is a TCP handshake, plus a TLS handshake against a
+real API) and optionally delays every new connection to emulate
+handshake round trips. Then it runs the same chat() workload twice:
+
+    before: a fresh provider (and client) per call, closed afterwards
+    after:  one provider from get_provider(), reusing its pooled client
+
+Run from the examples/ directory:
+    python -m shared.benchmarks.pool_benchmark --requests 200 --handshake-ms 50
+
+Related: Chapter 4 (Infrastructure) — Provider Abstraction Pattern
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from shared.llm_base import ChatMessage, HTTPPoolConfig, MessageRole
+from shared.llm_factory import close_pooled_clients, get_provider
+
+_RESPONSE_BODY = json.dumps({
+    'model': 'bench-model',
+    'choices': [{
+        'message': {'role': 'assistant', 'content': 'pong'},
+        'finish_reason': 'stop',
+    }],
+    'usage': {'prompt_tokens': 5, 'completion_tokens': 1, 'total_tokens': 6},
+}).encode()
+
+
+class _CountingServer:
+    """Minimal HTTP/1.1 keep-alive server that counts connections."""
+
+    def __init__(self, handshake_delay: float) -> None:
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        port = self._server.sockets[0].getsockname()[1]
+        return f'http://127.0.0.1:{port}/v1'
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.split(b'\r\n'):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':', 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\n'
+                    b'Content-Type: application/json\r\n'
+                    b'Content-Length: ' + str(len(_RESPONSE_BODY)).encode() + b'\r\n'
+                    b'\r\n' + _RESPONSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run(mode: str, base_url: str, requests: int) -> list[float]:
+    messages = [ChatMessage(role=MessageRole.USER, content='ping')]
+    # Plain HTTP to a local server: HTTP/2 would need TLS + ALPN.
+    pool_config = HTTPPoolConfig(http2=False)
+    latencies: list[float] = []
+
+    pooled_provider = get_provider(
+        'openai', api_key='sk-bench', base_url=base_url, pool_config=pool_config
+    )
+
+    for _ in range(requests):
+        start = time.perf_counter()
+        if mode == 'before':
+            provider = get_provider(
+                'openai',
+                api_key='sk-bench',
+                base_url=base_url,
+                pooled=False,
+                pool_config=pool_config,
+            )
+            async with provider:
+                await provider.chat(messages)
+        else:
+            await pooled_provider.chat(messages)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    await close_pooled_clients()
+    return latencies
+
+
+async def main(requests: int, handshake_ms: float) -> None:
+    print(f'{requests} sequential chat() calls, handshake delay {handshake_ms:.0f}ms\n')
+    print(f'{"mode":<8} {"handshakes":>10} {"p50 ms":>9} {"p99 ms":>9} {"mean ms":>9}')
+
+    for mode in ('before', 'after'):
+        server = _CountingServer(handshake_delay=handshake_ms / 1000)
+        base_url = await server.start()
+        try:
+            latencies = await _run(mode, base_url, requests)
+        finally:
+            await server.stop()
+        print(
+            f'{mode:<8} {server.connections:>10} '
+            f'{_percentile(latencies, 50):>9.2f} '
+            f'{_percentile(latencies, 99):>9.2f} '
+            f'{statistics.mean(latencies):>9.2f}'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument(
+        '--handshake-ms',
+        type=float,
+        default=50.0,
+        help='Delay added to each new connection to emulate TCP+TLS setup',
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.handshake_ms))
@@ -0,0 +1,804 @@
+"""Local fake LLM server for offline load and latency benchmarks.
+
+Speaks enough of the OpenAI, OpenRouter and Anthropic HTTP APIs for
+every provider in this repo (shared/providers/ and the AI gateway's
+providers/) to run against it unmodified: point their base URL here
+and no request leaves the machine or costs anything.
+
+What it simulates:
+- Latency: time to first token drawn from a fixed, normal or lognormal
+  distribution, then output paced at tokens_per_second
+- SSE streaming in both wire formats (OpenAI chat.completion.chunk,
+  Anthropic message/content_block events), including usage
+- Tool calls: when the request offers tools and the last message is not
+  a tool result, a tool_call_rate fraction of replies call one, with
+  arguments filled in from the tool's JSON schema
+- Errors: 429 (with retry-after), 500/503, and timeouts (the request
+  hangs, then the connection is dropped without a response)
+- Native batch jobs: OpenAI files + batches and Anthropic message
+  batches, finished batch_seconds after submission, with the same
+  per-item error injection
+
+Endpoints (any prefix, so /v1/... and /api/v1/... both work):
+    POST .../chat/completions   OpenAI / OpenRouter format
+    POST .../messages           Anthropic format
+    GET  .../models             model list (health checks)
+    POST .../files, .../batches, GET .../batches/{id}, .../files/{id}/content
+    POST .../messages/batches, GET .../messages/batches/{id}[/results]
+
+Run standalone from the examples/ directory:
+    python -m shared.fake_llm_server --port 8100 --latency-ms 300
+
+Or in-process:
+    server = FakeLLMServer(FakeLLMConfig(latency_ms=200, tool_call_rate=0.3))
+    await server.start()
+    provider = get_provider('openai', api_key='sk-fake', base_url=server.openai_base_url)
+
+Related: Chapter 4 (Infrastructure) — Provider Abstraction Pattern
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+_WORDS = (
+    'the quick answer is that it depends on your workload so measure '
+    'before you optimize and keep the slow path observable'
+).split()
+
+_REASONS = {
+    200: 'OK',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    429: 'Too Many Requests',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+@dataclass
+class FakeLLMConfig:
+    """Latency, output and fault-injection settings for FakeLLMServer.
+
+    reply, if set, is called with the parsed request body and may return
+    the text to answer with (None falls back to filler words). Use it
+    when the caller parses the reply, e.g. a router expecting JSON.
+    """
+
+    latency_ms: float = 200.0  # Median time to first token
+    latency_distribution: str = 'lognormal'  # 'fixed', 'normal' or 'lognormal'
+    latency_spread: float = 0.5  # Lognormal sigma, or normal stddev / latency_ms
+    tokens_per_second: float = 100.0  # Output pacing; 0 sends everything at once
+    output_tokens: int = 64  # Filler length, capped by the request's max_tokens
+    tool_call_rate: float = 0.0
+    rate_limit_rate: float = 0.0  # Fraction of requests answered 429
+    server_error_rate: float = 0.0  # Fraction answered 500 or 503
+    timeout_rate: float = 0.0  # Fraction that hang, then drop the connection
+    timeout_seconds: float = 30.0
+    retry_after: float = 1.0
+    batch_seconds: float = 1.0  # How long a native batch job takes to finish
+    seed: int | None = None
+    reply: Callable[[dict], str | None] | None = None
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _text_of(content: Any) -> str:
+    """Flatten OpenAI/Anthropic message content (string or blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return ' '.join(
+            block.get('text') or _text_of(block.get('content')) or ''
+            for block in content
+            if isinstance(block, dict)
+        )
+    return ''
+
+
+def _schema_value(schema: dict) -> Any:
+    if schema.get('enum'):
+        return schema['enum'][0]
+    return {
+        'integer': 1,
+        'number': 1.0,
+        'boolean': True,
+        'array': [],
+        'object': {},
+    }.get(schema.get('type'), 'example')
+
+
+def _error_payload(status: int, message: str, anthropic: bool) -> dict:
+    kind = 'rate_limit_error' if status == 429 else 'api_error'
+    if anthropic:
+        return {'type': 'error', 'error': {'type': kind, 'message': message}}
+    return {'error': {'message': message, 'type': kind, 'code': status}}
+
+
+def _multipart_file(raw: bytes, content_type: str) -> bytes:
+    """The contents of the 'file' part of a multipart/form-data body."""
+    boundary = content_type.partition('boundary=')[2].strip('"').encode()
+    for part in raw.split(b'--' + boundary):
+        head, _, data = part.partition(b'\r\n\r\n')
+        if b'name="file"' in head:
+            return data.removesuffix(b'\r\n')
+    return b''
+
+
+def _fake_arguments(parameters: dict) -> dict:
+    """Arguments for every required property (all properties if none are)."""
+    properties = parameters.get('properties', {})
+    names = parameters.get('required') or list(properties)
+    return {name: _schema_value(properties.get(name, {})) for name in names}
+
+
+class FakeLLMServer:
+    """OpenAI/OpenRouter/Anthropic-compatible HTTP/1.1 server on asyncio.
+
+    Connections are kept alive, so pooled clients behave as they would
+    against the real APIs. stats() counts requests, streams, tool calls,
+    output tokens and responses by status.
+    """
+
+    def __init__(self, config: FakeLLMConfig | None = None) -> None:
+        self.config = config or FakeLLMConfig()
+        self._rng = random.Random(self.config.seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._handlers: set[asyncio.Task] = set()
+        # Native batch state: uploaded/output files and batch jobs by id
+        self._files: dict[str, bytes] = {}
+        self._batches: dict[str, dict] = {}
+        self._batch_tasks: set[asyncio.Task] = set()
+        self.url = ''
+        self.reset_stats()
+
+    @property
+    def openai_base_url(self) -> str:
+        return f'{self.url}/v1'
+
+    @property
+    def openrouter_base_url(self) -> str:
+        return f'{self.url}/api/v1'
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return f'{self.url}/v1'
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start listening (port 0 picks a free one); returns the root URL."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections (and injected hangs) would
+            # otherwise outlive the server
+            for task in list(self._handlers):
+                task.cancel()
+            for task in self._batch_tasks:
+                task.cancel()
+            await asyncio.gather(*self._handlers, *self._batch_tasks, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    def reset_stats(self) -> None:
+        self._stats: dict[str, Any] = {
+            'requests': 0,
+            'streamed': 0,
+            'tool_calls': 0,
+            'output_tokens': 0,
+            'timeouts': 0,
+            'batch_items': 0,
+            'status': {},
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, 'status': dict(self._stats['status'])}
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def _first_token_delay(self) -> float:
+        config = self.config
+        if config.latency_distribution == 'fixed':
+            ms = config.latency_ms
+        elif config.latency_distribution == 'normal':
+            ms = self._rng.gauss(config.latency_ms, config.latency_ms * config.latency_spread)
+        else:
+            # Median latency_ms with a long right tail, like real APIs
+            ms = config.latency_ms * self._rng.lognormvariate(0.0, config.latency_spread)
+        return max(0.0, ms) / 1000
+
+    def _fault(self) -> str | None:
+        config = self.config
+        roll = self._rng.random()
+        for fault, rate in (
+            ('timeout', config.timeout_rate),
+            ('rate_limit', config.rate_limit_rate),
+            ('server_error', config.server_error_rate),
+        ):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def _pick_tool(self, body: dict, anthropic: bool) -> tuple[str, dict] | None:
+        """(name, arguments) of a tool to call, or None to answer in text."""
+        tools = body.get('tools')
+        if not tools or self._rng.random() >= self.config.tool_call_rate:
+            return None
+        last = (body.get('messages') or [{}])[-1]
+        content = last.get('content')
+        # Answer in text once tool results come back, so agent loops end
+        if last.get('role') == 'tool' or (
+            isinstance(content, list)
+            and any(b.get('type') == 'tool_result' for b in content if isinstance(b, dict))
+        ):
+            return None
+        tool = self._rng.choice(tools)
+        if anthropic:
+            return tool['name'], _fake_arguments(tool.get('input_schema', {}))
+        function = tool.get('function', tool)
+        return function['name'], _fake_arguments(function.get('parameters', {}))
+
+    def _pieces(self, body: dict) -> list[str]:
+        """The reply text, split into one piece per output token."""
+        text = self.config.reply(body) if self.config.reply else None
+        if text is not None:
+            words = text.split(' ')
+            return [w if i == 0 else f' {w}' for i, w in enumerate(words)]
+        limit = body.get('max_tokens') or self.config.output_tokens
+        count = max(1, min(self.config.output_tokens, limit))
+        return [
+            _WORDS[i % len(_WORDS)] if i == 0 else f' {_WORDS[i % len(_WORDS)]}'
+            for i in range(count)
+        ]
+
+    def _prompt_tokens(self, body: dict) -> int:
+        text = _text_of(body.get('system')) + ' '.join(
+            _text_of(m.get('content')) for m in body.get('messages', [])
+        )
+        return _count_tokens(text)
+
+    def _simulate(self, body: dict, anthropic: bool) -> tuple[tuple | None, list[str], int]:
+        """(tool call or None, output pieces, prompt tokens) for one reply."""
+        tool = self._pick_tool(body, anthropic)
+        if tool:
+            arguments = json.dumps(tool[1])
+            # Arguments stream as small fragments, like real tool calls
+            pieces = [arguments[i:i + 4] for i in range(0, len(arguments), 4)]
+            self._stats['tool_calls'] += 1
+        else:
+            pieces = self._pieces(body)
+        self._stats['output_tokens'] += len(pieces)
+        return tool, pieces, self._prompt_tokens(body)
+
+    async def _paced(self, pieces: list[str], start: float):
+        """Yield pieces on the tokens_per_second schedule after start."""
+        tps = self.config.tokens_per_second
+        loop = asyncio.get_running_loop()
+        for i, piece in enumerate(pieces):
+            if tps > 0:
+                delay = start + i / tps - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield piece
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                method, path, _ = request_line.split(' ', 2)
+                headers = {}
+                for line in header_lines:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                raw = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                if not await self._route(writer, method, path.split('?', 1)[0], headers, raw):
+                    break  # Simulated timeout: drop the connection
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass  # stop(): end quietly instead of logging a cancelled handler
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _route(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        raw: bytes,
+    ) -> bool:
+        if '/batches' in path or '/files' in path:
+            self._route_batch(writer, method, path, headers, raw)
+            return True
+        if path.endswith('/models'):
+            self._send_json(writer, 200, {
+                'object': 'list',
+                'data': [{'id': 'fake-model', 'object': 'model'}],
+            })
+            return True
+        anthropic = path.endswith('/messages')
+        if not (anthropic or path.endswith('/chat/completions')):
+            self._send_error(writer, 404, f'Unknown path {path}', anthropic=False)
+            return True
+        if method != 'POST':
+            self._send_error(writer, 405, 'Use POST', anthropic=anthropic)
+            return True
+
+        self._stats['requests'] += 1
+        fault = self._fault()
+        if fault == 'timeout':
+            self._stats['timeouts'] += 1
+            await asyncio.sleep(self.config.timeout_seconds)
+            return False
+        if fault == 'rate_limit':
+            self._send_error(
+                writer, 429, 'Rate limit exceeded (injected)', anthropic=anthropic,
+                headers={'retry-after': f'{self.config.retry_after:g}'},
+            )
+            return True
+        if fault == 'server_error':
+            status = self._rng.choice((500, 503))
+            self._send_error(writer, status, 'Upstream error (injected)', anthropic=anthropic)
+            return True
+
+        try:
+            body = json.loads(raw or b'{}')
+        except json.JSONDecodeError:
+            body = {}
+        loop = asyncio.get_running_loop()
+        start = loop.time() + self._first_token_delay()
+        tool, pieces, prompt_tokens = self._simulate(body, anthropic)
+
+        if body.get('stream'):
+            self._stats['streamed'] += 1
+            send = self._stream_anthropic if anthropic else self._stream_openai
+            await send(writer, body, tool, pieces, prompt_tokens, start)
+        else:
+            # Whole reply once the last token would have been generated
+            tps = self.config.tokens_per_second
+            done = start + (len(pieces) / tps if tps > 0 else 0.0)
+            await asyncio.sleep(max(0.0, done - loop.time()))
+            build = self._anthropic_message if anthropic else self._openai_completion
+            self._send_json(writer, 200, build(body, tool, ''.join(pieces), prompt_tokens, len(pieces)))
+        return True
+
+    def _count(self, status: int) -> None:
+        counts = self._stats['status']
+        counts[status] = counts.get(status, 0) + 1
+
+    def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: dict,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._send_bytes(writer, status, json.dumps(payload).encode(), 'application/json', headers)
+
+    def _send_bytes(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        data: bytes,
+        content_type: str,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._count(status)
+        extra = ''.join(f'{k}: {v}\r\n' for k, v in (headers or {}).items())
+        writer.write(
+            f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n'
+            f'content-type: {content_type}\r\n'
+            f'content-length: {len(data)}\r\n{extra}\r\n'.encode()
+            + data
+        )
+
+    def _send_error(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        message: str,
+        anthropic: bool,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self._send_json(writer, status, _error_payload(status, message, anthropic), headers)
+
+    # ------------------------------------------------------------------
+    # Native batches (OpenAI files + batches, Anthropic message batches)
+    # ------------------------------------------------------------------
+
+    def _route_batch(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        raw: bytes,
+    ) -> None:
+        if method == 'POST' and path.endswith('/messages/batches'):
+            requests = json.loads(raw or b'{}').get('requests', [])
+            batch = {
+                'id': f'msgbatch_{uuid.uuid4().hex[:12]}',
+                'type': 'message_batch',
+                'processing_status': 'in_progress',
+                'request_counts': {'processing': len(requests), 'succeeded': 0,
+                                   'errored': 0, 'canceled': 0, 'expired': 0},
+                'results_url': None,
+            }
+            items = [(r['custom_id'], r['params']) for r in requests]
+            self._submit_batch(batch, items, anthropic=True)
+            self._send_json(writer, 200, batch)
+        elif method == 'POST' and path.endswith('/files'):
+            data = _multipart_file(raw, headers.get('content-type', ''))
+            file_id = f'file-{uuid.uuid4().hex[:12]}'
+            self._files[file_id] = data
+            self._send_json(writer, 200, {
+                'id': file_id, 'object': 'file', 'bytes': len(data), 'purpose': 'batch',
+            })
+        elif method == 'POST' and path.endswith('/batches'):
+            body = json.loads(raw or b'{}')
+            lines = self._files.get(body.get('input_file_id'), b'').splitlines()
+            items = [(line['custom_id'], line['body']) for line in map(json.loads, filter(None, lines))]
+            batch = {
+                'id': f'batch_{uuid.uuid4().hex[:12]}',
+                'object': 'batch',
+                'endpoint': body.get('endpoint'),
+                'input_file_id': body.get('input_file_id'),
+                'status': 'in_progress',
+                'output_file_id': None,
+                'error_file_id': None,
+                'request_counts': {'total': len(items), 'completed': 0, 'failed': 0},
+            }
+            self._submit_batch(batch, items, anthropic=False)
+            self._send_json(writer, 200, batch)
+        elif method == 'GET' and (match := re.search(r'/files/([\w-]+)/content$', path)):
+            data = self._files.get(match.group(1))
+            if data is None:
+                self._send_error(writer, 404, 'No such file', anthropic=False)
+            else:
+                self._send_bytes(writer, 200, data, 'application/octet-stream')
+        elif method == 'GET' and (match := re.search(r'/batches/([\w-]+)(/results)?$', path)):
+            batch = self._batches.get(match.group(1))
+            anthropic = '/messages/' in path
+            if batch is None:
+                self._send_error(writer, 404, 'No such batch', anthropic=anthropic)
+            elif match.group(2):
+                self._send_bytes(writer, 200, self._files.get(f'{batch["id"]}/results', b''),
+                                 'application/binary')
+            else:
+                self._send_json(writer, 200, batch)
+        else:
+            self._send_error(writer, 404, f'Unknown path {path}', anthropic=False)
+
+    def _submit_batch(self, batch: dict, items: list[tuple[str, dict]], anthropic: bool) -> None:
+        self._batches[batch['id']] = batch
+        task = asyncio.ensure_future(self._finish_batch(batch, items, anthropic))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _finish_batch(
+        self, batch: dict, items: list[tuple[str, dict]], anthropic: bool
+    ) -> None:
+        """Answer every item batch_seconds after submission, like a batch job."""
+        await asyncio.sleep(self.config.batch_seconds)
+        succeeded: list[dict] = []
+        failed: list[dict] = []
+        for custom_id, body in items:
+            self._stats['batch_items'] += 1
+            fault = self._fault()
+            if fault is None:
+                tool, pieces, prompt = self._simulate(body, anthropic)
+                build = self._anthropic_message if anthropic else self._openai_completion
+                reply = build(body, tool, ''.join(pieces), prompt, len(pieces))
+                if anthropic:
+                    line = {'custom_id': custom_id, 'result': {'type': 'succeeded', 'message': reply}}
+                else:
+                    line = {'custom_id': custom_id, 'error': None,
+                            'response': {'status_code': 200, 'body': reply}}
+                succeeded.append(line)
+                continue
+            status = 429 if fault == 'rate_limit' else 500
+            if anthropic and fault == 'timeout':
+                line = {'custom_id': custom_id, 'result': {'type': 'expired'}}
+            elif anthropic:
+                line = {'custom_id': custom_id, 'result': {
+                    'type': 'errored',
+                    'error': _error_payload(status, 'Item failed (injected)', anthropic=True),
+                }}
+            elif fault == 'timeout':
+                line = {'custom_id': custom_id, 'response': None, 'error': {
+                    'code': 'batch_expired', 'message': 'Item expired (injected)',
+                }}
+            else:
+                line = {'custom_id': custom_id, 'error': None, 'response': {
+                    'status_code': status,
+                    'body': _error_payload(status, 'Item failed (injected)', anthropic=False),
+                }}
+            failed.append(line)
+
+        def jsonl(lines: list[dict]) -> bytes:
+            return b''.join(json.dumps(line).encode() + b'\n' for line in lines)
+
+        if anthropic:
+            self._files[f'{batch["id"]}/results'] = jsonl(succeeded + failed)
+            counts = batch['request_counts']
+            counts['processing'] = 0
+            counts['succeeded'] = len(succeeded)
+            for line in failed:
+                kind = line['result']['type']
+                counts[kind] = counts.get(kind, 0) + 1
+            batch['results_url'] = f'{self.anthropic_base_url}/messages/batches/{batch["id"]}/results'
+            batch['processing_status'] = 'ended'
+            return
+        for key, lines in (('output_file_id', succeeded), ('error_file_id', failed)):
+            if lines:
+                file_id = f'file-{uuid.uuid4().hex[:12]}'
+                self._files[file_id] = jsonl(lines)
+                batch[key] = file_id
+        batch['request_counts'].update(completed=len(succeeded), failed=len(failed))
+        batch['status'] = 'completed'
+
+    # ------------------------------------------------------------------
+    # OpenAI / OpenRouter format
+    # ------------------------------------------------------------------
+
+    def _openai_completion(
+        self, body: dict, tool: tuple | None, text: str, prompt: int, output: int
+    ) -> dict:
+        message: dict[str, Any] = {'role': 'assistant', 'content': None if tool else text}
+        if tool:
+            message['tool_calls'] = [{
+                'id': f'call_{uuid.uuid4().hex[:12]}',
+                'type': 'function',
+                'function': {'name': tool[0], 'arguments': text},
+            }]
+        return {
+            'id': f'chatcmpl-{uuid.uuid4().hex[:12]}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake-model'),
+            'choices': [{
+                'index': 0,
+                'message': message,
+                'finish_reason': 'tool_calls' if tool else 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt,
+                'completion_tokens': output,
+                'total_tokens': prompt + output,
+            },
+        }
+
+    async def _stream_openai(
+        self,
+        writer: asyncio.StreamWriter,
+        body: dict,
+        tool: tuple | None,
+        pieces: list[str],
+        prompt: int,
+        start: float,
+    ) -> None:
+        envelope = {
+            'id': f'chatcmpl-{uuid.uuid4().hex[:12]}',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake-model'),
+        }
+
+        def chunk(delta: dict, finish: str | None = None) -> dict:
+            return {**envelope, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]}
+
+        self._start_sse(writer)
+        first = {'role': 'assistant'}
+        if tool:
+            first['tool_calls'] = [{
+                'index': 0,
+                'id': f'call_{uuid.uuid4().hex[:12]}',
+                'type': 'function',
+                'function': {'name': tool[0], 'arguments': ''},
+            }]
+        await self._sse(writer, chunk(first))
+        async for piece in self._paced(pieces, start):
+            if tool:
+                delta = {'tool_calls': [{'index': 0, 'function': {'arguments': piece}}]}
+            else:
+                delta = {'content': piece}
+            await self._sse(writer, chunk(delta))
+        await self._sse(writer, chunk({}, 'tool_calls' if tool else 'stop'))
+        if (body.get('stream_options') or {}).get('include_usage'):
+            await self._sse(writer, {**envelope, 'choices': [], 'usage': {
+                'prompt_tokens': prompt,
+                'completion_tokens': len(pieces),
+                'total_tokens': prompt + len(pieces),
+            }})
+        await self._sse(writer, '[DONE]')
+        self._end_sse(writer)
+
+    # ------------------------------------------------------------------
+    # Anthropic format
+    # ------------------------------------------------------------------
+
+    def _anthropic_message(
+        self, body: dict, tool: tuple | None, text: str, prompt: int, output: int
+    ) -> dict:
+        if tool:
+            content = [{
+                'type': 'tool_use',
+                'id': f'toolu_{uuid.uuid4().hex[:12]}',
+                'name': tool[0],
+                'input': tool[1],
+            }]
+        else:
+            content = [{'type': 'text', 'text': text}]
+        return {
+            'id': f'msg_{uuid.uuid4().hex[:12]}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'fake-model'),
+            'content': content,
+            'stop_reason': 'tool_use' if tool else 'end_turn',
+            'usage': {'input_tokens': prompt, 'output_tokens': output},
+        }
+
+    async def _stream_anthropic(
+        self,
+        writer: asyncio.StreamWriter,
+        body: dict,
+        tool: tuple | None,
+        pieces: list[str],
+        prompt: int,
+        start: float,
+    ) -> None:
+        self._start_sse(writer)
+        await self._sse(writer, {
+            'type': 'message_start',
+            'message': {
+                'id': f'msg_{uuid.uuid4().hex[:12]}',
+                'type': 'message',
+                'role': 'assistant',
+                'model': body.get('model', 'fake-model'),
+                'content': [],
+                'stop_reason': None,
+                'usage': {'input_tokens': prompt, 'output_tokens': 1},
+            },
+        }, event='message_start')
+        if tool:
+            block = {'type': 'tool_use', 'id': f'toolu_{uuid.uuid4().hex[:12]}',
+                     'name': tool[0], 'input': {}}
+        else:
+            block = {'type': 'text', 'text': ''}
+        await self._sse(writer, {'type': 'content_block_start', 'index': 0,
+                                 'content_block': block}, event='content_block_start')
+        async for piece in self._paced(pieces, start):
+            if tool:
+                delta = {'type': 'input_json_delta', 'partial_json': piece}
+            else:
+                delta = {'type': 'text_delta', 'text': piece}
+            await self._sse(writer, {'type': 'content_block_delta', 'index': 0, 'delta': delta},
+                            event='content_block_delta')
+        await self._sse(writer, {'type': 'content_block_stop', 'index': 0},
+                        event='content_block_stop')
+        await self._sse(writer, {
+            'type': 'message_delta',
+            'delta': {'stop_reason': 'tool_use' if tool else 'end_turn'},
+            'usage': {'output_tokens': len(pieces)},
+        }, event='message_delta')
+        await self._sse(writer, {'type': 'message_stop'}, event='message_stop')
+        self._end_sse(writer)
+
+    # ------------------------------------------------------------------
+    # SSE framing (chunked transfer encoding keeps the connection alive)
+    # ------------------------------------------------------------------
+
+    def _start_sse(self, writer: asyncio.StreamWriter) -> None:
+        self._count(200)
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'content-type: text/event-stream\r\n'
+            b'cache-control: no-cache\r\n'
+            b'transfer-encoding: chunked\r\n\r\n'
+        )
+
+    async def _sse(
+        self, writer: asyncio.StreamWriter, data: dict | str, event: str | None = None
+    ) -> None:
+        payload = data if isinstance(data, str) else json.dumps(data)
+        frame = (f'event: {event}\n' if event else '') + f'data: {payload}\n\n'
+        encoded = frame.encode()
+        writer.write(b'%x\r\n%s\r\n' % (len(encoded), encoded))
+        await writer.drain()
+
+    def _end_sse(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b'0\r\n\r\n')
+
+
+async def _serve(config: FakeLLMConfig, host: str, port: int) -> None:
+    server = FakeLLMServer(config)
+    url = await server.start(host, port)
+    print(f'Fake LLM server on {url}')
+    print(f'  OPENAI_BASE_URL={server.openai_base_url}')
+    print(f'  OPENROUTER_BASE_URL={server.openrouter_base_url}')
+    print(f'  ANTHROPIC_BASE_URL={server.anthropic_base_url}')
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency-ms', type=float, default=200.0, help='Median time to first token')
+    parser.add_argument(
+        '--latency-distribution', choices=('fixed', 'normal', 'lognormal'), default='lognormal'
+    )
+    parser.add_argument('--latency-spread', type=float, default=0.5)
+    parser.add_argument('--tokens-per-second', type=float, default=100.0)
+    parser.add_argument('--output-tokens', type=int, default=64)
+    parser.add_argument('--tool-call-rate', type=float, default=0.0)
+    parser.add_argument('--error-429', type=float, default=0.0, help='Fraction answered 429')
+    parser.add_argument('--error-5xx', type=float, default=0.0, help='Fraction answered 500/503')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction that hang')
+    parser.add_argument('--timeout-seconds', type=float, default=30.0)
+    parser.add_argument('--batch-seconds', type=float, default=1.0, help='Native batch job duration')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(
+            FakeLLMConfig(
+                latency_ms=args.latency_ms,
+                latency_distribution=args.latency_distribution,
+                latency_spread=args.latency_spread,
+                tokens_per_second=args.tokens_per_second,
+                output_tokens=args.output_tokens,
+                tool_call_rate=args.tool_call_rate,
+                rate_limit_rate=args.error_429,
+                server_error_rate=args.error_5xx,
+                timeout_rate=args.timeout_rate,
+                timeout_seconds=args.timeout_seconds,
+                batch_seconds=args.batch_seconds,
+                seed=args.seed,
+            ),
+            args.host,
+            args.port,
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -7,13 +7,23 @@ at app/integrations/llm/base.py.
 Related: Chapter 4 (Infrastructure) — Provider Abstraction Pattern
 """
 
+import importlib.util
 import json
+import logging
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any
 
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional 'h2' package (pip install 'httpx[http2]').
+# Without it, pooled clients fall back to HTTP/1.1 keep-alive.
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
 
 class MessageRole(str, Enum):
     """Message roles in a conversation."""
@@ -140,6 +150,38 @@ class ChatResponse:
         return self.tool_calls is not None and len(self.tool_calls) > 0
 
 
+@dataclass(frozen=True)
+class HTTPPoolConfig:
+    """Connection pool settings for a provider's HTTP client.
+
+    Every chat() and chat_stream() call on a provider reuses the same
+    pooled client, so TCP+TLS handshakes are paid once per connection
+    rather than once per request.
+    """
+
+    timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+
+    def build_client(self) -> httpx.AsyncClient:
+        """Create an httpx.AsyncClient configured with these settings."""
+        http2 = self.http2 and HTTP2_AVAILABLE
+        if self.http2 and not HTTP2_AVAILABLE:
+            logger.debug('h2 not installed, pooled client will use HTTP/1.1')
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+
 @dataclass
 class StreamChunk:
     """A chunk from a streaming response."""
@@ -156,6 +198,15 @@ class LLMProvider(ABC):
     All providers (OpenRouter, OpenAI, etc.) implement this interface,
     allowing the application to switch providers without changing
     business logic. See Chapter 4: Provider Abstraction Pattern.
+
+    Each provider holds a long-lived, pooled httpx.AsyncClient. Pass
+    http_client to share one pool between several provider instances
+    (llm_factory.get_provider does this); the provider then does not
+    close it. Close an owned pool with aclose() or use the provider as
+    an async context manager:
+
+        async with OpenRouterProvider(api_key='sk-or-...') as provider:
+            response = await provider.chat(messages)
     """
 
     def __init__(
@@ -165,12 +216,40 @@ class LLMProvider(ABC):
         model: str | None = None,
         default_max_tokens: int = 4096,
         default_temperature: float = 0.7,
+        pool_config: HTTPPoolConfig | None = None,
+        http_client: httpx.AsyncClient | None = None,
     ):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
         self.default_max_tokens = default_max_tokens
         self.default_temperature = default_temperature
+        self.pool_config = pool_config or HTTPPoolConfig()
+        self._http_client = http_client
+        self._owns_client = http_client is None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            if not self._owns_client:
+                raise RuntimeError(
+                    f'Shared HTTP client for {self.provider_name} has been closed'
+                )
+            self._http_client = self.pool_config.build_client()
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close the connection pool if this provider owns it."""
+        if self._owns_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def __aenter__(self) -> 'LLMProvider':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
 
     @property
     @abstractmethod
@@ -4,21 +4,64 @@ Provides a single entry point for getting a configured provider.
 Unlike the production version (which uses Flask's current_app),
 this version accepts arguments directly for portability.
 
+Providers returned by get_provider() share one pooled HTTP client per
+(provider, api_key, base_url), so a router and an agent that use
+different models on the same key still reuse the same warm connections.
+
 Related: Chapter 4 (Infrastructure) — Provider Abstraction Pattern
 """
 
 import os
 
-from shared.llm_base import LLMProvider
+import httpx
+
+from shared.llm_base import HTTPPoolConfig, LLMProvider
 from shared.llm_exceptions import LLMException
+from shared.providers import openai_provider, openrouter
 from shared.providers.openai_provider import OpenAIProvider
 from shared.providers.openrouter import OpenRouterProvider
 
+# Shared connection pools keyed by (provider, api_key, base_url)
+_client_pool: dict[tuple[str, str, str], httpx.AsyncClient] = {}
+
+
+def _get_pooled_client(
+    provider_name: str,
+    api_key: str,
+    base_url: str,
+    pool_config: HTTPPoolConfig | None = None,
+) -> httpx.AsyncClient:
+    """Return the shared client for this key, creating it if needed.
+
+    pool_config only applies when the pool is first created.
+    """
+    pool_key = (provider_name, api_key, base_url)
+    client = _client_pool.get(pool_key)
+    if client is None or client.is_closed:
+        client = (pool_config or HTTPPoolConfig()).build_client()
+        _client_pool[pool_key] = client
+    return client
+
+
+async def close_pooled_clients() -> None:
+    """Close every shared connection pool.
+
+    Call once at shutdown. Providers created afterwards by get_provider()
+    get fresh pools.
+    """
+    clients = list(_client_pool.values())
+    _client_pool.clear()
+    for client in clients:
+        await client.aclose()
+
 
 def get_provider(
     provider_name: str | None = None,
     model: str | None = None,
     api_key: str | None = None,
+    base_url: str | None = None,
+    pooled: bool = True,
+    pool_config: HTTPPoolConfig | None = None,
     **kwargs,
 ) -> LLMProvider:
     """Get an LLM provider instance by name.
@@ -30,6 +73,12 @@ def get_provider(
         provider_name: 'openrouter' or 'openai' (default: 'openrouter')
         model: Model to use (provider-specific, e.g. 'google/gemini-2.5-flash')
         api_key: API key (defaults to env var for the provider)
+        base_url: API base URL (defaults to OPENROUTER_BASE_URL /
+            OPENAI_BASE_URL, then the provider's public endpoint)
+        pooled: Share a connection pool with other providers for the same
+            (provider, api_key, base_url). Set False to give the provider
+            its own pool, closed by provider.aclose().
+        pool_config: Connection pool settings (timeouts, keep-alive, HTTP/2)
         **kwargs: Additional provider-specific arguments
 
     Returns:
@@ -58,11 +107,23 @@ def get_provider(
                 provider='openrouter',
             )
 
+        base_url = (
+            base_url or os.getenv('OPENROUTER_BASE_URL') or openrouter.DEFAULT_BASE_URL
+        )
+        http_client = (
+            _get_pooled_client('openrouter', api_key, base_url, pool_config)
+            if pooled
+            else None
+        )
+
         return OpenRouterProvider(
             api_key=api_key,
+            base_url=base_url,
             model=model or os.getenv('MODEL', 'google/gemini-2.5-flash'),
             site_url=os.getenv('SITE_URL'),
             site_name=os.getenv('SITE_NAME'),
+            pool_config=pool_config,
+            http_client=http_client,
             **kwargs,
         )
 
@@ -74,10 +135,22 @@ def get_provider(
                 provider='openai',
             )
 
+        base_url = (
+            base_url or os.getenv('OPENAI_BASE_URL') or openai_provider.DEFAULT_BASE_URL
+        )
+        http_client = (
+            _get_pooled_client('openai', api_key, base_url, pool_config)
+            if pooled
+            else None
+        )
+
         return OpenAIProvider(
             api_key=api_key,
+            base_url=base_url,
             model=model or os.getenv('MODEL', 'gpt-4o'),
             organization=os.getenv('OPENAI_ORGANIZATION'),
+            pool_config=pool_config,
+            http_client=http_client,
             **kwargs,
         )
 
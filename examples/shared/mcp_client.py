@@ -4,19 +4,26 @@ Simplified version of the production MCP client for use in examples.
 Communicates with MCP servers via the streamable-http transport,
 which uses HTTP POST with Server-Sent Events responses.
 
+Each client keeps a persistent transport: one pooled HTTP client per
+server, SSE responses parsed incrementally as lines arrive, and
+responses matched to in-flight requests by JSON-RPC id so several tool
+calls can run concurrently on one session.
+
 MCP spec: https://modelcontextprotocol.io/specification
 Related: Chapter 6 (Agent Architecture) — Tool Integration via MCP
 """
 
+import asyncio
 import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 
-from shared.llm_base import ToolDefinition
+from shared.llm_base import HTTPPoolConfig, ToolDefinition
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +101,211 @@ class ToolResult:
         return '\n'.join(texts)
 
 
+class MCPTransport:
+    """Persistent streamable-http transport for one MCP server.
+
+    Holds a pooled httpx client for the lifetime of the session and
+    dispatches every JSON-RPC message it reads to the waiting request
+    with the matching id. Because a response is matched by id rather
+    than by which HTTP stream carried it, several requests can be in
+    flight on the same session at once.
+
+    Each SSE response is drained by its own reader task, not by the
+    request that opened it: a request that gets its answer early stops
+    waiting, while the stream keeps being read so responses for other
+    ids on it still reach their futures.
+    """
+
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        pool_config: HTTPPoolConfig | None = None,
+    ):
+        self.config = config
+        self.pool_config = pool_config or HTTPPoolConfig(timeout=config.timeout)
+        self._client: httpx.AsyncClient | None = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._readers: set[asyncio.Task] = set()
+        # Requests whose own stream ended without their response
+        self._unanswered: set[str] = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self.pool_config.build_client()
+        return self._client
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests still waiting for a response."""
+        return len(self._pending)
+
+    async def aclose(self) -> None:
+        """Fail any pending requests and close the connection pool."""
+        for reader in list(self._readers):
+            reader.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(
+                    MCPConnectionError(
+                        message='Transport closed',
+                        server_name=self.config.name,
+                    )
+                )
+        self._pending.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def iter_sse_messages(
+        self, lines: AsyncIterator[str]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield JSON-RPC messages from an SSE line stream as they arrive.
+
+        MCP servers using streamable-http transport return:
+            event: message
+            data: {"jsonrpc":"2.0","id":"...","result":{...}}
+
+        Data lines are joined until the blank line that ends each event,
+        so only one event is held in memory at a time.
+        """
+        data_lines: list[str] = []
+        async for line in lines:
+            line = line.rstrip('\r')
+            if line.startswith('data:'):
+                data_lines.append(line[5:].lstrip(' '))
+            elif not line and data_lines:
+                yield self._decode_event(data_lines)
+                data_lines = []
+        if data_lines:
+            yield self._decode_event(data_lines)
+
+    def _decode_event(self, data_lines: list[str]) -> dict[str, Any]:
+        data_str = '\n'.join(data_lines)
+        try:
+            return json.loads(data_str)
+        except json.JSONDecodeError as e:
+            raise MCPException(
+                message=f'Invalid JSON in SSE event: {data_str[:200]}',
+                server_name=self.config.name,
+            ) from e
+
+    def _dispatch(self, message: dict[str, Any] | list[Any]) -> None:
+        """Resolve the pending request(s) matching a JSON-RPC message."""
+        messages = message if isinstance(message, list) else [message]
+        for item in messages:
+            future = self._pending.get(str(item.get('id')))
+            if future is not None and not future.done():
+                future.set_result(item)
+
+    def _fail(self, request_id: str, exc: BaseException) -> None:
+        future = self._pending.get(request_id)
+        if future is not None and not future.done():
+            future.set_exception(exc)
+
+    async def _read_stream(
+        self, response: httpx.Response, request_id: str
+    ) -> None:
+        """Dispatch every message on one SSE response until it ends."""
+        try:
+            async for message in self.iter_sse_messages(response.aiter_lines()):
+                self._dispatch(message)
+        except Exception as e:
+            self._fail(request_id, e)
+        finally:
+            await response.aclose()
+        self._unanswered.add(request_id)
+        # This task is still in _readers until it returns; once the last
+        # stream ends, nothing can answer the requests left waiting
+        if len(self._readers) <= 1:
+            for unanswered in self._unanswered:
+                self._fail(unanswered, MCPException(
+                    message=f'No response for request {unanswered} in stream',
+                    server_name=self.config.name,
+                ))
+            self._unanswered.clear()
+
+    async def request(
+        self,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+    ) -> tuple[dict[str, Any], httpx.Headers]:
+        """POST a JSON-RPC request and wait for the response with its id.
+
+        Returns the response message and the HTTP response headers.
+        """
+        request_id = payload['id']
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            response = await self.client.send(
+                self.client.build_request(
+                    'POST', self.config.url, json=payload, headers=headers
+                ),
+                stream=True,
+            )
+            content_type = response.headers.get('content-type', '')
+            if response.status_code != 200 or 'text/event-stream' not in content_type:
+                try:
+                    body = await response.aread()
+                finally:
+                    await response.aclose()
+                if response.status_code != 200:
+                    raise MCPConnectionError(
+                        message=f'HTTP {response.status_code}: {body.decode(errors="replace")}',
+                        server_name=self.config.name,
+                    )
+                self._dispatch(json.loads(body))
+                if not future.done() and self.in_flight <= 1:
+                    raise MCPException(
+                        message=f'No response for request {request_id} in stream',
+                        server_name=self.config.name,
+                    )
+            else:
+                reader = asyncio.create_task(self._read_stream(response, request_id))
+                self._readers.add(reader)
+                reader.add_done_callback(self._readers.discard)
+                # Our own stream either answers or ends (failing the
+                # request if no other stream could still answer it)
+                await asyncio.wait(
+                    (future, reader), return_when=asyncio.FIRST_COMPLETED
+                )
+
+            if not future.done():
+                # The server may deliver it on another in-flight stream
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(future), self.config.timeout
+                    )
+                except asyncio.TimeoutError as e:
+                    raise MCPConnectionError(
+                        message=f'Timed out waiting for response {request_id}',
+                        server_name=self.config.name,
+                    ) from e
+            return future.result(), response.headers
+        finally:
+            self._pending.pop(request_id, None)
+            self._unanswered.discard(request_id)
+
+    async def notify(
+        self,
+        payload: dict[str, Any],
+        headers: dict[str, str],
+    ) -> None:
+        """POST a JSON-RPC notification (no response body expected)."""
+        response = await self.client.post(
+            self.config.url, json=payload, headers=headers
+        )
+        if response.status_code not in (200, 202, 204):
+            raise MCPConnectionError(
+                message=f'HTTP {response.status_code}: {response.text}',
+                server_name=self.config.name,
+            )
+
+
 class MCPClient:
     """HTTP client for communicating with MCP servers via JSON-RPC 2.0.
 
@@ -105,6 +317,10 @@ class MCPClient:
         2. Call initialize() to perform the MCP handshake
         3. Call list_tools() to discover available tools
         4. Call call_tool() to execute tools
+        5. Call aclose() (or use ``async with``) to release connections
+
+    Requests share one persistent MCPTransport, so concurrent
+    call_tool() calls are pipelined over pooled connections.
 
     Example:
         config = MCPServerConfig(
@@ -120,8 +336,13 @@ class MCPClient:
 
     MCP_SESSION_HEADER = 'mcp-session-id'
 
-    def __init__(self, config: MCPServerConfig):
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        transport: MCPTransport | None = None,
+    ):
         self.config = config
+        self._transport = transport or MCPTransport(config)
         self._tools_cache: list[MCPTool] | None = None
         self._session_id: str | None = None
         self._is_initialized: bool = False
@@ -130,23 +351,15 @@ class MCPClient:
     def server_name(self) -> str:
         return self.config.name
 
-    def _parse_sse_response(self, response_text: str) -> dict[str, Any]:
-        """Parse SSE formatted response to extract JSON-RPC data.
+    async def aclose(self) -> None:
+        """Close the persistent transport."""
+        await self._transport.aclose()
 
-        MCP servers using streamable-http transport return:
-            event: message
-            data: {"jsonrpc":"2.0","id":"...","result":{...}}
-        """
-        for line in response_text.split('\n'):
-            line = line.strip('\r\n ')
-            if line.startswith('data:'):
-                data_str = line[5:].strip()
-                if data_str:
-                    return json.loads(data_str)
-        raise MCPException(
-            message=f'No data found in SSE response: {response_text[:200]}',
-            server_name=self.config.name,
-        )
+    async def __aenter__(self) -> 'MCPClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
 
     async def _send_request(
         self,
@@ -183,47 +396,28 @@ class MCPClient:
             headers[self.MCP_SESSION_HEADER] = self._session_id
 
         try:
-            async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-                response = await client.post(
-                    self.config.url,
-                    json=payload,
-                    headers=headers,
-                )
-
-                if is_notification:
-                    if response.status_code not in (200, 202, 204):
-                        raise MCPConnectionError(
-                            message=f'HTTP {response.status_code}: {response.text}',
-                            server_name=self.config.name,
-                        )
-                    return None
+            if is_notification:
+                await self._transport.notify(payload, headers)
+                return None
 
-                if response.status_code != 200:
-                    raise MCPConnectionError(
-                        message=f'HTTP {response.status_code}: {response.text}',
-                        server_name=self.config.name,
-                    )
-
-                if capture_session:
-                    session_id = response.headers.get(self.MCP_SESSION_HEADER)
-                    if session_id:
-                        self._session_id = session_id
-
-                content_type = response.headers.get('content-type', '')
-                if 'text/event-stream' in content_type:
-                    data = self._parse_sse_response(response.text)
-                else:
-                    data = response.json()
+            data, response_headers = await self._transport.request(
+                payload, headers
+            )
 
-                if 'error' in data:
-                    error = data['error']
-                    raise MCPException(
-                        message=error.get('message', 'Unknown error'),
-                        server_name=self.config.name,
-                        code=error.get('code'),
-                    )
+            if capture_session:
+                session_id = response_headers.get(self.MCP_SESSION_HEADER)
+                if session_id:
+                    self._session_id = session_id
+
+            if 'error' in data:
+                error = data['error']
+                raise MCPException(
+                    message=error.get('message', 'Unknown error'),
+                    server_name=self.config.name,
+                    code=error.get('code'),
+                )
 
-                return data.get('result')
+            return data.get('result')
 
         except httpx.TimeoutException as e:
             raise MCPConnectionError(
@@ -19,6 +19,7 @@ import httpx
 from shared.llm_base import (
     ChatMessage,
     ChatResponse,
+    HTTPPoolConfig,
     LLMProvider,
     StreamChunk,
     ToolCall,
@@ -52,6 +53,8 @@ class OpenAIProvider(LLMProvider):
         default_max_tokens: int = 4096,
         default_temperature: float = 0.7,
         organization: str | None = None,
+        pool_config: HTTPPoolConfig | None = None,
+        http_client: httpx.AsyncClient | None = None,
     ):
         super().__init__(
             api_key=api_key,
@@ -59,6 +62,8 @@ class OpenAIProvider(LLMProvider):
             model=model or DEFAULT_MODEL,
             default_max_tokens=default_max_tokens,
             default_temperature=default_temperature,
+            pool_config=pool_config,
+            http_client=http_client,
         )
         self.organization = organization
 
@@ -104,26 +109,25 @@ class OpenAIProvider(LLMProvider):
             payload['tool_choice'] = 'auto'
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    url, json=payload, headers=self._get_headers()
-                )
+            response = await self.http_client.post(
+                url, json=payload, headers=self._get_headers()
+            )
 
-                if response.status_code != 200:
-                    error_data = response.json() if response.content else {}
-                    error_msg = error_data.get('error', {}).get(
-                        'message', 'Unknown error'
-                    )
-                    raise_for_status(
-                        response.status_code,
-                        error_msg,
-                        provider=self.provider_name,
-                        model=model,
-                        raw_response=error_data,
-                    )
+            if response.status_code != 200:
+                error_data = response.json() if response.content else {}
+                error_msg = error_data.get('error', {}).get(
+                    'message', 'Unknown error'
+                )
+                raise_for_status(
+                    response.status_code,
+                    error_msg,
+                    provider=self.provider_name,
+                    model=model,
+                    raw_response=error_data,
+                )
 
-                data = response.json()
-                return self._parse_response(data)
+            data = response.json()
+            return self._parse_response(data)
 
         except httpx.TimeoutException as e:
             raise LLMTimeoutException(
@@ -168,45 +172,44 @@ class OpenAIProvider(LLMProvider):
             payload['tool_choice'] = 'auto'
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                async with client.stream(
-                    'POST',
-                    url,
-                    json=payload,
-                    headers=self._get_headers(),
-                ) as response:
-                    if response.status_code != 200:
-                        error_body = await response.aread()
-                        error_data = json.loads(error_body) if error_body else {}
-                        error_msg = error_data.get('error', {}).get(
-                            'message', 'Unknown error'
-                        )
-                        raise_for_status(
-                            response.status_code,
-                            error_msg,
-                            provider=self.provider_name,
-                            model=model,
-                            raw_response=error_data,
-                        )
-
-                    tool_calls_buffer: dict[int, dict] = {}
-
-                    async for line in response.aiter_lines():
-                        if not line or not line.startswith('data: '):
-                            continue
-
-                        data_str = line[6:]
-                        if data_str == '[DONE]':
-                            yield StreamChunk(is_final=True)
-                            break
-
-                        try:
-                            data = json.loads(data_str)
-                            chunk = self._parse_stream_chunk(data, tool_calls_buffer)
-                            if chunk:
-                                yield chunk
-                        except json.JSONDecodeError:
-                            continue
+            async with self.http_client.stream(
+                'POST',
+                url,
+                json=payload,
+                headers=self._get_headers(),
+            ) as response:
+                if response.status_code != 200:
+                    error_body = await response.aread()
+                    error_data = json.loads(error_body) if error_body else {}
+                    error_msg = error_data.get('error', {}).get(
+                        'message', 'Unknown error'
+                    )
+                    raise_for_status(
+                        response.status_code,
+                        error_msg,
+                        provider=self.provider_name,
+                        model=model,
+                        raw_response=error_data,
+                    )
+
+                tool_calls_buffer: dict[int, dict] = {}
+
+                async for line in response.aiter_lines():
+                    if not line or not line.startswith('data: '):
+                        continue
+
+                    data_str = line[6:]
+                    if data_str == '[DONE]':
+                        yield StreamChunk(is_final=True)
+                        break
+
+                    try:
+                        data = json.loads(data_str)
+                        chunk = self._parse_stream_chunk(data, tool_calls_buffer)
+                        if chunk:
+                            yield chunk
+                    except json.JSONDecodeError:
+                        continue
 
         except httpx.TimeoutException as e:
             raise LLMTimeoutException(